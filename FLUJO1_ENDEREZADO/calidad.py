@@ -0,0 +1,277 @@
+"""
+Control de calidad previo para FLUJO 1 - Enderezado de documentos.
+Evalúa la foto reducida ANTES de gastar llamadas a Azure: nitidez,
+exposición, reflejos y cobertura del documento dentro del encuadre.
+
+Las imágenes que no llegan a los umbrales reciben un código de motivo; por
+defecto solo se avisa, y descartarlas antes de Azure es opcional (conviene
+hacerlo solo con umbrales calibrados). Los umbrales pueden calibrarse a
+partir de una muestra etiquetada:
+
+    python calidad.py calibrar etiquetas.csv [umbrales_calidad.json]
+
+donde etiquetas.csv tiene columnas: ruta,etiqueta
+(etiqueta = "ok" o uno de los códigos de motivo de abajo).
+"""
+
+import csv
+import json
+import os
+import sys
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+# Códigos de motivo de rechazo
+MOTIVO_BORROSA = "BORROSA"
+MOTIVO_SUBEXPUESTA = "SUBEXPUESTA"
+MOTIVO_SOBREEXPUESTA = "SOBREEXPUESTA"
+MOTIVO_REFLEJO = "REFLEJO"
+MOTIVO_COBERTURA = "COBERTURA_INSUFICIENTE"
+
+# Umbrales por defecto (medidos sobre la imagen reducida a 500 px de ancho).
+# Son orientativos, no están calibrados: sirven para avisar, no para rechazar.
+UMBRALES_CALIDAD = {
+    "nitidez_min": 60.0,      # Varianza del Laplaciano
+    "brillo_min": 70.0,       # Media de grises (0-255)
+    "brillo_max": 250.0,
+    "reflejo_max": 0.15,      # Fracción del encuadre con manchas saturadas
+    "cobertura_min": 0.35,    # Fracción del encuadre ocupada por el documento
+}
+
+# Métrica → (clave de umbral, sentido, motivo). Sentido "min": se rechaza si valor < umbral.
+_REGLAS = [
+    ("nitidez", "nitidez_min", "min", MOTIVO_BORROSA),
+    ("brillo", "brillo_min", "min", MOTIVO_SUBEXPUESTA),
+    ("brillo", "brillo_max", "max", MOTIVO_SOBREEXPUESTA),
+    ("reflejo", "reflejo_max", "max", MOTIVO_REFLEJO),
+    ("cobertura", "cobertura_min", "min", MOTIVO_COBERTURA),
+]
+
+
+def cargar_umbrales(ruta_json: Optional[str] = None) -> Dict[str, float]:
+    """
+    Carga umbrales calibrados desde un JSON y los combina con los valores por defecto.
+
+    Args:
+        ruta_json: Ruta al archivo generado por calibrar_umbrales (opcional)
+
+    Returns:
+        Diccionario completo de umbrales
+    """
+    umbrales = dict(UMBRALES_CALIDAD)
+    if ruta_json and os.path.exists(ruta_json):
+        with open(ruta_json, "r", encoding="utf-8") as f:
+            umbrales.update({k: float(v) for k, v in json.load(f).items() if k in umbrales})
+        print(f"[INFO] Umbrales de calidad cargados de: {ruta_json}")
+    return umbrales
+
+
+def medir_calidad_fotometrica(imagen: np.ndarray) -> Dict[str, float]:
+    """
+    Calcula las métricas que no dependen del contorno del documento.
+
+    Args:
+        imagen: Imagen reducida (BGR o escala de grises)
+
+    Returns:
+        {'nitidez', 'brillo', 'reflejo'}
+    """
+    if len(imagen.shape) == 3:
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    else:
+        gris = imagen
+
+    nitidez = float(cv2.Laplacian(gris, cv2.CV_64F).var())
+    brillo = float(gris.mean())
+
+    # Reflejo: manchas saturadas sólidas (la erosión descarta huecos finos entre trazos).
+    # Si el propio papel ya está saturado (p.ej. un escaneo) no hay reflejo que distinguir.
+    nivel_papel = float(np.percentile(gris, 75))
+    if nivel_papel >= 245:
+        reflejo = 0.0
+    else:
+        saturados = (gris >= 250).astype(np.uint8)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
+        manchas = cv2.erode(saturados, kernel)
+        reflejo = float(manchas.mean())
+
+    return {"nitidez": nitidez, "brillo": brillo, "reflejo": reflejo}
+
+
+def medir_cobertura(imagen: np.ndarray, contorno: Optional[np.ndarray] = None) -> float:
+    """
+    Fracción del encuadre ocupada por el documento.
+
+    Si hay un contorno válido se usa su área; si no (planilla sin fondo
+    visible), se estima como la región clara más grande tras umbral de Otsu.
+
+    Args:
+        imagen:   Imagen reducida (BGR o escala de grises)
+        contorno: Contorno de 4 puntos del documento (opcional)
+
+    Returns:
+        Cobertura entre 0.0 y 1.0
+    """
+    if len(imagen.shape) == 3:
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    else:
+        gris = imagen
+    alto, ancho = gris.shape[:2]
+    area_total = float(alto * ancho)
+
+    if contorno is not None:
+        return cv2.contourArea(contorno) / area_total
+
+    _, claro = cv2.threshold(gris, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))
+    claro = cv2.morphologyEx(claro, cv2.MORPH_CLOSE, kernel)
+    num, _, stats, _ = cv2.connectedComponentsWithStats(claro)
+    if num <= 1:
+        return 0.0
+    return float(stats[1:, cv2.CC_STAT_AREA].max()) / area_total
+
+
+def evaluar_calidad(metricas: Dict[str, float],
+                    umbrales: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Compara las métricas contra los umbrales y decide si la imagen es utilizable.
+    Las métricas ausentes (p.ej. cobertura antes de buscar el contorno) se omiten.
+
+    Returns:
+        {'aceptada': bool, 'motivos': [códigos], 'metricas': {...}}
+    """
+    umbrales = umbrales or UMBRALES_CALIDAD
+    motivos = []
+
+    for metrica, clave, sentido, motivo in _REGLAS:
+        if metrica not in metricas or clave not in umbrales:
+            continue
+        valor = metricas[metrica]
+        if sentido == "min" and valor < umbrales[clave]:
+            motivos.append(motivo)
+        elif sentido == "max" and valor > umbrales[clave]:
+            motivos.append(motivo)
+
+    return {"aceptada": not motivos, "motivos": motivos, "metricas": dict(metricas)}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CALIBRACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _mejor_umbral(buenos: List[float], malos: List[float], sentido: str) -> Optional[float]:
+    """
+    Busca el umbral que maximiza el índice de Youden (sensibilidad + especificidad - 1)
+    separando imágenes buenas de malas para una sola métrica.
+    """
+    if not buenos or not malos:
+        return None
+
+    valores = sorted(set(buenos + malos))
+    # Candidatos: puntos medios entre valores consecutivos
+    candidatos = [(a + b) / 2 for a, b in zip(valores, valores[1:])] or valores
+
+    mejor, mejor_j = None, -1.0
+    for t in candidatos:
+        if sentido == "min":
+            rechazo_malos = sum(1 for v in malos if v < t) / len(malos)
+            acepta_buenos = sum(1 for v in buenos if v >= t) / len(buenos)
+        else:
+            rechazo_malos = sum(1 for v in malos if v > t) / len(malos)
+            acepta_buenos = sum(1 for v in buenos if v <= t) / len(buenos)
+        j = rechazo_malos + acepta_buenos - 1
+        if j > mejor_j:
+            mejor, mejor_j = t, j
+    return mejor
+
+
+def calibrar_umbrales(muestras: List[Tuple[Dict[str, float], str]]) -> Dict[str, float]:
+    """
+    Calibra los umbrales a partir de una muestra etiquetada.
+
+    Args:
+        muestras: Lista de (metricas, etiqueta). La etiqueta es "ok" o un código
+                  de motivo. Cada umbral se ajusta solo con las imágenes "ok"
+                  frente a las etiquetadas con SU motivo (una foto borrosa no
+                  dice nada del umbral de brillo); las etiquetas que no son un
+                  código de motivo se ignoran.
+
+    Returns:
+        Diccionario de umbrales (los no calibrables conservan el valor por defecto)
+    """
+    umbrales = dict(UMBRALES_CALIDAD)
+    buenas = [m for m, etiqueta in muestras if etiqueta.lower() == "ok"]
+    malas = [(m, etiqueta.upper()) for m, etiqueta in muestras if etiqueta.lower() != "ok"]
+
+    codigos = {motivo for _, _, _, motivo in _REGLAS}
+    desconocidas = sorted({e for _, e in malas if e not in codigos})
+    if desconocidas:
+        print(f"[ADVERTENCIA] Etiquetas sin código de motivo (se ignoran): {', '.join(desconocidas)}")
+
+    for metrica, clave, sentido, motivo in _REGLAS:
+        con_motivo = [m for m, e in malas if e == motivo]
+        valores_buenos = [m[metrica] for m in buenas if metrica in m]
+        valores_malos = [m[metrica] for m in con_motivo if metrica in m]
+        umbral = _mejor_umbral(valores_buenos, valores_malos, sentido)
+        if umbral is not None:
+            umbrales[clave] = round(umbral, 4)
+            print(f"[INFO] Umbral calibrado {clave}: {umbral:.4f}")
+        else:
+            print(f"[ADVERTENCIA] Sin muestras suficientes para {clave}, se conserva {umbrales[clave]}")
+
+    return umbrales
+
+
+def medir_imagen(ruta_imagen: str) -> Optional[Dict[str, float]]:
+    """Calcula todas las métricas de calidad de una imagen en disco (para calibración)."""
+    from preprocesamiento import redimensionar_imagen, preprocesar_imagen, detectar_bordes
+    from geometria import encontrar_contorno_documento
+
+    imagen = cv2.imread(ruta_imagen)
+    if imagen is None:
+        print(f"[ERROR] No se pudo cargar la imagen: {ruta_imagen}")
+        return None
+
+    reducida, _ = redimensionar_imagen(imagen, ancho_objetivo=500)
+    metricas = medir_calidad_fotometrica(reducida)
+
+    contorno = encontrar_contorno_documento(detectar_bordes(preprocesar_imagen(reducida)))
+    alto, ancho = reducida.shape[:2]
+    if contorno is not None and cv2.contourArea(contorno) / (alto * ancho) <= 0.50:
+        contorno = None
+    metricas["cobertura"] = medir_cobertura(reducida, contorno)
+    return metricas
+
+
+def main():
+    """
+    Punto de entrada para calibrar umbrales desde línea de comandos.
+    Uso: python calidad.py calibrar <etiquetas.csv> [salida.json]
+    """
+    if len(sys.argv) < 3 or sys.argv[1] != "calibrar":
+        print("Uso: python calidad.py calibrar <etiquetas.csv> [salida.json]")
+        print("\nEl CSV debe tener columnas: ruta,etiqueta (ok o código de motivo)")
+        sys.exit(1)
+
+    ruta_csv = sys.argv[2]
+    ruta_salida = sys.argv[3] if len(sys.argv) > 3 else "umbrales_calidad.json"
+
+    muestras = []
+    with open(ruta_csv, "r", encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            metricas = medir_imagen(fila["ruta"])
+            if metricas is not None:
+                muestras.append((metricas, fila["etiqueta"].strip()))
+
+    print(f"\n[INFO] {len(muestras)} imágenes medidas")
+    umbrales = calibrar_umbrales(muestras)
+
+    with open(ruta_salida, "w", encoding="utf-8") as f:
+        json.dump(umbrales, f, indent=2)
+    print(f"[ÉXITO] Umbrales guardados en: {ruta_salida}")
+
+
+if __name__ == "__main__":
+    main()
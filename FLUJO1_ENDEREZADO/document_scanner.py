@@ -8,6 +8,8 @@ Módulos utilizados:
   - preprocesamiento.py → redimensionar_imagen, preprocesar_imagen, detectar_bordes
   - geometria.py      → encontrar_contorno_documento, transformacion_perspectiva
   - efectos.py        → aplicar_efecto_escaner
+  - calidad.py        → medir_calidad_fotometrica, medir_cobertura, evaluar_calidad
+  - duplicados.py     → calcular_phash
 """
 
 import cv2
@@ -19,21 +21,29 @@ from utils import crear_carpetas_salida
 from preprocesamiento import redimensionar_imagen, preprocesar_imagen, detectar_bordes
 from geometria import encontrar_contorno_documento, transformacion_perspectiva
 from efectos import aplicar_efecto_escaner
+from calidad import medir_calidad_fotometrica, medir_cobertura, evaluar_calidad
+from duplicados import calcular_phash
 
 
 def escanear_documento(ruta_imagen: str, mostrar_pasos: bool = False,
                        guardar_proceso: bool = False,
                        carpeta_proceso: str = "proceso",
-                       modo_efecto: str = "blanco_negro") -> Optional[object]:
+                       modo_efecto: str = "blanco_negro",
+                       control_calidad: bool = False,
+                       umbrales_calidad: Optional[dict] = None,
+                       rechazar_calidad: bool = False,
+                       diagnostico: Optional[dict] = None) -> Optional[object]:
     """
     Ejecuta el pipeline completo de escaneo de documentos.
 
     Pasos:
     1. Carga la imagen original
     2. Redimensiona para procesamiento rápido
+       (control de calidad: nitidez, exposición y reflejos)
     3. Preprocesa (grises + desenfoque)
     4. Detecta bordes (Canny)
     5. Encuentra contorno del documento
+       (control de calidad: cobertura del documento)
     6. Escala puntos a resolución original
     7. Aplica transformación de perspectiva
     8. Aplica efecto escáner
@@ -43,10 +53,21 @@ def escanear_documento(ruta_imagen: str, mostrar_pasos: bool = False,
         mostrar_pasos:   Si True, muestra imágenes intermedias en pantalla
         guardar_proceso: Si True, guarda las imágenes de cada paso
         carpeta_proceso: Carpeta donde guardar las imágenes del proceso
+        control_calidad: Si True, mide la calidad de la foto y avisa si no llega
+                         a los umbrales
+        umbrales_calidad: Umbrales de calidad (por defecto calidad.UMBRALES_CALIDAD)
+        rechazar_calidad: Si True (y control_calidad), además descarta la foto
+                          (devuelve None) en lugar de solo avisar; conviene
+                          solo con umbrales calibrados (calidad.py calibrar)
+        diagnostico:     Diccionario opcional donde se dejan el reporte de calidad
+                         (clave 'calidad') y el hash perceptual (clave 'phash')
 
     Returns:
-        Imagen del documento escaneado (numpy array) o None si falla
+        Imagen del documento escaneado (numpy array) o None si falla o se rechaza
     """
+    if diagnostico is None:
+        diagnostico = {}
+
     print("\n" + "="*70)
     print("INICIANDO PROCESO DE ESCANEO DE DOCUMENTO")
     print("="*70 + "\n")
@@ -61,6 +82,16 @@ def escanear_documento(ruta_imagen: str, mostrar_pasos: bool = False,
     # 2. Redimensionar para procesamiento rápido
     imagen_procesamiento, ratio = redimensionar_imagen(imagen_original, ancho_objetivo=500)
 
+    # 2.1 Control de calidad fotométrico (barato, antes de cualquier llamada a Azure)
+    metricas_calidad = {}
+    if control_calidad:
+        metricas_calidad = medir_calidad_fotometrica(imagen_procesamiento)
+        reporte = evaluar_calidad(metricas_calidad, umbrales_calidad)
+        diagnostico['calidad'] = reporte
+        if not reporte['aceptada'] and rechazar_calidad:
+            _reportar_rechazo(reporte)
+            return None
+
     # 3. Preprocesamiento (grises + filtro gaussiano)
     imagen_gris = preprocesar_imagen(imagen_procesamiento)
     if mostrar_pasos:
@@ -94,6 +125,23 @@ def escanear_documento(ruta_imagen: str, mostrar_pasos: bool = False,
         else:
             print(f"[INFO] Contorno descartado: solo {ratio_area*100:.1f}% del area (contenido interno)")
 
+    # 5.1 Control de calidad: cobertura del documento dentro del encuadre
+    if control_calidad:
+        metricas_calidad['cobertura'] = medir_cobertura(
+            imagen_procesamiento, contorno_documento if contorno_valido else None
+        )
+        reporte = evaluar_calidad(metricas_calidad, umbrales_calidad)
+        diagnostico['calidad'] = reporte
+        if not reporte['aceptada']:
+            if rechazar_calidad:
+                _reportar_rechazo(reporte)
+                return None
+            _reportar_aviso(reporte)
+        else:
+            print(f"[INFO] Control de calidad superado "
+                  f"(nitidez={metricas_calidad['nitidez']:.0f}, brillo={metricas_calidad['brillo']:.0f}, "
+                  f"reflejo={metricas_calidad['reflejo']:.2f}, cobertura={metricas_calidad['cobertura']:.2f})")
+
     if contorno_valido:
         # CASO A: Documento sobre fondo -> correccion de perspectiva
         print("[CASO A] Documento con fondo detectado -> correccion de perspectiva")
@@ -128,6 +176,9 @@ def escanear_documento(ruta_imagen: str, mostrar_pasos: bool = False,
 
         documento_enderezado = imagen_original.copy()
 
+    # 7.1 Hash perceptual del documento enderezado (detección de fotos repetidas)
+    diagnostico['phash'] = calcular_phash(documento_enderezado)
+
     if mostrar_pasos:
         cv2.imshow("4. Documento Enderezado", documento_enderezado)
     if guardar_proceso:
@@ -156,6 +207,21 @@ def escanear_documento(ruta_imagen: str, mostrar_pasos: bool = False,
     return documento_escaneado
 
 
+def _reportar_rechazo(reporte: dict):
+    """Imprime el motivo de rechazo del control de calidad."""
+    metricas = ", ".join(f"{k}={v:.2f}" for k, v in reporte['metricas'].items())
+    print(f"[RECHAZO] Imagen no utilizable: {', '.join(reporte['motivos'])}")
+    print(f"[RECHAZO] Métricas: {metricas}")
+    print("[SUGERENCIA] Vuelve a tomar la foto con buena luz, sin reflejos y con el acta completa")
+
+
+def _reportar_aviso(reporte: dict):
+    """Imprime los motivos del control de calidad cuando solo avisa (no rechaza)."""
+    metricas = ", ".join(f"{k}={v:.2f}" for k, v in reporte['metricas'].items())
+    print(f"[ADVERTENCIA] Calidad dudosa: {', '.join(reporte['motivos'])} (se procesa igual)")
+    print(f"[ADVERTENCIA] Métricas: {metricas}")
+
+
 def main():
     """
     Punto de entrada para ejecutar el script desde línea de comandos.
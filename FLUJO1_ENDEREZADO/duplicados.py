@@ -0,0 +1,147 @@
+"""
+Detección de fotos duplicadas para FLUJO 1 - Enderezado de documentos.
+Calcula un hash perceptual (pHash) sobre el documento enderezado y reducido
+del FLUJO 1 y lo compara contra un índice local de documentos ya procesados.
+Una coincidencia es solo un POSIBLE duplicado: el hash no confirma que los
+números escritos sean los mismos, así que reutilizar los resultados del otro
+documento (en lugar de volver a pagar Azure/OpenAI) es una decisión explícita
+del que procesa el lote.
+
+Nota: todas las actas comparten el mismo formato impreso, así que un pHash
+clásico de 64 bits no distingue una acta de otra (solo cambia la letra
+manuscrita). Por eso se usa el bloque de 32x32 frecuencias bajas (1024 bits)
+y se calcula DESPUÉS de corregir la perspectiva, cuando el encuadre ya no influye.
+"""
+
+import json
+import os
+import time
+import cv2
+import numpy as np
+from typing import Optional, List
+
+
+# Lado del bloque de frecuencias bajas (LADO_HASH² bits)
+LADO_HASH = 32
+
+# Distancia de Hamming máxima (de 1024 bits) para considerar dos fotos como la misma acta.
+# Actas distintas con 1, 3 y 6 números cambiados midieron 76, 92 y 112: el umbral
+# queda muy por debajo y aun así solo marca posibles duplicados.
+UMBRAL_HAMMING = 40
+
+
+def calcular_phash(imagen: np.ndarray, lado: int = LADO_HASH) -> int:
+    """
+    Calcula el hash perceptual (pHash) de una imagen.
+
+    Pasos:
+    1. Escala de grises y reducción a (4·lado)x(4·lado)
+    2. DCT 2D y se conservan las lado x lado frecuencias más bajas
+    3. Cada bit indica si el coeficiente supera la mediana (sin el término DC)
+
+    Args:
+        imagen: Documento enderezado del FLUJO 1 (BGR o escala de grises)
+        lado:   Lado del bloque de frecuencias (el hash tiene lado² bits)
+
+    Returns:
+        Hash como entero de lado² bits
+    """
+    if len(imagen.shape) == 3:
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    else:
+        gris = imagen
+
+    pequena = cv2.resize(gris, (4 * lado, 4 * lado), interpolation=cv2.INTER_AREA).astype(np.float32)
+    bajas = cv2.dct(pequena)[:lado, :lado].flatten()
+    mediana = np.median(bajas[1:])
+
+    hash_valor = 0
+    for bit in bajas > mediana:
+        hash_valor = (hash_valor << 1) | int(bit)
+    return hash_valor
+
+
+def distancia_hamming(hash_a: int, hash_b: int) -> int:
+    """Número de bits distintos entre dos hashes."""
+    return bin(hash_a ^ hash_b).count("1")
+
+
+class IndiceDuplicados:
+    """
+    Índice local (JSON) de hashes perceptuales de documentos ya procesados.
+
+    Uso básico:
+        indice = IndiceDuplicados("resultados/indice_phash.json")
+        previo = indice.buscar(phash)
+        ...
+        indice.registrar(phash, "A1", "resultados/A1", "resultados/A1/A1_datos.txt")
+    """
+
+    def __init__(self, ruta_indice: str, umbral: int = UMBRAL_HAMMING):
+        """
+        Args:
+            ruta_indice: Archivo JSON donde se persiste el índice
+            umbral:      Distancia de Hamming máxima para considerar duplicado (de 1024 bits)
+        """
+        self.ruta_indice = ruta_indice
+        self.umbral = umbral
+        self.entradas: List[dict] = []
+
+        if os.path.exists(ruta_indice):
+            try:
+                with open(ruta_indice, "r", encoding="utf-8") as f:
+                    self.entradas = json.load(f)
+                print(f"[INFO] Índice de duplicados cargado: {len(self.entradas)} documentos")
+            except Exception as e:
+                print(f"[ADVERTENCIA] No se pudo leer el índice de duplicados: {e}")
+                self.entradas = []
+
+    def buscar(self, phash: int, excluir_documento: Optional[str] = None) -> Optional[dict]:
+        """
+        Busca el documento ya procesado más parecido dentro del umbral.
+
+        Args:
+            phash:             Hash de la imagen nueva
+            excluir_documento: Nombre a ignorar (reprocesar el mismo archivo no es duplicado)
+
+        Returns:
+            Entrada del índice con la clave 'distancia' agregada, o None
+        """
+        mejor, mejor_dist = None, self.umbral + 1
+        for entrada in self.entradas:
+            if entrada["documento"] == excluir_documento:
+                continue
+            dist = distancia_hamming(phash, int(entrada["phash"], 16))
+            if dist < mejor_dist:
+                mejor, mejor_dist = entrada, dist
+
+        if mejor is None:
+            return None
+        return dict(mejor, distancia=mejor_dist)
+
+    def registrar(self, phash: int, documento: str, carpeta: str,
+                  archivo_toon: Optional[str], llamadas_openai: int = 0,
+                  tokens: int = 0):
+        """Agrega (o reemplaza) un documento procesado y persiste el índice."""
+        self.entradas = [e for e in self.entradas if e["documento"] != documento]
+        self.entradas.append({
+            "phash": f"{phash:x}",
+            "documento": documento,
+            "carpeta": carpeta,
+            "archivo_toon": archivo_toon,
+            "llamadas_openai": llamadas_openai,
+            "tokens": tokens,
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self.guardar()
+
+    def guardar(self):
+        """Persiste el índice en disco."""
+        try:
+            carpeta = os.path.dirname(self.ruta_indice)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            with open(self.ruta_indice, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"[ERROR] No se pudo guardar el índice de duplicados: {e}")
@@ -3,49 +3,72 @@ Análisis de documentos con Azure AI para FLUJO 2 - Extracción de tablas.
 Contiene las funciones de análisis y extracción de datos de tablas.
 """
 
-from typing import Optional, List
+import time
+from typing import Callable, Optional, List, Iterator, Tuple
+
+from indice_layout import obtener_indice_layout
+from resultado_compacto import ResultadoCompacto, cargar_json, desde_json_crudo
 
 try:
     from azure.ai.documentintelligence import DocumentIntelligenceClient
     from azure.ai.documentintelligence.models import AnalyzeResult
+    from azure.core.rest import HttpRequest
 except ImportError:
     # Definir tipos dummy para evitar errores de referencia si no existe la librería
     DocumentIntelligenceClient = object 
     AnalyzeResult = object
+    HttpRequest = None
+
 
+# Modo lote: versión de la API y parámetros del sondeo adaptativo
+API_VERSION = "2024-11-30"
+MAX_EN_VUELO = 8            # Análisis simultáneos como máximo (evita 429)
+INTERVALO_INICIAL = 1.0     # Segundos hasta el primer sondeo de cada operación
+INTERVALO_MAXIMO = 8.0      # Tope del intervalo entre sondeos
+FACTOR_INTERVALO = 1.5      # Crecimiento del intervalo mientras sigue en curso
+ESPERA_MAXIMA = 300.0       # Segundos como máximo esperando una operación individual
+REINTENTOS_429 = 3          # Reintentos al enviar si el servicio responde 429
 
-def analizar_documento(client: DocumentIntelligenceClient, ruta_imagen: str) -> Optional[AnalyzeResult]:
+
+def analizar_documento(client: DocumentIntelligenceClient, ruta_imagen: str,
+                       mientras_espera: Optional[Callable[[], None]] = None) -> Optional[ResultadoCompacto]:
     """
     Envía la imagen a Azure AI Document Intelligence para análisis.
 
     Args:
         client: Cliente inicializado de Azure AI
         ruta_imagen: Ruta al archivo de imagen
+        mientras_espera: Trabajo local opcional que se ejecuta una vez enviada
+                         la imagen, mientras el servicio la analiza
 
     Returns:
-        Resultado del análisis o None si falla
+        Resultado del análisis (ResultadoCompacto, misma interfaz que
+        AnalyzeResult para tablas y párrafos) o None si falla
+
+    Se envía y se sondea con peticiones HTTP directas (como en el lote), así
+    el cuerpo de la respuesta solo se decodifica una vez con desde_json_crudo
+    y nunca se arman los modelos del SDK.
     """
     print("\n" + "="*70)
     print("INICIANDO ANÁLISIS CON AZURE AI DOCUMENT INTELLIGENCE")
     print("="*70 + "\n")
 
     try:
-        with open(ruta_imagen, "rb") as f:
-            imagen_bytes = f.read()
-
-        print(f"[INFO] Imagen cargada: {ruta_imagen}")
-        print(f"[INFO] Tamaño del archivo: {len(imagen_bytes)} bytes")
+        print(f"[INFO] Imagen: {ruta_imagen}")
         print("[INFO] Enviando imagen a Azure AI...")
         print("[INFO] Modelo: prebuilt-layout")
 
-        poller = client.begin_analyze_document(
-            model_id="prebuilt-layout",
-            body=imagen_bytes,
-            content_type="application/octet-stream"
-        )
+        url = iniciar_analisis(client, ruta_imagen)
+        if url is None:
+            return None
+
+        if mientras_espera is not None:
+            _ejecutar_mientras_espera(mientras_espera)
 
         print("[INFO] Esperando respuesta de Azure AI...")
-        resultado = poller.result()
+        resultado = esperar_resultado(client, url)
+        if resultado is None:
+            return None
 
         print("[INFO] Análisis completado exitosamente")
 
@@ -61,6 +84,181 @@ def analizar_documento(client: DocumentIntelligenceClient, ruta_imagen: str) ->
         return None
 
 
+def _ejecutar_mientras_espera(tarea: Callable, *args):
+    """Ejecuta el trabajo local de la espera; si falla, el análisis sigue igual."""
+    try:
+        tarea(*args)
+    except Exception as e:
+        print(f"[ADVERTENCIA] Falló el trabajo local durante la espera de Azure: {str(e)}")
+
+
+def iniciar_analisis(client: DocumentIntelligenceClient, ruta_imagen: str) -> Optional[str]:
+    """
+    Envía la imagen a Azure AI SIN esperar el resultado.
+
+    Args:
+        client: Cliente inicializado de Azure AI
+        ruta_imagen: Ruta al archivo de imagen
+
+    Returns:
+        URL de la operación (Operation-Location) para sondearla, o None si falla
+    """
+    try:
+        with open(ruta_imagen, "rb") as f:
+            imagen_bytes = f.read()
+
+        for intento in range(REINTENTOS_429 + 1):
+            peticion = HttpRequest(
+                "POST", f"/documentModels/prebuilt-layout:analyze?api-version={API_VERSION}",
+                headers={"Content-Type": "application/octet-stream"},
+                content=imagen_bytes
+            )
+            respuesta = client.send_request(peticion)
+            if respuesta.status_code == 429 and intento < REINTENTOS_429:
+                espera = float(respuesta.headers.get("Retry-After", 2))
+                print(f"[ADVERTENCIA] Azure limitó la petición (429), reintentando en {espera:.0f}s...")
+                time.sleep(espera)
+                continue
+            respuesta.raise_for_status()
+            return respuesta.headers["Operation-Location"]
+
+    except Exception as e:
+        print(f"[ERROR] No se pudo enviar {ruta_imagen} a Azure AI: {str(e)}")
+    return None
+
+
+def esperar_resultado(client: DocumentIntelligenceClient, url: str,
+                      espera_maxima: float = ESPERA_MAXIMA) -> Optional[ResultadoCompacto]:
+    """
+    Sondea una operación hasta que termina, con el mismo intervalo adaptativo
+    que el lote (INTERVALO_INICIAL creciendo hasta INTERVALO_MAXIMO) y
+    respetando Retry-After.
+
+    Args:
+        client: Cliente inicializado de Azure AI
+        url: Operation-Location devuelta por iniciar_analisis
+        espera_maxima: Segundos como máximo antes de darla por fallida
+
+    Returns:
+        ResultadoCompacto armado desde el JSON crudo, o None si el análisis
+        falla o no termina dentro de espera_maxima
+    """
+    limite = time.time() + espera_maxima
+    intervalo = INTERVALO_INICIAL
+    while True:
+        if time.time() + intervalo > limite:
+            print(f"[ERROR] El análisis no terminó en {espera_maxima:.0f}s; se abandona la operación")
+            return None
+        time.sleep(intervalo)
+        respuesta = client.send_request(HttpRequest("GET", url))
+        respuesta.raise_for_status()
+        cuerpo = cargar_json(respuesta.content)
+        estado = cuerpo.get("status")
+        if estado == "succeeded":
+            return desde_json_crudo(cuerpo)
+        if estado not in ("notStarted", "running"):
+            print(f"[ERROR] Análisis fallido ({estado}): {cuerpo.get('error')}")
+            return None
+        retry_after = float(respuesta.headers.get("Retry-After", 0) or 0)
+        intervalo = max(min(intervalo * FACTOR_INTERVALO, INTERVALO_MAXIMO), retry_after)
+
+
+def analizar_documentos_lote(client: DocumentIntelligenceClient, rutas_imagenes: List[str],
+                             max_en_vuelo: int = MAX_EN_VUELO,
+                             mientras_espera: Optional[Callable[[List[int]], None]] = None
+                             ) -> Iterator[Tuple[int, Optional[ResultadoCompacto], float]]:
+    """
+    Analiza varias imágenes solapando el procesamiento del servicio:
+    envía hasta max_en_vuelo documentos de una vez y sondea todas las
+    operaciones con un intervalo adaptativo. Cada resultado se entrega en
+    cuanto termina, sin esperar al resto del lote.
+
+    Intervalo adaptativo: cada operación empieza con INTERVALO_INICIAL y lo
+    multiplica por FACTOR_INTERVALO (hasta INTERVALO_MAXIMO) mientras siga en
+    curso; cuando una termina, las demás vuelven al intervalo inicial porque
+    probablemente estén por terminar también. Se respeta Retry-After.
+
+    Args:
+        client: Cliente inicializado de Azure AI
+        rutas_imagenes: Imágenes a analizar
+        max_en_vuelo: Operaciones simultáneas como máximo
+        mientras_espera: Trabajo local opcional; antes de cada espera recibe los
+                         índices enviados desde la llamada anterior, que siguen
+                         en análisis mientras se ejecuta
+
+    Yields:
+        (índice en rutas_imagenes, ResultadoCompacto o None si falló, segundos de pared)
+    """
+    print("\n" + "="*70)
+    print(f"ANÁLISIS EN LOTE CON AZURE AI DOCUMENT INTELLIGENCE ({len(rutas_imagenes)} documentos)")
+    print("="*70 + "\n")
+
+    siguiente = 0
+    en_vuelo = {}  # índice -> {'url', 'inicio', 'intervalo', 'proximo'}
+    recien_enviados = []
+
+    while siguiente < len(rutas_imagenes) or en_vuelo:
+        # Mantener la ventana de envíos llena
+        while siguiente < len(rutas_imagenes) and len(en_vuelo) < max_en_vuelo:
+            idx = siguiente
+            siguiente += 1
+            inicio = time.time()
+            url = iniciar_analisis(client, rutas_imagenes[idx])
+            if url is None:
+                yield idx, None, time.time() - inicio
+                continue
+            print(f"[INFO] Enviado ({idx + 1}/{len(rutas_imagenes)}): {rutas_imagenes[idx]}")
+            en_vuelo[idx] = {"url": url, "inicio": inicio, "intervalo": INTERVALO_INICIAL,
+                             "proximo": time.time() + INTERVALO_INICIAL}
+            recien_enviados.append(idx)
+
+        if not en_vuelo:
+            continue
+
+        if mientras_espera is not None and recien_enviados:
+            _ejecutar_mientras_espera(mientras_espera, recien_enviados)
+            recien_enviados = []
+
+        # Esperar hasta el próximo sondeo pendiente
+        idx = min(en_vuelo, key=lambda i: en_vuelo[i]["proximo"])
+        operacion = en_vuelo[idx]
+        espera = operacion["proximo"] - time.time()
+        if espera > 0:
+            time.sleep(espera)
+
+        resultado, terminado = None, True
+        try:
+            respuesta = client.send_request(HttpRequest("GET", operacion["url"]))
+            respuesta.raise_for_status()
+            cuerpo = cargar_json(respuesta.content)
+            estado = cuerpo.get("status")
+            if estado in ("notStarted", "running"):
+                terminado = False
+                operacion["intervalo"] = min(operacion["intervalo"] * FACTOR_INTERVALO, INTERVALO_MAXIMO)
+                retry_after = float(respuesta.headers.get("Retry-After", 0) or 0)
+                operacion["no_antes"] = time.time() + retry_after
+                operacion["proximo"] = time.time() + max(operacion["intervalo"], retry_after)
+            elif estado == "succeeded":
+                resultado = desde_json_crudo(cuerpo)
+            else:
+                print(f"[ERROR] Análisis fallido ({estado}): {rutas_imagenes[idx]} — {cuerpo.get('error')}")
+        except Exception as e:
+            print(f"[ERROR] Error al sondear {rutas_imagenes[idx]}: {str(e)}")
+
+        if terminado:
+            del en_vuelo[idx]
+            segundos = time.time() - operacion["inicio"]
+            if resultado is not None:
+                print(f"[INFO] Análisis completado ({segundos:.2f}s): {rutas_imagenes[idx]}")
+            # Las demás probablemente estén por terminar: reiniciar su intervalo
+            ahora = time.time()
+            for otra in en_vuelo.values():
+                otra["intervalo"] = INTERVALO_INICIAL
+                otra["proximo"] = max(otra.get("no_antes", 0),
+                                      min(otra["proximo"], ahora + INTERVALO_INICIAL))
+            yield idx, resultado, segundos
+
+
 def extraer_tablas_interes(resultado: AnalyzeResult, texto_encabezado: Optional[list[str]] = None, filas_tabla2: int = 16) -> List[List[float]]:
     """
     Extrae las tablas de interés:
@@ -161,46 +359,23 @@ def extraer_tablas_interes(resultado: AnalyzeResult, texto_encabezado: Optional[
     tabla3_polygon = None
     encabezado_region = None
     texto_encontrado = ""
-    
-    if texto_encabezado and hasattr(resultado, 'paragraphs'):
-        # Buscar frases en orden de prioridad (la primera de la lista es la más importante)
-        for frase_objetivo in texto_encabezado:
-            for paragraph in resultado.paragraphs:
-                content = paragraph.content
-                if frase_objetivo.lower() in content.lower():
-                    if not paragraph.bounding_regions: continue
-                    encabezado_region = paragraph.bounding_regions[0].polygon
-                    texto_encontrado = content.strip()
-                    print(f"[INFO] Encabezado encontrado (Prioridad '{frase_objetivo}'): '{texto_encontrado}'")
-                    break
-            
-            # Si encontramos la frase de mayor prioridad, dejamos de buscar
-            if encabezado_region:
-                break
-    
+
+    # Índice de layout (se construye una vez y lo reutiliza FLUJO 3)
+    indice = obtener_indice_layout(resultado)
+
+    if texto_encabezado:
+        # Frases en orden de prioridad (la primera de la lista es la más importante)
+        encontrado = indice.buscar_frase(texto_encabezado)
+        if encontrado:
+            frase_objetivo, contenido, encabezado_region = encontrado
+            texto_encontrado = contenido.strip()
+            print(f"[INFO] Encabezado encontrado (Prioridad '{frase_objetivo}'): '{texto_encontrado}'")
+
     major_candidato_tabla = None
-    
+
     if encabezado_region:
-        y_min_encabezado = min(encabezado_region[1], encabezado_region[3], encabezado_region[5], encabezado_region[7])
-        y_max_encabezado = max(encabezado_region[1], encabezado_region[3], encabezado_region[5], encabezado_region[7])
-        x_min_encabezado = min(encabezado_region[0], encabezado_region[2], encabezado_region[4], encabezado_region[6])
-
-        distancia_minima = float('inf')
-
-        for i, tabla in enumerate(resultado.tables):
-            if not tabla.bounding_regions: continue
-            region_tabla = tabla.bounding_regions[0].polygon
-            y_min_tabla = min(region_tabla[1], region_tabla[3], region_tabla[5], region_tabla[7])
-            x_min_tabla = min(region_tabla[0], region_tabla[2], region_tabla[4], region_tabla[6])
-
-            # Debe estar debajo del encabezado
-            if y_min_tabla >= y_min_encabezado:
-                distancia = y_min_tabla - y_max_encabezado
-                alineado = abs(x_min_tabla - x_min_encabezado) < 500
-                
-                if alineado and distancia < distancia_minima:
-                    distancia_minima = distancia
-                    major_candidato_tabla = region_tabla
+        # Tabla más cercana debajo del encabezado y alineada con él
+        major_candidato_tabla = indice.tabla_debajo(encabezado_region, tolerancia_x=500)
 
     if major_candidato_tabla:
         # Expandir hacia encabezado
@@ -227,20 +402,14 @@ def extraer_tablas_interes(resultado: AnalyzeResult, texto_encabezado: Optional[
         
         print(f"[INFO] Buscando límite inferior para Tabla 3: {texto_limite_inferior[0]}...")
         
-        if hasattr(resultado, 'paragraphs'):
-            for frase_corte in texto_limite_inferior:
-                for paragraph in resultado.paragraphs:
-                    if frase_corte.lower() in paragraph.content.lower():
-                        if paragraph.bounding_regions:
-                            region_corte = paragraph.bounding_regions[0].polygon
-                            # Tomar el borde SUPERIOR de este texto como el límite INFERIOR de la tabla
-                            # polygon = [x1, y1, x2, y2, x3, y3, x4, y4] -> y1, y2 son tops (aprox)
-                            y_corte_inferior = min(region_corte[1], region_corte[3], region_corte[5], region_corte[7])
-                            print(f"[INFO] Límite inferior encontrado ('{frase_corte}'): Y={y_corte_inferior}")
-                            break
-                if y_corte_inferior:
-                    break
-        
+        encontrado = indice.buscar_frase(texto_limite_inferior)
+        if encontrado:
+            frase_corte, _, region_corte = encontrado
+            # Tomar el borde SUPERIOR de este texto como el límite INFERIOR de la tabla
+            # polygon = [x1, y1, x2, y2, x3, y3, x4, y4] -> y1, y2 son tops (aprox)
+            y_corte_inferior = min(region_corte[1], region_corte[3], region_corte[5], region_corte[7])
+            print(f"[INFO] Límite inferior encontrado ('{frase_corte}'): Y={y_corte_inferior}")
+
         # Calcular límites actuales de la tabla (ya expandida arriba)
         y_coords = [tabla3_polygon[i] for i in range(1, len(tabla3_polygon), 2)]
         y_min_t3 = min(y_coords) # Arriba (encabezado)
@@ -0,0 +1,138 @@
+"""
+Benchmark de serialización del AnalyzeResult - FLUJO 2
+=======================================================
+Compara tamaño y tiempo de ida y vuelta de:
+  - pickle del AnalyzeResult del SDK
+  - JSON indentado (as_dict)
+  - Formatos compactos de resultado_compacto.py (msgpack / zstd / gzip)
+  - pickle del ResultadoCompacto
+
+Uso:
+    python benchmark_serializacion.py                    # acta sintética
+    python benchmark_serializacion.py respuesta.json     # JSON crudo de Document Intelligence
+"""
+
+import json
+import pickle
+import random
+import sys
+import time
+
+from azure.ai.documentintelligence.models import AnalyzeResult
+
+import resultado_compacto as rc
+from analisis_azure import extraer_tablas_interes
+
+REPETICIONES = 20
+
+
+def _region(x: float, y: float, ancho: float, alto: float) -> dict:
+    return {"pageNumber": 1, "polygon": [x, y, x + ancho, y, x + ancho, y + alto, x, y + alto]}
+
+
+def _palabra_o_linea(texto: str, x: float, y: float) -> dict:
+    return {"content": texto, "polygon": _region(x, y, 80, 20)["polygon"],
+            "confidence": 0.95, "span": {"offset": 0, "length": len(texto)}}
+
+
+def acta_sintetica(semilla: int = 0) -> dict:
+    """analyzeResult con el tamaño aproximado de una acta real (3 tablas, palabras, líneas)."""
+    aleatorio = random.Random(semilla)
+    palabras = ["Setecientos", "cuarenta", "y", "dos", "742", "Boletas", "sobrantes", "TOTAL"]
+
+    tablas = []
+    for t, (filas, columnas, y0) in enumerate([(8, 4, 300), (16, 4, 700), (2, 4, 1500)]):
+        celdas = []
+        for f in range(filas):
+            for c in range(columnas):
+                celdas.append({
+                    "kind": "content", "rowIndex": f, "columnIndex": c,
+                    "content": " ".join(aleatorio.choices(palabras, k=aleatorio.randint(1, 4))),
+                    "boundingRegions": [_region(100 + c * 250, y0 + f * 40, 250, 40)],
+                    "spans": [{"offset": aleatorio.randint(0, 5000), "length": 12}],
+                })
+        tablas.append({"rowCount": filas, "columnCount": columnas, "cells": celdas,
+                       "boundingRegions": [_region(100, y0, 1000, filas * 40)],
+                       "spans": [{"offset": 0, "length": 500}]})
+
+    parrafos = [{"content": "TOTAL DE VOTOS SACADOS DE LAS URNAS", "boundingRegions": [_region(100, 660, 900, 30)],
+                 "spans": [{"offset": 0, "length": 35}]}]
+    parrafos += [{"content": " ".join(aleatorio.choices(palabras, k=5)),
+                  "boundingRegions": [_region(100, 40 * i, 900, 30)],
+                  "spans": [{"offset": i * 30, "length": 30}]} for i in range(120)]
+
+    pagina = {
+        "pageNumber": 1, "angle": 0.0, "width": 1240, "height": 1754, "unit": "pixel",
+        "words": [_palabra_o_linea(aleatorio.choice(palabras), aleatorio.uniform(0, 1100),
+                                   aleatorio.uniform(0, 1700)) for _ in range(1500)],
+        "lines": [_palabra_o_linea(" ".join(aleatorio.choices(palabras, k=4)), 100, 12 * i)
+                  for i in range(300)],
+        "spans": [{"offset": 0, "length": 9000}],
+    }
+
+    return {"apiVersion": "2024-11-30", "modelId": "prebuilt-layout", "content": "x" * 9000,
+            "pages": [pagina], "tables": tablas, "paragraphs": parrafos,
+            "styles": [{"isHandwritten": True, "confidence": 0.9,
+                        "spans": [{"offset": i * 10, "length": 8}]} for i in range(200)]}
+
+
+def medir(nombre: str, serializar, deserializar):
+    """Imprime tamaño y tiempos medios de serializar/deserializar."""
+    t0 = time.perf_counter()
+    for _ in range(REPETICIONES):
+        datos = serializar()
+    t_ser = (time.perf_counter() - t0) / REPETICIONES
+
+    t0 = time.perf_counter()
+    for _ in range(REPETICIONES):
+        deserializar(datos)
+    t_des = (time.perf_counter() - t0) / REPETICIONES
+
+    print(f"  {nombre:<28} {len(datos) / 1024:>9.1f} KB  {t_ser * 1000:>8.2f} ms  {t_des * 1000:>8.2f} ms")
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            crudo = json.load(f)
+        crudo = crudo.get("analyzeResult", crudo)
+    else:
+        crudo = acta_sintetica()
+
+    resultado = AnalyzeResult(crudo)
+    compacto = rc.compactar(resultado)
+
+    # El resultado compacto debe dar las mismas tablas de interés
+    encabezado = ["TOTAL DE VOTOS SACADOS DE LAS URNAS", "Copie del apartado 7", "7 TOTAL DE VOTOS"]
+    esperado = extraer_tablas_interes(resultado, encabezado, filas_tabla2=16)
+    obtenido = extraer_tablas_interes(rc.deserializar(rc.serializar(compacto, rc.GZIP_JSON)),
+                                      encabezado, filas_tabla2=16)
+    if esperado != obtenido:
+        print("[ERROR] El resultado compacto no reproduce las tablas de interés")
+        sys.exit(1)
+
+    print("\n" + "=" * 70)
+    print(f"  {'Formato':<28} {'Tamaño':>12}  {'Serializar':>11}  {'Cargar':>8}")
+    print("=" * 70)
+    medir("pickle AnalyzeResult", lambda: pickle.dumps(resultado), pickle.loads)
+    medir("JSON indentado", lambda: json.dumps(resultado.as_dict(), indent=2),
+          lambda d: AnalyzeResult(json.loads(d)))
+    medir("pickle ResultadoCompacto", lambda: pickle.dumps(compacto), pickle.loads)
+
+    formatos = [("compacto gzip+JSON", rc.GZIP_JSON)]
+    if rc.ZSTD_DISPONIBLE:
+        formatos.append(("compacto zstd+JSON", rc.ZSTD_JSON))
+    if rc.MSGPACK_DISPONIBLE:
+        formatos.append(("compacto msgpack", rc.MSGPACK))
+    for nombre, formato in formatos:
+        medir(nombre, lambda f=formato: rc.serializar(compacto, f), rc.deserializar)
+    print("=" * 70)
+
+    faltantes = [n for n, ok in (("msgpack", rc.MSGPACK_DISPONIBLE), ("zstandard", rc.ZSTD_DISPONIBLE),
+                                 ("orjson", rc.ORJSON_DISPONIBLE)) if not ok]
+    if faltantes:
+        print(f"[INFO] No instalados (formatos omitidos o más lentos): {', '.join(faltantes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Detección local de tablas para FLUJO 2 - Extracción de tablas.
+Encuentra tablas con renglones impresos (rejillas) en la página enderezada
+usando solo OpenCV: extracción morfológica de líneas horizontales/verticales
+y componentes conexos. No requiere Azure, por lo que sirve de respaldo
+rápido cuando Document Intelligence falla o está limitado.
+
+Los polígonos se devuelven en el mismo formato [x1, y1, ..., x4, y4] que
+usa calcular_bounding_box (procesamiento_imagen.py). seleccionar_tablas_interes
+reduce las rejillas a las tres tablas del acta en el orden de
+extraer_tablas_interes, y guardar_celdas deja su retícula de celdas en JSON
+para leerlas después sin Azure.
+"""
+
+import json
+import sys
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+from procesamiento_imagen import mostrar_imagen
+
+
+# Fracción del lado de la página que debe medir un trazo para considerarse línea
+FRACCION_LINEA = 1 / 40
+
+# Área mínima de una tabla (fracción de la página) y de una celda (px²)
+AREA_MIN_TABLA = 0.005
+AREA_MIN_CELDA = 150
+
+# Tolerancia (px) para agrupar celdas en la misma fila/columna
+TOLERANCIA_REJILLA = 10
+
+# Tablas de interés del acta (las mismas que extraer_tablas_interes en analisis_azure.py)
+NUM_TABLAS_INTERES = 3
+
+
+def _rectangulo(x: float, y: float, ancho: float, alto: float) -> List[float]:
+    """Polígono [x1, y1, x2, y2, x3, y3, x4, y4] de un rectángulo (sentido horario)."""
+    return [float(x), float(y), float(x + ancho), float(y),
+            float(x + ancho), float(y + alto), float(x), float(y + alto)]
+
+
+def _contiene(exterior: List[float], interior: List[float]) -> bool:
+    """True si el rectángulo interior queda dentro del exterior."""
+    return (exterior[0] <= interior[0] and exterior[1] <= interior[1]
+            and exterior[4] >= interior[4] and exterior[5] >= interior[5])
+
+
+def _agrupar(valores: List[int], tolerancia: int) -> List[int]:
+    """Asigna a cada valor el índice de su grupo (valores cercanos → mismo índice)."""
+    orden = sorted(set(valores))
+    grupos, inicio_grupo = {}, None
+    indice = -1
+    for v in orden:
+        if inicio_grupo is None or v - inicio_grupo > tolerancia:
+            indice += 1
+            inicio_grupo = v
+        grupos[v] = indice
+    return [grupos[v] for v in valores]
+
+
+def extraer_lineas(imagen: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Separa los trazos horizontales y verticales de la página.
+
+    Pasos:
+    1. Escala de grises y umbral adaptativo invertido (tinta = 255)
+    2. Apertura con un kernel horizontal largo → líneas horizontales
+    3. Apertura con un kernel vertical largo → líneas verticales
+
+    Returns:
+        (mascara_horizontales, mascara_verticales)
+    """
+    if len(imagen.shape) == 3:
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    else:
+        gris = imagen
+
+    tinta = cv2.adaptiveThreshold(gris, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                  cv2.THRESH_BINARY_INV, 15, 10)
+
+    alto, ancho = tinta.shape[:2]
+    kernel_h = cv2.getStructuringElement(cv2.MORPH_RECT, (max(10, int(ancho * FRACCION_LINEA)), 1))
+    kernel_v = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(10, int(alto * FRACCION_LINEA))))
+
+    horizontales = cv2.morphologyEx(tinta, cv2.MORPH_OPEN, kernel_h)
+    verticales = cv2.morphologyEx(tinta, cv2.MORPH_OPEN, kernel_v)
+    return horizontales, verticales
+
+
+def _celdas_de_tabla(rejilla: np.ndarray, x: int, y: int, ancho: int, alto: int) -> List[Dict]:
+    """
+    Celdas de una tabla: regiones de fondo encerradas por la rejilla.
+    Se les asigna fila y columna agrupando sus esquinas superiores izquierdas.
+    """
+    region = rejilla[y:y + alto, x:x + ancho]
+    fondo = cv2.bitwise_not(region)
+    num, _, stats, _ = cv2.connectedComponentsWithStats(fondo, connectivity=4)
+
+    cajas = []
+    for i in range(1, num):
+        cx, cy, cw, ch, area = stats[i]
+        # Se descartan el exterior (toca el borde) y el ruido
+        if cx == 0 or cy == 0 or cx + cw >= ancho or cy + ch >= alto:
+            continue
+        if area < AREA_MIN_CELDA:
+            continue
+        cajas.append((int(cx + x), int(cy + y), int(cw), int(ch)))
+
+    if not cajas:
+        return []
+
+    filas = _agrupar([c[1] for c in cajas], TOLERANCIA_REJILLA)
+    columnas = _agrupar([c[0] for c in cajas], TOLERANCIA_REJILLA)
+
+    celdas = [{"fila": f, "columna": c, "poligono": _rectangulo(*caja)}
+              for caja, f, c in zip(cajas, filas, columnas)]
+    celdas.sort(key=lambda celda: (celda["fila"], celda["columna"]))
+    return celdas
+
+
+def detectar_tablas(imagen: Union[str, np.ndarray], mostrar: bool = False) -> List[Dict]:
+    """
+    Detecta las tablas con rejilla de la página y su retícula de celdas.
+
+    Args:
+        imagen:  Ruta o imagen enderezada (BGR o escala de grises)
+        mostrar: Si True, muestra la rejilla detectada
+
+    Returns:
+        Lista de tablas ordenadas de arriba a abajo y de izquierda a derecha:
+        {'poligono', 'filas', 'columnas', 'celdas': [{'fila', 'columna', 'poligono'}]}
+    """
+    if isinstance(imagen, str):
+        ruta_imagen = imagen
+        imagen = cv2.imread(ruta_imagen)
+        if imagen is None:
+            print(f"[ERROR] No se pudo cargar la imagen: {ruta_imagen}")
+            return []
+
+    horizontales, verticales = extraer_lineas(imagen)
+    rejilla = cv2.bitwise_or(horizontales, verticales)
+    # Cerrar huecos pequeños en los cruces de líneas
+    rejilla = cv2.dilate(rejilla, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)))
+
+    alto, ancho = rejilla.shape[:2]
+    area_min = AREA_MIN_TABLA * alto * ancho
+    num, _, stats, _ = cv2.connectedComponentsWithStats(rejilla, connectivity=8)
+
+    tablas = []
+    for i in range(1, num):
+        x, y, w, h, _ = stats[i]
+        if w * h < area_min:
+            continue
+
+        # Una tabla necesita al menos 2 líneas en cada dirección
+        n_h = cv2.connectedComponents(horizontales[y:y + h, x:x + w])[0] - 1
+        n_v = cv2.connectedComponents(verticales[y:y + h, x:x + w])[0] - 1
+        if n_h < 2 or n_v < 2:
+            continue
+
+        celdas = _celdas_de_tabla(rejilla, int(x), int(y), int(w), int(h))
+        if not celdas:
+            continue
+
+        tablas.append({
+            "poligono": _rectangulo(x, y, w, h),
+            "filas": max(c["fila"] for c in celdas) + 1,
+            "columnas": max(c["columna"] for c in celdas) + 1,
+            "celdas": celdas,
+        })
+
+    # El borde del papel o un marco exterior encierra a las tablas reales: se descarta
+    tablas = [t for t in tablas if not any(o is not t and _contiene(t["poligono"], o["poligono"])
+                                           for o in tablas)]
+
+    tablas.sort(key=lambda t: (t["poligono"][1], t["poligono"][0]))
+    print(f"[INFO] Tablas detectadas localmente: {len(tablas)}")
+    for idx, tabla in enumerate(tablas):
+        print(f"  - Tabla {idx + 1}: {tabla['filas']} filas x {tabla['columnas']} columnas "
+              f"({len(tabla['celdas'])} celdas)")
+
+    if mostrar:
+        mostrar_imagen(rejilla, titulo="Rejilla detectada")
+
+    return tablas
+
+
+def poligonos_tablas(imagen: Union[str, np.ndarray]) -> List[List[float]]:
+    """Solo los polígonos de las tablas detectadas (formato de calcular_bounding_box)."""
+    return [tabla["poligono"] for tabla in detectar_tablas(imagen)]
+
+
+def _recortar_filas(tabla: Dict, num_filas: int) -> Dict:
+    """Tabla limitada a sus primeras num_filas filas (polígono y celdas)."""
+    celdas = [c for c in tabla["celdas"] if c["fila"] < num_filas]
+    y_max = max(c["poligono"][5] for c in celdas)
+    x1, y1, x2 = tabla["poligono"][:3]
+    return {
+        "poligono": [x1, y1, x2, y1, x2, y_max, x1, y_max],
+        "filas": num_filas,
+        "columnas": tabla["columnas"],
+        "celdas": celdas,
+    }
+
+
+def seleccionar_tablas_interes(tablas: List[Dict], num_tablas: int = NUM_TABLAS_INTERES,
+                               filas_tabla2: int = 16) -> List[Dict]:
+    """
+    Reduce las rejillas detectadas a las tablas de interés del acta, en el
+    mismo orden que extraer_tablas_interes, para que los recortes de respaldo
+    se llamen igual (_tabla_1 .. _tabla_3) que con Azure.
+
+    Pasos:
+    1. Se conservan las num_tablas rejillas de mayor área (casillas sueltas,
+       sellos o recuadros pequeños quedan fuera)
+    2. La Tabla 2 es la de más filas, recortada a filas_tabla2 filas
+    3. Las otras dos, en orden de lectura, son la Tabla 1 y la Tabla 3
+
+    Args:
+        tablas:       Resultado de detectar_tablas
+        num_tablas:   Número de tablas de interés
+        filas_tabla2: Filas de la Tabla 2 (como en extraer_tablas_interes)
+
+    Returns:
+        Lista de tablas (mismo formato que detectar_tablas) en el orden de salida
+    """
+    if len(tablas) < num_tablas:
+        print(f"[ADVERTENCIA] Solo se detectaron {len(tablas)} de {num_tablas} tablas de interés")
+    elegidas = sorted(tablas, key=lambda t: (t["poligono"][4] - t["poligono"][0]) *
+                                            (t["poligono"][5] - t["poligono"][1]),
+                      reverse=True)[:num_tablas]
+    elegidas.sort(key=lambda t: (t["poligono"][1], t["poligono"][0]))
+    if len(elegidas) < 2:
+        return elegidas
+
+    tabla2 = max(elegidas, key=lambda t: t["filas"])
+    resto = [t for t in elegidas if t is not tabla2]
+    if filas_tabla2 > 0 and tabla2["filas"] > filas_tabla2:
+        tabla2 = _recortar_filas(tabla2, filas_tabla2)
+    return [resto[0], tabla2] + resto[1:]
+
+
+def guardar_celdas(tablas: List[Dict], ruta_json: str):
+    """
+    Guarda la retícula de celdas de las tablas (coordenadas de la página
+    enderezada), una entrada por tabla en el mismo orden que los recortes.
+    """
+    datos = [{"tabla": idx + 1, "poligono": t["poligono"], "filas": t["filas"],
+              "columnas": t["columnas"], "celdas": t["celdas"]}
+             for idx, t in enumerate(tablas)]
+    try:
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2)
+        print(f"[INFO] Retícula de celdas guardada: {ruta_json}")
+    except Exception as e:
+        print(f"[ERROR] No se pudo guardar la retícula de celdas: {e}")
+
+
+def main():
+    """
+    Punto de entrada para probar el detector desde línea de comandos.
+    Uso: python deteccion_tablas.py <imagen_enderezada>
+    """
+    if len(sys.argv) < 2:
+        print("Uso: python deteccion_tablas.py <imagen_enderezada>")
+        sys.exit(1)
+
+    tablas = detectar_tablas(sys.argv[1])
+    for idx, tabla in enumerate(seleccionar_tablas_interes(tablas)):
+        print(f"  Tabla de interés {idx + 1}: {[round(v) for v in tabla['poligono']]} "
+              f"({tabla['filas']} filas)")
+    if not tablas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Índice de layout para FLUJO 2 - Extracción de tablas.
+Se construye UNA vez por AnalyzeResult y lo reutilizan las búsquedas de
+FLUJO 2 (recorte de tablas):
+
+  - Párrafos con el texto ya normalizado y búsqueda de varias frases en una
+    sola pasada (autómata Aho-Corasick)
+  - Tablas ordenadas por su borde superior para encontrar la más cercana
+    debajo de un encabezado
+  - Rejilla espacial sobre párrafos, tablas y celdas para consultas por región
+"""
+
+import bisect
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Tamaño (px) de cada casilla de la rejilla espacial
+TAM_REJILLA = 256
+
+# Cantidad de AnalyzeResult con índice en caché
+_MAX_CACHE = 8
+
+# Tipos de elemento en la rejilla
+PARRAFO = "parrafo"
+TABLA = "tabla"
+CELDA = "celda"
+
+
+def caja_poligono(polygon: Sequence[float]) -> Tuple[float, float, float, float]:
+    """Bounding box (x_min, y_min, x_max, y_max) de un polígono [x1, y1, ..., x4, y4]."""
+    xs = polygon[0::2]
+    ys = polygon[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _primer_poligono(elemento) -> Optional[Sequence[float]]:
+    """Polígono de la primera región del elemento, o None si no tiene."""
+    regiones = getattr(elemento, "bounding_regions", None)
+    if not regiones:
+        return None
+    return regiones[0].polygon
+
+
+class AhoCorasick:
+    """
+    Autómata de búsqueda de múltiples patrones.
+    Encuentra en una sola pasada qué patrones aparecen dentro de un texto.
+    """
+
+    def __init__(self, patrones: Sequence[str]):
+        self._siguiente: List[Dict[str, int]] = [{}]
+        self._fallo: List[int] = [0]
+        self._salida: List[set] = [set()]
+
+        # Trie de patrones
+        for i, patron in enumerate(patrones):
+            nodo = 0
+            for ch in patron:
+                sig = self._siguiente[nodo].get(ch)
+                if sig is None:
+                    sig = len(self._siguiente)
+                    self._siguiente.append({})
+                    self._fallo.append(0)
+                    self._salida.append(set())
+                    self._siguiente[nodo][ch] = sig
+                nodo = sig
+            self._salida[nodo].add(i)
+
+        # Enlaces de fallo por anchura
+        cola = deque(self._siguiente[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for ch, sig in self._siguiente[nodo].items():
+                cola.append(sig)
+                f = self._fallo[nodo]
+                while f and ch not in self._siguiente[f]:
+                    f = self._fallo[f]
+                self._fallo[sig] = self._siguiente[f].get(ch, 0)
+                self._salida[sig] |= self._salida[self._fallo[sig]]
+
+    def buscar(self, texto: str) -> set:
+        """Índices de los patrones contenidos en el texto."""
+        encontrados = set(self._salida[0])  # Patrones vacíos
+        nodo = 0
+        for ch in texto:
+            while nodo and ch not in self._siguiente[nodo]:
+                nodo = self._fallo[nodo]
+            nodo = self._siguiente[nodo].get(ch, 0)
+            if self._salida[nodo]:
+                encontrados |= self._salida[nodo]
+        return encontrados
+
+
+class LayoutIndex:
+    """
+    Índice de párrafos, tablas y celdas de un resultado de Azure AI.
+
+    Uso básico:
+        indice = obtener_indice_layout(resultado)
+        encontrado = indice.buscar_frase(["TOTAL DE VOTOS SACADOS DE LAS URNAS"])
+        if encontrado:
+            frase, texto, poligono = encontrado
+            poligono_tabla = indice.tabla_debajo(poligono)
+    """
+
+    def __init__(self, tablas: Sequence = (), parrafos: Sequence = (),
+                 tam_rejilla: int = TAM_REJILLA):
+        """
+        Args:
+            tablas:      resultado.tables
+            parrafos:    resultado.paragraphs
+            tam_rejilla: Lado (px) de cada casilla de la rejilla espacial
+        """
+        self.tablas = list(tablas or [])
+        self.tam_rejilla = tam_rejilla
+        self._rejilla: Dict[Tuple[int, int], List[Tuple[str, object]]] = defaultdict(list)
+        self._automatas: Dict[Tuple[str, ...], AhoCorasick] = {}
+
+        # Párrafos: (texto normalizado, texto original, polígono)
+        self._parrafos = []
+        self._cajas_parrafo: List[Optional[Tuple[float, float, float, float]]] = []
+        for i, parrafo in enumerate(parrafos or []):
+            poligono = _primer_poligono(parrafo)
+            caja = caja_poligono(poligono) if poligono else None
+            self._parrafos.append((parrafo.content.lower(), parrafo.content, poligono))
+            self._cajas_parrafo.append(caja)
+            if caja:
+                self._registrar(PARRAFO, i, caja)
+
+        # Tablas y celdas con sus cajas precalculadas
+        self._cajas_tabla: List[Optional[Tuple[float, float, float, float]]] = []
+        self._cajas_celda: List[List[Optional[Tuple[float, float, float, float]]]] = []
+        for i, tabla in enumerate(self.tablas):
+            poligono = _primer_poligono(tabla)
+            caja = caja_poligono(poligono) if poligono else None
+            self._cajas_tabla.append(caja)
+            if caja:
+                self._registrar(TABLA, i, caja)
+
+            cajas = []
+            for j, celda in enumerate(getattr(tabla, "cells", None) or []):
+                poligono_celda = _primer_poligono(celda)
+                caja_celda = caja_poligono(poligono_celda) if poligono_celda else None
+                cajas.append(caja_celda)
+                if caja_celda:
+                    self._registrar(CELDA, (i, j), caja_celda)
+            self._cajas_celda.append(cajas)
+
+        # Tablas ordenadas por borde superior (empate: orden original)
+        self._tablas_por_y = sorted((caja[1], i) for i, caja in enumerate(self._cajas_tabla) if caja)
+        self._ys_tablas = [y for y, _ in self._tablas_por_y]
+
+    # ── Rejilla espacial ──
+
+    def _casillas(self, caja: Tuple[float, float, float, float]):
+        """Casillas de la rejilla que toca una caja."""
+        x_min, y_min, x_max, y_max = caja
+        t = self.tam_rejilla
+        for gx in range(int(x_min // t), int(x_max // t) + 1):
+            for gy in range(int(y_min // t), int(y_max // t) + 1):
+                yield gx, gy
+
+    def _registrar(self, tipo: str, clave, caja: Tuple[float, float, float, float]):
+        for casilla in self._casillas(caja):
+            self._rejilla[casilla].append((tipo, clave))
+
+    def consultar(self, caja: Tuple[float, float, float, float], tipo: Optional[str] = None) -> list:
+        """
+        Elementos cuya caja se superpone con la región dada.
+
+        Args:
+            caja: Región (x_min, y_min, x_max, y_max)
+            tipo: PARRAFO, TABLA o CELDA (None = todos)
+
+        Returns:
+            Lista ordenada de (tipo, clave); la clave es el índice del párrafo
+            o tabla, o (índice_tabla, índice_celda) para celdas
+        """
+        x_min, y_min, x_max, y_max = caja
+        encontrados = set()
+        for casilla in self._casillas(caja):
+            for t, clave in self._rejilla.get(casilla, ()):
+                if tipo and t != tipo:
+                    continue
+                if t == PARRAFO:
+                    c = self._cajas_parrafo[clave]
+                elif t == TABLA:
+                    c = self._cajas_tabla[clave]
+                else:
+                    c = self._cajas_celda[clave[0]][clave[1]]
+                if c[0] <= x_max and c[2] >= x_min and c[1] <= y_max and c[3] >= y_min:
+                    encontrados.add((t, clave))
+        return sorted(encontrados, key=lambda e: (e[0], e[1]))
+
+    # ── Consultas ──
+
+    def buscar_frase(self, frases: Sequence[str]) -> Optional[Tuple[str, str, Sequence[float]]]:
+        """
+        Busca la frase de mayor prioridad presente en algún párrafo con región.
+        Equivale a recorrer frases × párrafos en orden, pero en una sola pasada.
+
+        Args:
+            frases: Frases en orden de prioridad (la primera es la más importante)
+
+        Returns:
+            (frase, texto del párrafo, polígono del párrafo) o None
+        """
+        if not frases:
+            return None
+
+        clave = tuple(frases)
+        automata = self._automatas.get(clave)
+        if automata is None:
+            automata = AhoCorasick([f.lower() for f in frases])
+            self._automatas[clave] = automata
+
+        primero = [None] * len(frases)
+        for texto, contenido, poligono in self._parrafos:
+            if not poligono:
+                continue
+            for i in automata.buscar(texto):
+                if primero[i] is None:
+                    primero[i] = (frases[i], contenido, poligono)
+            if primero[0] is not None:
+                break  # Ya se encontró la frase de mayor prioridad
+
+        for encontrado in primero:
+            if encontrado:
+                return encontrado
+        return None
+
+    def tabla_debajo(self, poligono: Sequence[float], tolerancia_x: float = 500) -> Optional[Sequence[float]]:
+        """
+        Tabla más cercana que empieza debajo del borde superior de un encabezado
+        y está alineada horizontalmente con él.
+
+        Args:
+            poligono:     Polígono del encabezado
+            tolerancia_x: Diferencia máxima entre los bordes izquierdos
+
+        Returns:
+            Polígono de la tabla o None
+        """
+        x_min, y_min, _, _ = caja_poligono(poligono)
+        inicio = bisect.bisect_left(self._ys_tablas, y_min)
+        for _, i in self._tablas_por_y[inicio:]:
+            if abs(self._cajas_tabla[i][0] - x_min) < tolerancia_x:
+                return _primer_poligono(self.tablas[i])
+        return None
+
+
+_CACHE_INDICES: "OrderedDict[int, Tuple[object, LayoutIndex]]" = OrderedDict()
+
+
+def obtener_indice_layout(resultado) -> LayoutIndex:
+    """Devuelve el índice del AnalyzeResult, construyéndolo solo la primera vez."""
+    clave = id(resultado)
+    entrada = _CACHE_INDICES.get(clave)
+    if entrada is not None and entrada[0] is resultado:
+        _CACHE_INDICES.move_to_end(clave)
+        return entrada[1]
+
+    indice = LayoutIndex(getattr(resultado, "tables", None),
+                         getattr(resultado, "paragraphs", None))
+    _CACHE_INDICES[clave] = (resultado, indice)
+    while len(_CACHE_INDICES) > _MAX_CACHE:
+        _CACHE_INDICES.popitem(last=False)
+    return indice
@@ -0,0 +1,91 @@
+"""
+Motor de recorte para FLUJO 2 - Extracción de tablas.
+Decodifica la página UNA sola vez, binariza una sola vez la región que une
+todas las tablas y obtiene cada recorte como vista (sin copia) de ese arreglo.
+La codificación JPEG y la escritura a disco se hacen en paralelo.
+"""
+
+import os
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, Union
+
+from procesamiento_imagen import calcular_bounding_box, guardar_imagen
+
+
+def recortar_tablas(imagen: Union[str, np.ndarray], poligonos: List[List[float]],
+                    carpeta_salida: str, nombre_base: str,
+                    filtro: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                    max_hilos: Optional[int] = None) -> List[Tuple[int, str, np.ndarray]]:
+    """
+    Recorta, filtra y guarda todas las tablas de una página.
+
+    Pasos:
+    1. Decodifica la imagen una sola vez (si se recibe una ruta)
+    2. Calcula el bounding box de cada polígono y su unión
+    3. Aplica el filtro (p.ej. binarizado) una sola vez sobre la unión
+    4. Toma cada recorte como vista del arreglo filtrado
+    5. Codifica y guarda los recortes en un pool de hilos
+
+    Args:
+        imagen:         Ruta a la imagen o imagen ya decodificada
+        poligonos:      Polígonos [x1, y1, ..., x4, y4] de extraer_tablas_interes
+        carpeta_salida: Carpeta donde guardar los recortes
+        nombre_base:    Prefijo de los archivos (<nombre_base>_TABLA_<n>.jpg)
+        filtro:         Función aplicada a la región unida (None = sin filtro)
+        max_hilos:      Hilos para codificar/escribir (por defecto uno por recorte)
+
+    Returns:
+        Lista de (indice_tabla, ruta_guardada, recorte) solo de las tablas válidas
+    """
+    if isinstance(imagen, str):
+        ruta_imagen = imagen
+        imagen = cv2.imread(ruta_imagen)
+        if imagen is None:
+            print(f"[ERROR] No se pudo cargar la imagen: {ruta_imagen}")
+            return []
+
+    alto, ancho = imagen.shape[:2]
+    print(f"[INFO] Dimensiones de imagen original: {ancho}x{alto}")
+
+    # Bounding boxes recortados a los límites de la imagen
+    cajas = []
+    for idx, poligono in enumerate(poligonos):
+        x_min, y_min, x_max, y_max = calcular_bounding_box(poligono)
+        x_min, y_min = max(0, x_min), max(0, y_min)
+        x_max, y_max = min(ancho, x_max), min(alto, y_max)
+        if x_max <= x_min or y_max <= y_min:
+            print(f"[FALLO] No se pudo recortar la tabla #{idx + 1} (región vacía)")
+            continue
+        cajas.append((idx, x_min, y_min, x_max, y_max))
+
+    if not cajas:
+        return []
+
+    # Región unión: se filtra una sola vez
+    ux_min = min(c[1] for c in cajas)
+    uy_min = min(c[2] for c in cajas)
+    ux_max = max(c[3] for c in cajas)
+    uy_max = max(c[4] for c in cajas)
+
+    region = imagen[uy_min:uy_max, ux_min:ux_max]
+    region_filtrada = filtro(region) if filtro else region
+    print(f"[INFO] Región unida filtrada una vez: {ux_max - ux_min}x{uy_max - uy_min}")
+
+    # Vistas (sin copia) de cada tabla dentro de la región filtrada
+    recortes = []
+    for idx, x_min, y_min, x_max, y_max in cajas:
+        vista = region_filtrada[y_min - uy_min:y_max - uy_min, x_min - ux_min:x_max - ux_min]
+        nombre_archivo = f"{nombre_base}_TABLA_{idx + 1}.jpg"
+        print(f"[INFO] Recorte tabla #{idx + 1}: {vista.shape[1]}x{vista.shape[0]}")
+        recortes.append((idx, nombre_archivo, vista))
+
+    # Codificación + escritura en paralelo (cv2.imwrite libera el GIL)
+    os.makedirs(carpeta_salida, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_hilos or len(recortes)) as pool:
+        rutas = list(pool.map(
+            lambda r: guardar_imagen(r[2], carpeta_salida, r[1]), recortes
+        ))
+
+    return [(idx, ruta, vista) for (idx, _, vista), ruta in zip(recortes, rutas)]
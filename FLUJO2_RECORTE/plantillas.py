@@ -0,0 +1,266 @@
+"""
+Registro de plantillas para FLUJO 2 - Extracción de tablas.
+El formato del acta es fijo: basta con una imagen de referencia por formato
+con sus tres regiones de tabla. Cada página enderezada se alinea contra la
+plantilla con puntos característicos (ORB/AKAZE) y una homografía, y los
+polígonos de las tablas se proyectan a la página en milisegundos, sin
+depender de Document Intelligence ni de los márgenes ajustados a mano.
+
+Registrar una plantilla (usa Document Intelligence UNA sola vez):
+
+    python plantillas.py registrar <acta_enderezada.jpg> [nombre]
+
+Probar la alineación de una página:
+
+    python plantillas.py localizar <pagina_enderezada.jpg>
+"""
+
+import json
+import os
+import shutil
+import sys
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Union
+
+
+# Carpeta por defecto con las plantillas (<nombre>.jpg + <nombre>.json)
+CARPETA_PLANTILLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plantillas")
+
+# Ancho de trabajo para detectar puntos (las actas enderezadas miden ~2000 px)
+ANCHO_TRABAJO = 1000
+
+# Filtros de correspondencias
+RATIO_LOWE = 0.75          # Prueba de razón entre el 1.er y 2.º vecino
+MIN_INLIERS = 40           # Inliers mínimos de RANSAC para aceptar la alineación
+UMBRAL_RANSAC = 5.0        # Error de reproyección (px, a ANCHO_TRABAJO)
+
+
+def _crear_detector(tipo: str):
+    """Crea el detector de puntos característicos ("orb" o "akaze")."""
+    if tipo == "akaze":
+        return cv2.AKAZE_create()
+    return cv2.ORB_create(nfeatures=4000)
+
+
+def _preparar(imagen: np.ndarray):
+    """Escala de grises reducida a ANCHO_TRABAJO y el factor de escala aplicado."""
+    if len(imagen.shape) == 3:
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    else:
+        gris = imagen
+    escala = min(1.0, ANCHO_TRABAJO / gris.shape[1])
+    if escala < 1.0:
+        gris = cv2.resize(gris, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+    return gris, escala
+
+
+class RegistroPlantillas:
+    """
+    Plantillas de actas con las regiones de sus tablas.
+
+    Uso básico:
+        registro = RegistroPlantillas()
+        alineacion = registro.localizar(imagen_enderezada)
+        if alineacion:
+            poligonos = alineacion["poligonos"]
+    """
+
+    def __init__(self, carpeta: str = CARPETA_PLANTILLAS, detector: str = "orb"):
+        """
+        Args:
+            carpeta:  Carpeta con las plantillas (<nombre>.jpg + <nombre>.json)
+            detector: "orb" (rápido) o "akaze" (más robusto a escala)
+        """
+        self.carpeta = carpeta
+        self.tipo_detector = detector
+        self.detector = _crear_detector(detector)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        self.plantillas: List[dict] = []
+        self.cargar()
+
+    def cargar(self):
+        """Lee las plantillas de la carpeta y precalcula sus descriptores."""
+        self.plantillas = []
+        if not os.path.isdir(self.carpeta):
+            return
+
+        for archivo in sorted(os.listdir(self.carpeta)):
+            if not archivo.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.carpeta, archivo), "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+                imagen = cv2.imread(os.path.join(self.carpeta, datos["imagen"]))
+                if imagen is None:
+                    print(f"[ADVERTENCIA] Plantilla sin imagen: {archivo}")
+                    continue
+                gris, escala = _preparar(imagen)
+                puntos, descriptores = self.detector.detectAndCompute(gris, None)
+                if descriptores is None:
+                    print(f"[ADVERTENCIA] Plantilla sin puntos característicos: {archivo}")
+                    continue
+                datos.update(puntos=puntos, descriptores=descriptores, escala=escala)
+                self.plantillas.append(datos)
+            except Exception as e:
+                print(f"[ADVERTENCIA] No se pudo cargar la plantilla {archivo}: {e}")
+
+        if self.plantillas:
+            print(f"[INFO] Plantillas de actas cargadas: {len(self.plantillas)} ({self.tipo_detector})")
+
+    def registrar(self, nombre: str, ruta_imagen: str, poligonos: List[List[float]]) -> str:
+        """
+        Guarda una nueva plantilla a partir de una acta enderezada y sus tablas.
+
+        Args:
+            nombre:      Identificador de la plantilla (p.ej. "diputaciones_2024")
+            ruta_imagen: Acta enderezada de referencia
+            poligonos:   Polígonos [x1, y1, ..., x4, y4] de las tablas de interés
+
+        Returns:
+            Ruta del JSON de la plantilla
+        """
+        os.makedirs(self.carpeta, exist_ok=True)
+        extension = os.path.splitext(ruta_imagen)[1].lower() or ".jpg"
+        nombre_imagen = f"{nombre}{extension}"
+        shutil.copyfile(ruta_imagen, os.path.join(self.carpeta, nombre_imagen))
+
+        imagen = cv2.imread(ruta_imagen)
+        alto, ancho = imagen.shape[:2]
+        ruta_json = os.path.join(self.carpeta, f"{nombre}.json")
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump({
+                "nombre": nombre,
+                "imagen": nombre_imagen,
+                "ancho": ancho,
+                "alto": alto,
+                "poligonos": [[float(v) for v in p] for p in poligonos],
+            }, f, indent=2)
+
+        print(f"[INFO] Plantilla registrada: {ruta_json} ({len(poligonos)} tablas)")
+        self.cargar()
+        return ruta_json
+
+    def localizar(self, imagen: Union[str, np.ndarray]) -> Optional[Dict]:
+        """
+        Alinea una página enderezada con la plantilla que mejor coincide y
+        proyecta los polígonos de sus tablas.
+
+        Args:
+            imagen: Ruta o imagen ya decodificada de la página
+
+        Returns:
+            {'plantilla', 'poligonos', 'inliers', 'homografia'} o None si
+            ninguna plantilla alcanza MIN_INLIERS
+        """
+        if not self.plantillas:
+            return None
+
+        if isinstance(imagen, str):
+            imagen = cv2.imread(imagen)
+            if imagen is None:
+                return None
+
+        gris, escala_pagina = _preparar(imagen)
+        puntos, descriptores = self.detector.detectAndCompute(gris, None)
+        if descriptores is None or len(puntos) < MIN_INLIERS:
+            print("[ADVERTENCIA] Página sin suficientes puntos característicos para alinear")
+            return None
+
+        mejor = None
+        for plantilla in self.plantillas:
+            pares = self.matcher.knnMatch(plantilla["descriptores"], descriptores, k=2)
+            buenos = [m[0] for m in pares
+                      if len(m) == 2 and m[0].distance < RATIO_LOWE * m[1].distance]
+            if len(buenos) < MIN_INLIERS:
+                continue
+
+            origen = np.float32([plantilla["puntos"][m.queryIdx].pt for m in buenos]).reshape(-1, 1, 2)
+            destino = np.float32([puntos[m.trainIdx].pt for m in buenos]).reshape(-1, 1, 2)
+            homografia, mascara = cv2.findHomography(origen, destino, cv2.RANSAC, UMBRAL_RANSAC)
+            if homografia is None:
+                continue
+
+            inliers = int(mascara.sum())
+            if inliers >= MIN_INLIERS and (mejor is None or inliers > mejor["inliers"]):
+                mejor = {"plantilla": plantilla, "homografia": homografia, "inliers": inliers}
+
+        if mejor is None:
+            print("[INFO] Ninguna plantilla coincide con la página")
+            return None
+
+        # Homografía en coordenadas completas: página = S_p⁻¹ · H · S_t · plantilla
+        plantilla = mejor["plantilla"]
+        escala_t = np.diag([plantilla["escala"], plantilla["escala"], 1.0])
+        escala_p_inv = np.diag([1.0 / escala_pagina, 1.0 / escala_pagina, 1.0])
+        homografia = escala_p_inv @ mejor["homografia"] @ escala_t
+
+        poligonos = []
+        for poligono in plantilla["poligonos"]:
+            puntos_poly = np.float32(poligono).reshape(-1, 1, 2)
+            proyectados = cv2.perspectiveTransform(puntos_poly, homografia)
+            poligonos.append([float(v) for v in proyectados.reshape(-1)])
+
+        print(f"[INFO] Página alineada con plantilla '{plantilla['nombre']}' "
+              f"({mejor['inliers']} inliers)")
+        return {
+            "plantilla": plantilla["nombre"],
+            "poligonos": poligonos,
+            "inliers": mejor["inliers"],
+            "homografia": homografia,
+        }
+
+
+def main():
+    """
+    Punto de entrada para registrar o probar plantillas desde línea de comandos.
+    Uso: python plantillas.py registrar <acta_enderezada> [nombre]
+         python plantillas.py localizar <pagina_enderezada>
+    """
+    if len(sys.argv) < 3 or sys.argv[1] not in ("registrar", "localizar"):
+        print("Uso: python plantillas.py registrar <acta_enderezada> [nombre]")
+        print("     python plantillas.py localizar <pagina_enderezada>")
+        sys.exit(1)
+
+    ruta = sys.argv[2]
+    if not os.path.exists(ruta):
+        print(f"[ERROR] El archivo no existe: {ruta}")
+        sys.exit(1)
+
+    registro = RegistroPlantillas()
+
+    if sys.argv[1] == "localizar":
+        alineacion = registro.localizar(ruta)
+        if alineacion is None:
+            sys.exit(1)
+        for idx, poligono in enumerate(alineacion["poligonos"]):
+            print(f"  Tabla {idx + 1}: {[round(v, 1) for v in poligono]}")
+        return
+
+    # Registrar: las regiones se obtienen una sola vez con Document Intelligence
+    from credenciales import cargar_credenciales
+    from analisis_azure import analizar_documento, extraer_tablas_interes
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+    from azure.core.credentials import AzureKeyCredential
+
+    endpoint, api_key = cargar_credenciales()
+    if not endpoint or not api_key:
+        sys.exit(1)
+
+    client = DocumentIntelligenceClient(endpoint=endpoint, credential=AzureKeyCredential(api_key))
+    resultado = analizar_documento(client, ruta)
+    if resultado is None:
+        sys.exit(1)
+
+    texto_encabezado = ["TOTAL DE VOTOS SACADOS DE LAS URNAS", "Copie del apartado 7", "7 TOTAL DE VOTOS"]
+    poligonos = extraer_tablas_interes(resultado, texto_encabezado, filas_tabla2=16)
+    if len(poligonos) < 3:
+        print("[ERROR] No se obtuvieron las 3 tablas; revisa la imagen de referencia")
+        sys.exit(1)
+
+    nombre = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(os.path.basename(ruta))[0]
+    registro.registrar(nombre, ruta, poligonos)
+
+
+if __name__ == "__main__":
+    main()
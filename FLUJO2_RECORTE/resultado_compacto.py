@@ -0,0 +1,369 @@
+"""
+Representación compacta del AnalyzeResult para FLUJO 2 y FLUJO 3.
+El grafo de objetos del SDK para una acta completa es grande: serializarlo
+con pickle o como JSON indentado es lento y ocupa mucho. Aquí se conservan
+solo los campos que usa el pipeline:
+
+  - tables:     row_count, column_count, bounding_regions y cells
+                (row_index, column_index, content, bounding_regions)
+  - paragraphs: content y bounding_regions
+  - pages:      page_number, width, height, unit, angle
+
+Las clases usan __slots__ y exponen los mismos atributos que el SDK, así que
+extraer_tablas_interes, LayoutIndex y los extractores de FLUJO 3 las aceptan
+sin cambios.
+
+Se construyen desde el SDK (compactar) o directamente desde el JSON crudo de
+la respuesta de Document Intelligence (desde_json_crudo), que se parsea con
+orjson si está disponible y nunca recorre words, lines ni styles.
+
+Formatos de almacenamiento (el primero disponible): msgpack, JSON comprimido
+con zstd o JSON comprimido con gzip (siempre disponible).
+
+Uso básico:
+    compacto = compactar(analyze_result)
+    guardar_compacto(compacto, "acta_layout.rc")
+    compacto = cargar_compacto("acta_layout.rc")
+"""
+
+import gzip
+import json
+import sys
+from typing import List, Optional, Union
+
+# Manejo seguro de importaciones (formatos opcionales)
+ORJSON_DISPONIBLE = False
+try:
+    import orjson
+    ORJSON_DISPONIBLE = True
+except ImportError:
+    pass
+
+MSGPACK_DISPONIBLE = False
+try:
+    import msgpack
+    MSGPACK_DISPONIBLE = True
+except ImportError:
+    pass
+
+ZSTD_DISPONIBLE = False
+try:
+    import zstandard
+    ZSTD_DISPONIBLE = True
+except ImportError:
+    pass
+
+
+# Cabecera de los archivos: firma + versión + formato
+FIRMA = b"RC"
+VERSION = 1
+MSGPACK = b"M"
+ZSTD_JSON = b"Z"
+GZIP_JSON = b"G"
+
+NIVEL_ZSTD = 10
+NIVEL_GZIP = 6
+
+
+# ============================================================================
+# ESTRUCTURAS
+# ============================================================================
+
+class RegionCompacta:
+    """Región de un elemento: página y polígono [x1, y1, ..., x4, y4]."""
+    __slots__ = ("page_number", "polygon")
+
+    def __init__(self, page_number: int, polygon: List[float]):
+        self.page_number = page_number
+        self.polygon = polygon
+
+
+class CeldaCompacta:
+    __slots__ = ("row_index", "column_index", "content", "bounding_regions")
+
+    def __init__(self, row_index: int, column_index: int, content: str,
+                 bounding_regions: Optional[List[RegionCompacta]] = None):
+        self.row_index = row_index
+        self.column_index = column_index
+        self.content = content
+        self.bounding_regions = bounding_regions
+
+
+class TablaCompacta:
+    __slots__ = ("row_count", "column_count", "cells", "bounding_regions")
+
+    def __init__(self, row_count: int, column_count: int, cells: List[CeldaCompacta],
+                 bounding_regions: Optional[List[RegionCompacta]] = None):
+        self.row_count = row_count
+        self.column_count = column_count
+        self.cells = cells
+        self.bounding_regions = bounding_regions
+
+
+class ParrafoCompacto:
+    __slots__ = ("content", "bounding_regions")
+
+    def __init__(self, content: str, bounding_regions: Optional[List[RegionCompacta]] = None):
+        self.content = content
+        self.bounding_regions = bounding_regions
+
+
+class PaginaCompacta:
+    __slots__ = ("page_number", "width", "height", "unit", "angle")
+
+    def __init__(self, page_number: int, width: Optional[float] = None,
+                 height: Optional[float] = None, unit: Optional[str] = None,
+                 angle: Optional[float] = None):
+        self.page_number = page_number
+        self.width = width
+        self.height = height
+        self.unit = unit
+        self.angle = angle
+
+
+class ResultadoCompacto:
+    """Sustituto ligero de AnalyzeResult con tables, paragraphs y pages."""
+    __slots__ = ("tables", "paragraphs", "pages")
+
+    def __init__(self, tables: List[TablaCompacta] = None,
+                 paragraphs: List[ParrafoCompacto] = None,
+                 pages: List[PaginaCompacta] = None):
+        self.tables = tables or []
+        self.paragraphs = paragraphs or []
+        self.pages = pages or []
+
+
+# ============================================================================
+# CONVERSIÓN DESDE EL SDK
+# ============================================================================
+
+def _regiones(elemento) -> Optional[List[RegionCompacta]]:
+    regiones = getattr(elemento, "bounding_regions", None)
+    if not regiones:
+        return None
+    return [RegionCompacta(r.page_number, [float(v) for v in r.polygon]) for r in regiones]
+
+
+def compactar(resultado) -> ResultadoCompacto:
+    """
+    Copia de un AnalyzeResult (o de cualquier objeto con la misma interfaz)
+    con solo los campos que usa el pipeline.
+    """
+    tablas = []
+    for tabla in getattr(resultado, "tables", None) or []:
+        celdas = [CeldaCompacta(c.row_index, c.column_index, c.content or "", _regiones(c))
+                  for c in tabla.cells or []]
+        tablas.append(TablaCompacta(tabla.row_count, tabla.column_count, celdas, _regiones(tabla)))
+
+    parrafos = [ParrafoCompacto(p.content or "", _regiones(p))
+                for p in getattr(resultado, "paragraphs", None) or []]
+
+    paginas = [PaginaCompacta(p.page_number, getattr(p, "width", None), getattr(p, "height", None),
+                              getattr(p, "unit", None), getattr(p, "angle", None))
+               for p in getattr(resultado, "pages", None) or []]
+
+    return ResultadoCompacto(tablas, parrafos, paginas)
+
+
+# ============================================================================
+# CONVERSIÓN DESDE EL JSON CRUDO DE DOCUMENT INTELLIGENCE
+# ============================================================================
+
+def cargar_json(datos: Union[bytes, str]):
+    """Parsea JSON con orjson si está disponible (con json estándar si no)."""
+    if ORJSON_DISPONIBLE:
+        return orjson.loads(datos)
+    return json.loads(datos)
+
+
+def _regiones_crudas(elemento: dict) -> Optional[List[RegionCompacta]]:
+    regiones = elemento.get("boundingRegions")
+    if not regiones:
+        return None
+    return [RegionCompacta(r["pageNumber"], [float(v) for v in r["polygon"]]) for r in regiones]
+
+
+def desde_json_crudo(datos: Union[bytes, str, dict]) -> ResultadoCompacto:
+    """
+    Construye el ResultadoCompacto directamente desde la respuesta de
+    prebuilt-layout, sin pasar por los modelos del SDK.
+
+    Solo se leen tables, paragraphs y los datos generales de pages; words,
+    lines, styles, spans y content quedan sin recorrer.
+
+    Args:
+        datos: Cuerpo de la respuesta (bytes/str) o dict ya parseado; puede ser
+               la operación completa ({"status", "analyzeResult"}) o solo
+               el analyzeResult
+    """
+    if not isinstance(datos, dict):
+        datos = cargar_json(datos)
+    if "analyzeResult" in datos:
+        datos = datos["analyzeResult"] or {}
+
+    tablas = []
+    for tabla in datos.get("tables") or ():
+        celdas = [CeldaCompacta(c["rowIndex"], c["columnIndex"], c.get("content") or "",
+                                _regiones_crudas(c))
+                  for c in tabla.get("cells") or ()]
+        tablas.append(TablaCompacta(tabla["rowCount"], tabla["columnCount"], celdas,
+                                    _regiones_crudas(tabla)))
+
+    parrafos = [ParrafoCompacto(p.get("content") or "", _regiones_crudas(p))
+                for p in datos.get("paragraphs") or ()]
+
+    paginas = [PaginaCompacta(p["pageNumber"], p.get("width"), p.get("height"),
+                              p.get("unit"), p.get("angle"))
+               for p in datos.get("pages") or ()]
+
+    return ResultadoCompacto(tablas, parrafos, paginas)
+
+
+# ============================================================================
+# FORMA PLANA (listas) PARA SERIALIZAR
+# ============================================================================
+# Cada región se guarda como [page_number, x1, y1, ..., x4, y4] para no
+# repetir nombres de campo en cada celda.
+
+def _a_lista_regiones(regiones) -> Optional[list]:
+    if regiones is None:
+        return None
+    return [[r.page_number, *r.polygon] for r in regiones]
+
+
+def _de_lista_regiones(datos) -> Optional[List[RegionCompacta]]:
+    if datos is None:
+        return None
+    return [RegionCompacta(int(r[0]), list(r[1:])) for r in datos]
+
+
+def a_lista(resultado: ResultadoCompacto) -> dict:
+    """Forma plana serializable (solo listas, números y cadenas)."""
+    return {
+        "v": VERSION,
+        "tablas": [[t.row_count, t.column_count, _a_lista_regiones(t.bounding_regions),
+                    [[c.row_index, c.column_index, c.content, _a_lista_regiones(c.bounding_regions)]
+                     for c in t.cells]]
+                   for t in resultado.tables],
+        "parrafos": [[p.content, _a_lista_regiones(p.bounding_regions)] for p in resultado.paragraphs],
+        "paginas": [[p.page_number, p.width, p.height, p.unit, p.angle] for p in resultado.pages],
+    }
+
+
+def de_lista(datos: dict) -> ResultadoCompacto:
+    """Reconstruye el ResultadoCompacto desde la forma plana de a_lista()."""
+    if datos.get("v") != VERSION:
+        raise ValueError(f"Versión de formato compacto no soportada: {datos.get('v')}")
+
+    tablas = [TablaCompacta(filas, columnas,
+                            [CeldaCompacta(f, c, texto, _de_lista_regiones(reg)) for f, c, texto, reg in celdas],
+                            _de_lista_regiones(regiones))
+              for filas, columnas, regiones, celdas in datos["tablas"]]
+    parrafos = [ParrafoCompacto(texto, _de_lista_regiones(reg)) for texto, reg in datos["parrafos"]]
+    paginas = [PaginaCompacta(*p) for p in datos["paginas"]]
+    return ResultadoCompacto(tablas, parrafos, paginas)
+
+
+# ============================================================================
+# SERIALIZACIÓN BINARIA
+# ============================================================================
+
+def _json_a_bytes(datos) -> bytes:
+    if ORJSON_DISPONIBLE:
+        return orjson.dumps(datos)
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def formato_preferido() -> bytes:
+    """Formato más compacto disponible en este entorno."""
+    if MSGPACK_DISPONIBLE:
+        return MSGPACK
+    if ZSTD_DISPONIBLE:
+        return ZSTD_JSON
+    return GZIP_JSON
+
+
+def serializar(resultado, formato: Optional[bytes] = None) -> bytes:
+    """
+    Serializa un resultado (SDK o compacto) a bytes.
+
+    Args:
+        resultado: AnalyzeResult o ResultadoCompacto
+        formato:   MSGPACK, ZSTD_JSON o GZIP_JSON (None = formato_preferido())
+
+    Returns:
+        Bytes con cabecera FIRMA + VERSION + formato
+    """
+    if not isinstance(resultado, ResultadoCompacto):
+        resultado = compactar(resultado)
+    formato = formato or formato_preferido()
+    datos = a_lista(resultado)
+
+    if formato == MSGPACK:
+        if not MSGPACK_DISPONIBLE:
+            raise ImportError("Instala msgpack: pip install msgpack")
+        cuerpo = msgpack.packb(datos, use_bin_type=True)
+    elif formato == ZSTD_JSON:
+        if not ZSTD_DISPONIBLE:
+            raise ImportError("Instala zstandard: pip install zstandard")
+        cuerpo = zstandard.ZstdCompressor(level=NIVEL_ZSTD).compress(_json_a_bytes(datos))
+    elif formato == GZIP_JSON:
+        cuerpo = gzip.compress(_json_a_bytes(datos), compresslevel=NIVEL_GZIP)
+    else:
+        raise ValueError(f"Formato desconocido: {formato!r}")
+
+    return FIRMA + bytes([VERSION]) + formato + cuerpo
+
+
+def deserializar(datos: bytes) -> ResultadoCompacto:
+    """Inversa de serializar()."""
+    if datos[:2] != FIRMA or datos[2] != VERSION:
+        raise ValueError("Los datos no son un resultado compacto válido")
+    formato, cuerpo = datos[3:4], datos[4:]
+
+    if formato == MSGPACK:
+        if not MSGPACK_DISPONIBLE:
+            raise ImportError("Instala msgpack: pip install msgpack")
+        return de_lista(msgpack.unpackb(cuerpo, raw=False))
+    if formato == ZSTD_JSON:
+        if not ZSTD_DISPONIBLE:
+            raise ImportError("Instala zstandard: pip install zstandard")
+        return de_lista(cargar_json(zstandard.ZstdDecompressor().decompress(cuerpo)))
+    if formato == GZIP_JSON:
+        return de_lista(cargar_json(gzip.decompress(cuerpo)))
+    raise ValueError(f"Formato desconocido: {formato!r}")
+
+
+def guardar_compacto(resultado, ruta: str, formato: Optional[bytes] = None) -> int:
+    """Guarda el resultado compacto en disco. Devuelve los bytes escritos."""
+    datos = serializar(resultado, formato)
+    with open(ruta, "wb") as f:
+        f.write(datos)
+    return len(datos)
+
+
+def cargar_compacto(ruta: str) -> ResultadoCompacto:
+    """Carga un resultado guardado con guardar_compacto()."""
+    with open(ruta, "rb") as f:
+        return deserializar(f.read())
+
+
+def main():
+    """
+    Punto de entrada para inspeccionar un archivo compacto.
+    Uso: python resultado_compacto.py <archivo.rc>
+    """
+    if len(sys.argv) < 2:
+        print("Uso: python resultado_compacto.py <archivo.rc>")
+        sys.exit(1)
+
+    resultado = cargar_compacto(sys.argv[1])
+    print(f"[INFO] Páginas: {len(resultado.pages)} | Párrafos: {len(resultado.paragraphs)} "
+          f"| Tablas: {len(resultado.tables)}")
+    for idx, tabla in enumerate(resultado.tables):
+        print(f"  - Tabla {idx + 1}: {tabla.row_count} filas x {tabla.column_count} columnas "
+              f"({len(tabla.cells)} celdas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,13 @@ Coordina el proceso completo de detección y recorte de tablas con Azure AI.
 
 Módulos utilizados:
   - credenciales.py        → cargar_credenciales
-  - analisis_azure.py      → analizar_documento, extraer_primera_tabla
-  - procesamiento_imagen.py → calcular_bounding_box, recortar_imagen,
-                               guardar_imagen, mostrar_imagen
+  - analisis_azure.py      → analizar_documento, extraer_tablas_interes
+  - procesamiento_imagen.py → mostrar_imagen
+  - motor_recorte.py       → recortar_tablas
+  - plantillas.py          → RegistroPlantillas (localización local opcional)
+  - deteccion_tablas.py    → detectar_tablas, seleccionar_tablas_interes,
+                             guardar_celdas (respaldo local si Azure falla)
+  - transporte.py          → TransporteCompartido (pool de conexiones opcional)
 """
 
 import os
@@ -31,8 +35,9 @@ try:
 except ImportError:
     pass # Se manejará en el método procesar
 
-from procesamiento_imagen import (calcular_bounding_box, recortar_imagen,
-                                   guardar_imagen, mostrar_imagen)
+from procesamiento_imagen import mostrar_imagen
+from motor_recorte import recortar_tablas
+from deteccion_tablas import detectar_tablas, seleccionar_tablas_interes, guardar_celdas
 
 # Importar efectos del Flujo 1
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -52,14 +57,22 @@ class TableExtractor:
         extractor.procesar("imagen.jpg", carpeta_salida="recortes/")
     """
 
-    def __init__(self, endpoint: str, api_key: str):
+    def __init__(self, endpoint: str, api_key: str, registro_plantillas=None,
+                 transporte=None):
         """
         Inicializa el cliente de Azure AI Document Intelligence.
 
         Args:
             endpoint: URL del endpoint de Azure AI
             api_key:  Clave de API de Azure AI
+            registro_plantillas: RegistroPlantillas opcional; si la página se alinea
+                                 con una plantilla, las tablas se ubican localmente
+            transporte: TransporteCompartido opcional; el cliente usa su pool de
+                        conexiones en lugar de abrir el suyo
         """
+        self.registro_plantillas = registro_plantillas
+        self._alineaciones = {}  # ruta -> polígonos de plantilla (o None), de localizar_tablas
+
         if not AZURE_AVAILABLE:
             print("[ERROR] No se pueden inicializar las credenciales de Azure porque faltan las librerías.")
             print("Instala las dependencias: pip install azure-ai-documentintelligence azure-core")
@@ -68,32 +81,57 @@ class TableExtractor:
 
         self.endpoint = endpoint
         self.api_key = api_key
+        opciones = {}
+        transporte_http = transporte.transporte_azure() if transporte is not None else None
+        if transporte_http is not None:
+            opciones["transport"] = transporte_http
         self.client = DocumentIntelligenceClient(
             endpoint=endpoint,
-            credential=AzureKeyCredential(api_key)
+            credential=AzureKeyCredential(api_key),
+            **opciones
         )
         print(f"[INFO] Cliente de Azure AI inicializado")
         print(f"[INFO] Endpoint: {endpoint}")
 
+    def localizar_tablas(self, ruta_imagen: str):
+        """
+        Ubica las tablas alineando la página con las plantillas registradas y
+        deja el resultado para procesar(). Se llama mientras Azure analiza la
+        imagen (mientras_espera de analisis_azure), así la alineación no suma
+        tiempo al documento. No hace nada sin plantillas o si ya se ubicó.
+        """
+        if self.registro_plantillas is None or ruta_imagen in self._alineaciones:
+            return
+        alineacion = self.registro_plantillas.localizar(ruta_imagen)
+        self._alineaciones[ruta_imagen] = alineacion["poligonos"] if alineacion else None
+
     def procesar(self, ruta_imagen: str, carpeta_salida: str = "../recortes",
-                 nombre_salida: Optional[str] = None, mostrar: bool = True) -> bool:
+                 nombre_salida: Optional[str] = None, mostrar: bool = True,
+                 resultado_azure=None) -> bool:
         """
         Pipeline completo: analiza el documento, extrae las tablas y las guarda.
 
         Pasos:
         1. Envía la imagen a Azure AI (analisis_azure.py)
-        2. Extrae los polígonos de las tablas de interés (analisis_azure.py)
-        3. Para cada tabla:
-            a. Calcula el bounding box rectangular
-            b. Recorta la región de la tabla
-            c. Guarda el recorte en disco
-            d. Muestra el resultado (opcional)
+        2. Ubica las tablas de interés: alineando con una plantilla registrada
+           (plantillas.py; se calcula mientras Azure analiza la imagen, o en el
+           lote mientras el análisis sigue en curso) o, si no hay
+           coincidencia, con el layout de Azure
+           (analisis_azure.py). Si Azure falla, con el detector local de
+           rejillas (deteccion_tablas.py), que además guarda la retícula de
+           celdas en <nombre>_celdas.json
+        3. Decodifica la imagen una sola vez y calcula los bounding boxes
+        4. Binariza una sola vez la región que une todas las tablas
+        5. Guarda cada recorte (vista de esa región) en paralelo
+        6. Muestra el resultado (opcional)
 
         Args:
             ruta_imagen:    Ruta a la imagen de entrada
             carpeta_salida: Carpeta donde guardar el resultado
             nombre_salida:  Nombre base del archivo de salida
             mostrar:        Si True, muestra la imagen resultante en pantalla
+            resultado_azure: AnalyzeResult ya obtenido (p.ej. en modo lote); si se
+                             indica, no se vuelve a llamar a Azure
 
         Returns:
             True si al menos una tabla fue procesada exitosamente
@@ -103,16 +141,32 @@ class TableExtractor:
             print("[ERROR] Cliente de Azure no inicializado due a falta de librerías o error.")
             return False
 
-        resultado = analizar_documento(self.client, ruta_imagen)
+        if resultado_azure is not None:
+            resultado = resultado_azure
+        else:
+            resultado = analizar_documento(self.client, ruta_imagen,
+                                           mientras_espera=lambda: self.localizar_tablas(ruta_imagen))
         if resultado is None:
+            # Respaldo: las tablas se recortan igual con plantilla o detección local,
+            # aunque sin Azure no habrá lectura de celdas
             print("\n[FALLO] No se pudo analizar el documento")
-            return False
+            print("[INFO] Se recortarán las tablas sin Azure (plantilla o detector local)")
+
+        # 2. Ubicar las tablas de interés
+        # Con plantilla: homografía local, normalmente ya calculada durante la
+        # espera de Azure (si no, p.ej. con un layout guardado, se calcula ahora)
+        rejillas = None
+        self.localizar_tablas(ruta_imagen)
+        polygons = self._alineaciones.pop(ruta_imagen, None)
+
+        if polygons is None and resultado is not None:
+            # Se busca incluir el encabezado "TOTAL DE VOTOS SACADOS DE LAS URNAS" (Sección verde)
+            texto_encabezado = ["TOTAL DE VOTOS SACADOS DE LAS URNAS", "Copie del apartado 7", "7 TOTAL DE VOTOS"]
+            polygons = extraer_tablas_interes(resultado, texto_encabezado, filas_tabla2=16)
+        elif polygons is None:
+            rejillas = seleccionar_tablas_interes(detectar_tablas(ruta_imagen))
+            polygons = [tabla["poligono"] for tabla in rejillas]
 
-        # 2. Extraer polígonos de las tablas de interés
-        # Se busca incluir el encabezado "TOTAL DE VOTOS SACADOS DE LAS URNAS" (Sección verde)
-        texto_encabezado = ["TOTAL DE VOTOS SACADOS DE LAS URNAS", "Copie del apartado 7", "7 TOTAL DE VOTOS"]
-        polygons = extraer_tablas_interes(resultado, texto_encabezado, filas_tabla2=16)
-        
         if not polygons:
             print("\n[FALLO] No se pudieron extraer tablas")
             return False
@@ -130,47 +184,33 @@ class TableExtractor:
         try:
             path_salida = Path(carpeta_salida)
             if path_salida.exists():
-                for archivo_previo in path_salida.glob(f"{nombre_base}_tabla_*.jpg"):
+                for archivo_previo in path_salida.glob(f"{nombre_base}_TABLA_*.jpg"):
                     archivo_previo.unlink()
+                celdas_previas = path_salida / f"{nombre_base}_celdas.json"
+                if celdas_previas.exists():
+                    celdas_previas.unlink()
         except Exception as e:
             print(f"[ADVERTENCIA] No se pudieron limpiar archivos previos: {e}")
 
-        for idx, polygon in enumerate(polygons):
-            print(f"\n--- Procesando Tabla #{idx + 1} ---")
-            
-            # 3. Calcular bounding box
-            x_min, y_min, x_max, y_max = calcular_bounding_box(polygon)
-
-            # 4. Recortar imagen
-            imagen_recortada = recortar_imagen(ruta_imagen, x_min, y_min, x_max, y_max)
-            if imagen_recortada is None:
-                print(f"[FALLO] No se pudo recortar la tabla #{idx + 1}")
-                continue
-
-            # 5. Solo binarizado (blanco y negro) solicitado por el usuario
-            filtros = ["blanco_negro"]
-            
-            print(f"[INFO] Generando recorte blanco y negro para la tabla #{idx + 1}...")
-            
-            for modo in filtros:
-                # Aplicar el filtro a la imagen recortada
-                imagen_filtrada = aplicar_efecto_escaner(imagen_recortada, modo=modo)
-                
-                # Definir nombre de archivo: nombre_tabla_1.jpg (solo BN)
-                sufijo = f"_TABLA_{idx + 1}.jpg"
-                nombre_archivo = f"{nombre_base}{sufijo}"
-                
-                # Guardar resultado
-                guardar_imagen(imagen_filtrada, carpeta_salida, nombre_archivo)
-                
-                # Mostrar si se solicita
-                if mostrar:
-                    mostrar_imagen(imagen_filtrada, titulo=f"Tabla {idx + 1} - Binarizada")
+        # 3-5. Decodificar una vez, binarizar la región unida una vez y guardar
+        #      los recortes (vistas) en paralelo
+        print(f"[INFO] Generando recortes blanco y negro...")
+        recortes = recortar_tablas(
+            ruta_imagen, polygons, carpeta_salida, nombre_base,
+            filtro=lambda region: aplicar_efecto_escaner(region, modo="blanco_negro")
+        )
+
+        if rejillas and recortes:
+            guardar_celdas(rejillas, os.path.join(carpeta_salida, f"{nombre_base}_celdas.json"))
 
+        for idx, _, imagen_filtrada in recortes:
+            # Mostrar si se solicita
+            if mostrar:
+                mostrar_imagen(imagen_filtrada, titulo=f"Tabla {idx + 1} - Binarizada")
             exito_global = True
 
         print("\n" + "="*70)
-        if exito_global:
+        if exito_global and resultado is not None:
             print("PROCESO COMPLETADO EXITOSAMENTE")
         else:
             print("PROCESO FINALIZADO CON ERRORES")
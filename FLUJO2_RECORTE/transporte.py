@@ -0,0 +1,190 @@
+"""
+Transporte HTTP compartido para FLUJO 2 y FLUJO 4.
+Un único pool de conexiones keep-alive, dimensionado según la concurrencia,
+que se inyecta tanto en el cliente de Document Intelligence (azure-core sobre
+requests) como en el de Azure OpenAI (httpx). Así las conexiones TLS se
+abren una vez y se reutilizan entre documentos y entre peticiones de sondeo.
+
+Uso básico:
+    transporte = TransporteCompartido(max_conexiones=8)
+    client = DocumentIntelligenceClient(endpoint, credential, transport=transporte.transporte_azure())
+    openai = AzureOpenAI(..., http_client=transporte.cliente_openai())
+    print(transporte.estadisticas())
+"""
+
+import importlib.util
+import threading
+from typing import Dict
+
+# Manejo seguro de importaciones
+REQUESTS_DISPONIBLE = False
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from azure.core.pipeline.transport import RequestsTransport
+    REQUESTS_DISPONIBLE = True
+except ImportError:
+    pass
+
+HTTPX_DISPONIBLE = False
+try:
+    import httpx
+    HTTPX_DISPONIBLE = True
+except ImportError:
+    pass
+
+# HTTP/2 solo si está instalado el paquete 'h2' (pip install httpx[http2])
+HTTP2_DISPONIBLE = HTTPX_DISPONIBLE and importlib.util.find_spec("h2") is not None
+
+
+# Conexiones por host en el pool (≈ operaciones simultáneas del modo lote)
+MAX_CONEXIONES = 8
+
+# Timeouts (segundos)
+TIMEOUT_CONEXION = 10.0
+TIMEOUT_LECTURA = 120.0       # GPT-4o puede tardar con documentos grandes
+KEEPALIVE_EXPIRA = 60.0       # Conexiones inactivas que httpx mantiene abiertas
+
+
+class TransporteCompartido:
+    """
+    Pool de conexiones HTTP compartido por los clientes de Azure.
+    Cuenta peticiones y conexiones nuevas para medir la reutilización.
+    """
+
+    def __init__(self, max_conexiones: int = MAX_CONEXIONES,
+                 timeout_conexion: float = TIMEOUT_CONEXION,
+                 timeout_lectura: float = TIMEOUT_LECTURA,
+                 http2: bool = True):
+        """
+        Args:
+            max_conexiones:   Conexiones keep-alive por host (usar la concurrencia del lote)
+            timeout_conexion: Tiempo máximo para abrir la conexión
+            timeout_lectura:  Tiempo máximo de espera de la respuesta
+            http2:            Usar HTTP/2 con OpenAI si 'h2' está instalado
+                              (requests/azure-core solo hablan HTTP/1.1)
+        """
+        self.max_conexiones = max_conexiones
+        self.timeout_conexion = timeout_conexion
+        self.timeout_lectura = timeout_lectura
+        self.http2 = http2 and HTTP2_DISPONIBLE
+
+        self._sesion = None
+        self._cliente_httpx = None
+        self._bloqueo = threading.Lock()
+        self._peticiones_httpx = 0
+        self._conexiones_httpx = 0
+
+    # ── Document Intelligence (azure-core + requests) ──
+
+    def transporte_azure(self):
+        """
+        Transporte de azure-core sobre una sesión requests compartida.
+
+        Returns:
+            RequestsTransport para pasar como transport= al cliente, o None si
+            faltan las librerías (el cliente usará su transporte por defecto)
+        """
+        if not REQUESTS_DISPONIBLE:
+            return None
+
+        if self._sesion is None:
+            self._sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=self.max_conexiones,
+                                    pool_maxsize=self.max_conexiones,
+                                    max_retries=0)  # azure-core ya reintenta
+            self._sesion.mount("https://", adaptador)
+            self._sesion.mount("http://", adaptador)
+
+        return RequestsTransport(session=self._sesion, session_owner=False,
+                                 connection_timeout=self.timeout_conexion,
+                                 read_timeout=self.timeout_lectura)
+
+    # ── Azure OpenAI (httpx) ──
+
+    def cliente_openai(self):
+        """
+        Cliente httpx compartido para AzureOpenAI(http_client=...).
+
+        Returns:
+            httpx.Client o None si httpx no está disponible
+        """
+        if not HTTPX_DISPONIBLE:
+            return None
+
+        if self._cliente_httpx is None:
+            self._cliente_httpx = httpx.Client(
+                limits=httpx.Limits(max_connections=self.max_conexiones,
+                                    max_keepalive_connections=self.max_conexiones,
+                                    keepalive_expiry=KEEPALIVE_EXPIRA),
+                timeout=httpx.Timeout(self.timeout_lectura, connect=self.timeout_conexion),
+                http2=self.http2,
+                event_hooks={"request": [self._al_enviar_httpx]},
+            )
+        return self._cliente_httpx
+
+    def _al_enviar_httpx(self, peticion):
+        """Cuenta la petición y engancha la traza de httpcore para ver conexiones nuevas."""
+        with self._bloqueo:
+            self._peticiones_httpx += 1
+        peticion.extensions["trace"] = self._traza_httpx
+
+    def _traza_httpx(self, evento: str, info: dict):
+        if evento == "connection.connect_tcp.complete":
+            with self._bloqueo:
+                self._conexiones_httpx += 1
+
+    # ── Métricas ──
+
+    def _contadores_requests(self):
+        """(peticiones, conexiones nuevas) acumuladas en los pools de urllib3."""
+        peticiones = conexiones = 0
+        if self._sesion is None:
+            return peticiones, conexiones
+        for adaptador in set(self._sesion.adapters.values()):
+            pools = getattr(adaptador, "poolmanager", None)
+            if pools is None:
+                continue
+            for clave in list(pools.pools.keys()):
+                pool = pools.pools.get(clave)
+                if pool is not None:
+                    peticiones += pool.num_requests
+                    conexiones += pool.num_connections
+        return peticiones, conexiones
+
+    def estadisticas(self) -> Dict[str, float]:
+        """
+        Peticiones, conexiones abiertas y tasa de reutilización acumuladas.
+
+        Returns:
+            {'peticiones', 'conexiones_nuevas', 'reutilizadas', 'tasa_reutilizacion',
+             'docint_peticiones', 'docint_conexiones', 'openai_peticiones',
+             'openai_conexiones'}
+        """
+        docint_peticiones, docint_conexiones = self._contadores_requests()
+        with self._bloqueo:
+            openai_peticiones, openai_conexiones = self._peticiones_httpx, self._conexiones_httpx
+
+        peticiones = docint_peticiones + openai_peticiones
+        conexiones = docint_conexiones + openai_conexiones
+        reutilizadas = max(0, peticiones - conexiones)
+        return {
+            "peticiones": peticiones,
+            "conexiones_nuevas": conexiones,
+            "reutilizadas": reutilizadas,
+            "tasa_reutilizacion": reutilizadas / peticiones if peticiones else 0.0,
+            "docint_peticiones": docint_peticiones,
+            "docint_conexiones": docint_conexiones,
+            "openai_peticiones": openai_peticiones,
+            "openai_conexiones": openai_conexiones,
+        }
+
+    def cerrar(self):
+        """Cierra las conexiones del pool."""
+        if self._sesion is not None:
+            self._sesion.close()
+            self._sesion = None
+        if self._cliente_httpx is not None:
+            self._cliente_httpx.close()
+            self._cliente_httpx = None
+
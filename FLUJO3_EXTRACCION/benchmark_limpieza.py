@@ -0,0 +1,154 @@
+"""
+Benchmark de limpieza de texto - FLUJO 3
+=========================================
+Compara la limpieza de celdas de limpieza.py con la versión original
+(lista de reemplazos recorrida en cada llamada) sobre un corpus de celdas
+parecido al de las actas reales, y verifica que ambas den el mismo texto.
+
+Uso:
+    python benchmark_limpieza.py              # 200 actas sintéticas
+    python benchmark_limpieza.py 1000         # otra cantidad de actas
+"""
+
+import random
+import re
+import sys
+import time
+
+import limpieza
+
+REPETICIONES = 5
+
+
+# ─── Versión original (referencia) ───────────────────────────────────────────
+
+def _limpiar_texto_original(texto: str) -> str:
+    ruido = [
+        ":unselected:", ":selected:", "selected", "unselected",
+        "○", "□", "✓", "—",
+        "(Con letra)", "(Con número)", "(Con numera)", "@",
+        "Personas que votaron", "Representantes", "Total de personas"
+    ]
+    resultado = texto
+    for r in ruido:
+        resultado = resultado.replace(r, "")
+    resultado = resultado.strip(" .-_,")
+    texto_lower = resultado.lower()
+    if (texto_lower.startswith("copie") or
+        texto_lower.startswith("escriba") or
+        "del apartado" in texto_lower or
+        "de la hoja" in texto_lower or
+        len(resultado) > 60):
+        return ""
+    return resultado
+
+
+def _limpiar_texto_ligero_original(texto: str) -> str:
+    resultado = texto
+    for r in [":unselected:", ":selected:", "○", "□", "✓", "—", "@"]:
+        resultado = resultado.replace(r, "")
+    return resultado.strip()
+
+
+def _corregir_ocr_original(texto: str) -> str:
+    for letra, digito in limpieza.CORRECCIONES_OCR.items():
+        texto = texto.replace(letra, digito)
+    return texto
+
+
+def _separar_original(texto: str):
+    return re.sub(r'[^0-9]', '', texto), re.sub(r'[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ]', '', texto)
+
+
+# ─── Corpus ──────────────────────────────────────────────────────────────────
+
+_UNIDADES = ["uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve"]
+_CENTENAS = ["ciento", "doscientos", "trescientos", "cuatrocientos", "quinientos"]
+
+_FIJAS = [
+    ":selected:", ":unselected:", "○", "□ 94", "Boletas sobrantes", "(Con letra)",
+    "(Con número)", "Personas que votaron", "Representantes de partidos",
+    "Total de personas que votaron", "Copie del apartado 7 de la hoja de operaciones",
+    "Escriba la cantidad con número", "96 Personas que votaron", "97 Representantes",
+    "98 Total", "99", "TOTAL DE VOTOS SACADOS DE LAS URNAS", "— @ —", "",
+]
+
+
+def _celda_numero(aleatorio: random.Random) -> str:
+    numero = aleatorio.randint(0, 599)
+    letra = _CENTENAS[numero // 100 - 1] if numero >= 100 else ""
+    if numero % 100:
+        letra = f"{letra} {aleatorio.choice(_UNIDADES)}".strip()
+    forma = aleatorio.random()
+    if forma < 0.4:
+        return str(numero)
+    if forma < 0.7:
+        return letra.capitalize()
+    if forma < 0.85:
+        return f"(Con letra) {letra}"
+    return f"{numero} :selected:"
+
+
+def corpus_celdas(num_actas: int, semilla: int = 0) -> list:
+    """Contenidos de celda de num_actas actas (26 filas × 4 columnas cada una)."""
+    aleatorio = random.Random(semilla)
+    celdas = []
+    for _ in range(num_actas):
+        for fila in range(26):
+            celdas.append(f"{aleatorio.choice('OSIl') if aleatorio.random() < 0.1 else ''}{fila + 10:02d}")
+            celdas.append(aleatorio.choice(_FIJAS))
+            celdas.append(_celda_numero(aleatorio))
+            celdas.append(_celda_numero(aleatorio))
+    return celdas
+
+
+# ─── Medición ────────────────────────────────────────────────────────────────
+
+def medir(nombre: str, funcion, celdas: list) -> float:
+    """Imprime el tiempo medio por celda de aplicar funcion a todo el corpus."""
+    t0 = time.perf_counter()
+    for _ in range(REPETICIONES):
+        for celda in celdas:
+            funcion(celda)
+    por_celda = (time.perf_counter() - t0) / (REPETICIONES * len(celdas))
+    print(f"  {nombre:<34} {por_celda * 1e9:>9.0f} ns/celda")
+    return por_celda
+
+
+def main():
+    num_actas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    celdas = corpus_celdas(num_actas)
+
+    # Misma salida que la versión original
+    for celda in celdas:
+        if (limpieza.limpiar_texto(celda) != _limpiar_texto_original(celda) or
+                limpieza.limpiar_texto_ligero(celda) != _limpiar_texto_ligero_original(celda) or
+                limpieza.corregir_ocr(celda) != _corregir_ocr_original(celda) or
+                (limpieza.solo_digitos(celda), limpieza.solo_letras(celda)) != _separar_original(celda)):
+            print(f"[ERROR] La limpieza difiere de la original en {celda!r}")
+            sys.exit(1)
+    limpieza.vaciar_memo()
+
+    print("\n" + "=" * 60)
+    print(f"  {len(celdas)} celdas ({len(set(celdas))} distintas), {num_actas} actas")
+    print("=" * 60)
+    original = medir("limpiar_texto (original)", _limpiar_texto_original, celdas)
+    nuevo = medir("limpiar_texto", limpieza.limpiar_texto, celdas)
+    print(f"  {'':<34} {original / nuevo:>9.1f}x")
+
+    original = medir("limpiar_texto_ligero (original)", _limpiar_texto_ligero_original, celdas)
+    nuevo = medir("limpiar_texto_ligero", limpieza.limpiar_texto_ligero, celdas)
+    print(f"  {'':<34} {original / nuevo:>9.1f}x")
+
+    original = medir("corrección OCR (original)", _corregir_ocr_original, celdas)
+    nuevo = medir("corregir_ocr", limpieza.corregir_ocr, celdas)
+    print(f"  {'':<34} {original / nuevo:>9.1f}x")
+    print("=" * 60)
+
+    for nombre, info in limpieza.estadisticas_memo().items():
+        print(f"[INFO] {nombre}: {info['hits']} aciertos, {info['misses']} fallos, "
+              f"{info['currsize']}/{info['maxsize']} en memoria")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,24 @@ Exportador TOON — FLUJO 3
 Orquesta la exportación de datos extraídos de Azure
 en formato TOON (ID : VALOR).
 
-Dos modos:
-  - Con validador IA: extrae pares crudos → pre-valida localmente
+Las celdas de cada tabla se leen una sola vez (registros.py); ambos modos
+y la lectura cruda se renderizan desde esos registros.
+
+Tres modos:
+  - Con validador IA: pares crudos → pre-valida localmente
                       → 1 llamada OpenAI (solo los no resueltos) → guarda
-  - Sin validador:    extrae solo dígitos con regex → guarda
+  - Solo local:       pares crudos → validar_campo en cada campo
+                      → los no resueltos quedan con confianza baja → guarda
+  - Sin validador:    solo los dígitos del regex → guarda
 """
 
 import os
-import re
 import sys
 import time
 from typing import List, Dict, Any, Optional
 
-from extractores import extraer_pares_tabla_1, extraer_pares_tabla_2, extraer_pares_tabla_3
-from exportador_regex import procesar_tabla_1, procesar_tabla_2, procesar_tabla_3, formatear_tabla_generica
+from limpieza import solo_digitos, solo_letras
+from registros import extraer_registros, pares_crudos, texto_regex
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Importar el ConvertidorTextoNumeros (FLUJO 4 — módulo local, sin API)
@@ -29,13 +33,15 @@ try:
     _flujo4_path = os.path.normpath(_flujo4_path)
     if _flujo4_path not in sys.path:
         sys.path.insert(0, _flujo4_path)
-    from convertidor_texto_numeros import ConvertidorTextoNumeros
+    from convertidor_texto_numeros import obtener_convertidor
+    from consistencia import MotorConsistencia, candidatos_campo
     _CONVERTIDOR_DISPONIBLE = True
 except ImportError:
     pass  # Seguirá funcionando, pero sin pre-validación local
 
 
 # Umbral mínimo de confianza para aceptar un resultado local sin recurrir a OpenAI
+# (se calibra con FLUJO4_VALIDACION/calibracion.py)
 _CONFIANZA_MINIMA = 0.75
 
 
@@ -43,16 +49,18 @@ class ToonExporter:
     """Exporta datos de Azure AI a formato TOON (ID : VALOR)."""
 
     def guardar_toon(self, resultado_azure, ruta_salida_base: str,
-                     nombre_documento: str, validador=None):
+                     nombre_documento: str, validador=None, solo_local: bool = False):
         """
         Punto de entrada principal.
 
         Si hay validador (FLUJO 4) → extracción cruda + pre-validación local
                                      + 1 llamada OpenAI (solo campos no resueltos).
+        Si solo_local → extracción cruda + ConvertidorTextoNumeros en cada campo,
+                        sin OpenAI (los no resueltos quedan con confianza baja).
         Si no → extracción con regex (comportamiento original).
 
         Returns:
-            dict con tiempos/tokens si hay validador, bool si no.
+            dict con tiempos/tokens si hay validador o solo_local, bool si no.
         """
         if not hasattr(resultado_azure, 'tables') or not resultado_azure.tables:
             print("[INFO] No se encontraron tablas para exportar en el resultado de Azure.")
@@ -62,7 +70,13 @@ class ToonExporter:
             return self._guardar_con_validacion(
                 resultado_azure, ruta_salida_base, nombre_documento, validador
             )
+        elif solo_local and _CONVERTIDOR_DISPONIBLE:
+            return self._guardar_solo_local(
+                resultado_azure, ruta_salida_base, nombre_documento
+            )
         else:
+            if solo_local:
+                print("[ADVERTENCIA] ConvertidorTextoNumeros no disponible — se usa el modo regex")
             return self._guardar_sin_validacion(
                 resultado_azure, ruta_salida_base, nombre_documento
             )
@@ -93,17 +107,16 @@ class ToonExporter:
             "tokens": {"prompt": 0, "respuesta": 0, "total": 0},
         }
 
-        extractores = [extraer_pares_tabla_1, extraer_pares_tabla_2, extraer_pares_tabla_3]
         num_tablas = min(len(resultado_azure.tables), 3)
-        todos_los_pares = []
+        registros_por_tabla = []
         pares_por_tabla = {}
 
         # ── PASO 1: Extraer pares crudos (LOCAL) ──
         t0 = time.time()
         for i in range(num_tablas):
-            tabla = resultado_azure.tables[i]
-            pares = extractores[i](tabla) if i < len(extractores) else []
-            todos_los_pares.append(pares)
+            registros = extraer_registros(resultado_azure.tables[i], i + 1)
+            registros_por_tabla.append(registros)
+            pares = pares_crudos(registros)
             if pares:
                 pares_por_tabla[i + 1] = pares
                 print(f"[INFO] Tabla {i + 1}: {len(pares)} pares crudos extraídos")
@@ -117,70 +130,42 @@ class ToonExporter:
 
         # ── PASO 1.5: Pre-validación LOCAL con ConvertidorTextoNumeros ──
         # Resuelve localmente los pares que puede, sin gastar tokens de OpenAI
-        resultados_locales_por_tabla = {}  # {num_tabla: {id_campo: resultado_dict}}
-        pares_para_ia_por_tabla = {}       # Solo los que no se pudieron resolver
-
         if _CONVERTIDOR_DISPONIBLE:
-            convertidor = ConvertidorTextoNumeros()
-            total_resueltos_local = 0
-            total_para_ia = 0
-
-            print(f"\n[INFO] ── Pre-validación local (ConvertidorTextoNumeros) ──")
-
-            for num_tabla, pares in sorted(pares_por_tabla.items()):
-                resultados_locales_por_tabla[num_tabla] = {}
-                pares_para_ia_por_tabla[num_tabla] = []
-
-                for par in pares:
-                    id_campo = par["id"]
-                    contenidos = par["contenidos"]
-
-                    # Detectar qué contenido es texto-letra y cuál es dígito
-                    texto_letra, texto_digito = _separar_letra_y_digito(contenidos)
-
-                    resuelto = False
-                    if texto_letra:
-                        res = convertidor.validar_campo(texto_letra, texto_digito or "")
-                        metodo = res.get("metodo", "")
-                        confianza = res.get("confianza", 0.0)
-                        valor = res.get("valor")
-
-                        # Aceptar resultado local si la confianza es suficiente
-                        # y no requiere IA (metodo != 'necesita_ia')
-                        if (metodo != "necesita_ia" and
-                                metodo != "sin_resultado" and
-                                confianza >= _CONFIANZA_MINIMA and
-                                valor is not None):
-                            resultados_locales_por_tabla[num_tabla][id_campo] = {
-                                "id": id_campo,
-                                "tabla": num_tabla,
-                                "valor": valor,
-                                "confianza": "alta" if confianza >= 0.95 else "media",
-                                "razonamiento": f"[LOCAL] {res.get('detalle', metodo)}"
-                            }
-                            resuelto = True
-                            total_resueltos_local += 1
-                            emoji = "✅" if confianza >= 0.95 else "⚠️"
-                            print(f"  {emoji} T{num_tabla} ID {id_campo}: {valor} "
-                                  f"[local/{metodo}] — '{texto_letra}'")
-
-                    if not resuelto:
-                        pares_para_ia_por_tabla[num_tabla].append(par)
-                        total_para_ia += 1
-
-                # Limpiar tabla si no quedaron pares para IA
-                if not pares_para_ia_por_tabla[num_tabla]:
-                    del pares_para_ia_por_tabla[num_tabla]
+            resultados_locales_por_tabla, pendientes = self._prevalidar_local(pares_por_tabla)
+            pares_antes = {t: [par for par, _ in p] for t, p in pendientes.items() if p}
+
+            # Las sumas del acta resuelven parte de los pendientes
+            resultado["consistencia"] = self._aplicar_consistencia(
+                pares_por_tabla, registros_por_tabla, resultados_locales_por_tabla, pendientes
+            )
 
+            # Solo los que no se pudieron resolver
+            pares_para_ia_por_tabla = {t: [par for par, _ in p] for t, p in pendientes.items() if p}
+            estimar = getattr(validador, "estimar_tokens", None)
+            if estimar and pares_antes:
+                resultado["consistencia"]["llamadas_evitadas"] = 0 if pares_para_ia_por_tabla else 1
+                resultado["consistencia"]["tokens_evitados"] = (
+                    estimar(pares_antes) - estimar(pares_para_ia_por_tabla))
+                if resultado["consistencia"]["resueltos"]:
+                    print(f"[INFO] Consistencia: ~{resultado['consistencia']['tokens_evitados']:,} tokens "
+                          f"y {resultado['consistencia']['llamadas_evitadas']} llamada(s) a OpenAI evitados")
             print(f"\n[INFO] Pre-validación local: "
-                  f"{total_resueltos_local} campo(s) resueltos sin IA, "
-                  f"{total_para_ia} campo(s) pendientes para OpenAI")
+                  f"{sum(len(r) for r in resultados_locales_por_tabla.values())} campo(s) resueltos sin IA, "
+                  f"{sum(len(p) for p in pares_para_ia_por_tabla.values())} campo(s) pendientes para OpenAI")
         else:
             # Sin convertidor: todos van a OpenAI
             pares_para_ia_por_tabla = pares_por_tabla
             resultados_locales_por_tabla = {t: {} for t in pares_por_tabla}
             print("[INFO] ConvertidorTextoNumeros no disponible — todos los campos irán a OpenAI")
 
+        # Proporción de campos que terminan en OpenAI (lo que la validación local no cubre)
+        total_campos = sum(len(p) for p in pares_por_tabla.values())
+        enviados = sum(len(p) for p in pares_para_ia_por_tabla.values())
+        resultado["envio_ia"] = {"campos": total_campos, "enviados": enviados,
+                                 "proporcion": enviados / total_campos if total_campos else 0.0}
+        print(f"[INFO] Enviados a OpenAI: {enviados}/{total_campos} campos "
+              f"({resultado['envio_ia']['proporcion']:.0%})")
+
         # ── PASO 2: UNA SOLA llamada a Azure OpenAI (solo campos no resueltos) ──
         resultados_ia_por_tabla = {t: [] for t in pares_por_tabla}
 
@@ -208,6 +193,9 @@ class ToonExporter:
         # ── PASO 3: Combinar resultados locales + IA y guardar ──
         contenido_total = []
         todos_los_resultados = []  # Para lectura cruda (orden por tabla)
+        # Texto con letra → valor de los campos que OpenAI resolvió con confianza
+        # alta: historial etiquetado para aprender las confusiones de OCR
+        resultado["etiquetas_ia"] = []
 
         for i in range(num_tablas):
             num_tabla = i + 1
@@ -217,6 +205,12 @@ class ToonExporter:
             # Unificar: los de IA como dict por id para deduplicar
             ia_por_id = {str(r.get("id", "")).strip(): r for r in ia_lista}
 
+            for par in pares_para_ia_por_tabla.get(num_tabla, []):
+                r = ia_por_id.get(par["id"])
+                texto_letra, _ = _separar_letra_y_digito(par["contenidos"])
+                if texto_letra and r and r.get("valor") is not None and r.get("confianza") == "alta":
+                    resultado["etiquetas_ia"].append({"texto": texto_letra, "valor": r["valor"]})
+
             # Orden de IDs: primero los del par original para mantener secuencia
             pares_originales = pares_por_tabla.get(num_tabla, [])
             ids_orden = [par["id"] for par in pares_originales]
@@ -267,7 +261,268 @@ class ToonExporter:
         t0 = time.time()
         self._generar_lectura_cruda(
             resultado_azure, ruta_salida_base, num_tablas,
-            todos_los_pares, todos_los_resultados
+            registros_por_tabla, todos_los_resultados
+        )
+        resultado["tiempo_lectura_cruda"] = time.time() - t0
+
+        return resultado
+
+    def _prevalidar_local(self, pares_por_tabla: dict, validar_sin_letra: bool = False):
+        """
+        Valida cada par crudo con ConvertidorTextoNumeros (sin API).
+
+        Args:
+            pares_por_tabla:   {num_tabla: [{"id", "contenidos"}, ...]}
+            validar_sin_letra: Si True, también se llama a validar_campo cuando
+                               el par no tiene texto con letra (solo dígitos)
+
+        Returns:
+            (resueltos, pendientes):
+              resueltos  = {num_tabla: {id_campo: resultado}} con confianza suficiente
+              pendientes = {num_tabla: [(par, respuesta de validar_campo o None)]}
+        """
+        convertidor = obtener_convertidor()
+        resueltos = {}
+        pendientes = {}
+
+        print(f"\n[INFO] ── Pre-validación local (ConvertidorTextoNumeros) ──")
+
+        for num_tabla, pares in sorted(pares_por_tabla.items()):
+            resueltos[num_tabla] = {}
+            pendientes[num_tabla] = []
+
+            for par in pares:
+                id_campo = par["id"]
+
+                # Detectar qué contenido es texto-letra y cuál es dígito
+                texto_letra, texto_digito = _separar_letra_y_digito(par["contenidos"])
+
+                res = None
+                if texto_letra or validar_sin_letra:
+                    res = convertidor.validar_campo(texto_letra or "", texto_digito or "")
+                    metodo = res.get("metodo", "")
+                    confianza = res.get("confianza", 0.0)
+                    valor = res.get("valor")
+
+                    # Aceptar resultado local si la confianza es suficiente
+                    # y no requiere IA (metodo != 'necesita_ia')
+                    if (texto_letra and
+                            metodo != "necesita_ia" and
+                            metodo != "sin_resultado" and
+                            confianza >= _CONFIANZA_MINIMA and
+                            valor is not None):
+                        resueltos[num_tabla][id_campo] = {
+                            "id": id_campo,
+                            "tabla": num_tabla,
+                            "valor": valor,
+                            "confianza": "alta" if confianza >= 0.95 else "media",
+                            "razonamiento": f"[LOCAL] {res.get('detalle', metodo)}"
+                        }
+                        emoji = "✅" if confianza >= 0.95 else "⚠️"
+                        print(f"  {emoji} T{num_tabla} ID {id_campo}: {valor} "
+                              f"[local/{metodo}] — '{texto_letra}'")
+                        continue
+
+                pendientes[num_tabla].append((par, res))
+
+        # La memoria del convertidor se conserva entre actas del mismo proceso
+        memo = convertidor.estadisticas_memo()
+        print(f"[INFO] Memoria del convertidor: {memo['exacto']['tasa_aciertos']:.0%} aciertos exactos, "
+              f"{memo['fuzzy']['tasa_aciertos']:.0%} difusos "
+              f"({memo['exacto']['currsize'] + memo['fuzzy']['currsize']} textos recordados)")
+
+        return resueltos, pendientes
+
+    def _aplicar_consistencia(self, pares_por_tabla: dict, registros_por_tabla: list,
+                              resueltos: dict, pendientes: dict) -> dict:
+        """
+        Pasa todos los campos por el motor de consistencia (96 + 97 = 98,
+        suma de la Tabla 2 = 99, 98 = 99). Los pendientes que las sumas
+        resuelven o confirman pasan a resueltos; un resultado local que no
+        cuadra se corrige. Modifica resueltos y pendientes.
+
+        Returns:
+            {'resueltos', 'corregidos', 'ambiguos', 'restricciones', 'relajadas'}
+        """
+        convertidor = obtener_convertidor()
+        campos = {}
+        for num_tabla, pares in pares_por_tabla.items():
+            registros = registros_por_tabla[num_tabla - 1] if num_tabla <= len(registros_por_tabla) else []
+            digitos_por_id = {r["id"]: r["digitos"] for r in registros if r["digitos"]}
+            for par in pares:
+                # La celda con letra más convincente (el texto más largo suele
+                # ser la etiqueta del renglón); el dígito del regex sale de la
+                # columna de votos, no del ID
+                letras = [c for c in par["contenidos"] if len(solo_letras(c)) >= 3]
+                candidatos_letra = max((convertidor.candidatos(c) for c in letras),
+                                       key=lambda cs: cs[0][1] if cs else 0.0, default=[])
+                campos[(num_tabla, par["id"])] = candidatos_campo(
+                    convertidor, candidatos_letra, digitos_por_id.get(par["id"]))
+
+        motor = MotorConsistencia(confianza_minima=_CONFIANZA_MINIMA).resolver(campos)
+        informe = {"resueltos": 0, "corregidos": 0, "ambiguos": len(motor["ambiguos"]),
+                   "restricciones": motor["restricciones"], "relajadas": motor["relajadas"]}
+
+        print(f"\n[INFO] ── Consistencia aritmética ──")
+        for nombre, estado in motor["restricciones"]:
+            emoji = {"cumple": "✅", "no cumple": "❌"}.get(estado, "⬜")
+            print(f"  {emoji} {nombre}: {estado}")
+        for nombre in motor["relajadas"]:
+            print(f"  ⚠️ {nombre}: el acta no cuadra, se ignora")
+
+        cumplen = [n for n, e in motor["restricciones"] if e == "cumple"]
+        decididos = {**motor["confirmados"], **motor["resueltos"], **motor["derivados"]}
+        for (num_tabla, id_campo), valor in sorted(decididos.items()):
+            if (num_tabla, id_campo) not in campos:
+                print(f"  ℹ️ T{num_tabla} ID {id_campo}: no se leyó; las sumas indican {valor}")
+                continue
+
+            mejor = campos[(num_tabla, id_campo)][:1]
+            razon = f"[CONSISTENCIA] Cuadra con: {', '.join(cumplen)}."
+            lista = pendientes.get(num_tabla, [])
+            pendiente = next((i for i, (par, _) in enumerate(lista) if par["id"] == id_campo), None)
+            previo = resueltos.get(num_tabla, {}).get(id_campo)
+
+            if pendiente is not None:
+                del lista[pendiente]
+                informe["resueltos"] += 1
+            elif previo is not None and previo["valor"] != valor:
+                razon += f" Local decía {previo['valor']}."
+                informe["corregidos"] += 1
+            else:
+                continue
+
+            resueltos.setdefault(num_tabla, {})[id_campo] = {
+                "id": id_campo,
+                "tabla": num_tabla,
+                "valor": valor,
+                "confianza": "alta" if mejor and mejor[0][0] == valor else "media",
+                "razonamiento": razon
+            }
+            print(f"  🧮 T{num_tabla} ID {id_campo}: {valor} [consistencia]")
+
+        print(f"[INFO] Consistencia: {informe['resueltos']} campo(s) resueltos, "
+              f"{informe['corregidos']} corregido(s), {informe['ambiguos']} ambiguo(s)")
+        return informe
+
+    # ══════════════════════════════════════════════════════════════════════
+    # MODO SOLO LOCAL: Extracción cruda + ConvertidorTextoNumeros, sin OpenAI
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _guardar_solo_local(self, resultado_azure, ruta_salida_base: str,
+                            nombre_documento: str) -> dict:
+        """
+        Igual que el modo con IA pero sin la llamada a OpenAI:
+          1. Extraer pares crudos de TODAS las tablas
+          2. validar_campo de ConvertidorTextoNumeros para cada campo
+          3. Los campos no resueltos se quedan con el dígito leído (o el del
+             regex) y confianza baja, para revisarlos a mano
+        """
+        print("\n[INFO] ══════════════════════════════════════════════════════")
+        print("[INFO]  MODO: Extracción con Validación Local (sin OpenAI)")
+        print("[INFO]  1 llamada Document Intelligence + ConvertidorTextoNumeros")
+        print("[INFO] ══════════════════════════════════════════════════════")
+
+        resultado = {
+            "exito": False,
+            "tiempo_extraccion_cruda": 0.0,
+            "tiempo_validacion_ia": 0.0,
+            "tiempo_validacion_local": 0.0,
+            "tiempo_lectura_cruda": 0.0,
+            "tokens": {"prompt": 0, "respuesta": 0, "total": 0},
+            "campos_baja_confianza": [],
+        }
+
+        num_tablas = min(len(resultado_azure.tables), 3)
+
+        # ── PASO 1: Extraer pares crudos (LOCAL) ──
+        t0 = time.time()
+        registros_por_tabla = [extraer_registros(resultado_azure.tables[i], i + 1)
+                               for i in range(num_tablas)]
+        pares_por_tabla = {}
+        for i, registros in enumerate(registros_por_tabla):
+            pares = pares_crudos(registros)
+            if pares:
+                pares_por_tabla[i + 1] = pares
+                print(f"[INFO] Tabla {i + 1}: {len(pares)} pares crudos extraídos")
+            else:
+                print(f"[ADVERTENCIA] Tabla {i + 1}: Sin pares crudos")
+        resultado["tiempo_extraccion_cruda"] = time.time() - t0
+
+        if not pares_por_tabla:
+            print("[ERROR] No se extrajeron pares de ninguna tabla.")
+            return resultado
+
+        # ── PASO 2: validar_campo para cada campo ──
+        t0 = time.time()
+        resueltos, pendientes = self._prevalidar_local(pares_por_tabla, validar_sin_letra=True)
+        resultado["consistencia"] = self._aplicar_consistencia(
+            pares_por_tabla, registros_por_tabla, resueltos, pendientes
+        )
+
+        for num_tabla, lista in pendientes.items():
+            digitos_por_id = {r["id"]: r["digitos"] for r in registros_por_tabla[num_tabla - 1]
+                              if r["digitos"]}
+            for par, res in lista:
+                id_campo = par["id"]
+                razon = res.get("detalle", "") if res else ""
+                # El dígito del regex sale de la columna de votos; el de
+                # validar_campo es la primera celda numérica (puede ser el ID)
+                if id_campo in digitos_por_id:
+                    valor = int(digitos_por_id[id_campo])
+                    razon = f"{razon} Se usa el dígito del regex.".strip()
+                else:
+                    valor = res.get("valor") if res else None
+                resueltos[num_tabla][id_campo] = {
+                    "id": id_campo,
+                    "tabla": num_tabla,
+                    "valor": valor,
+                    "confianza": "baja",
+                    "razonamiento": f"[LOCAL/SIN RESOLVER] {razon}"
+                }
+                resultado["campos_baja_confianza"].append(f"T{num_tabla}:{id_campo}")
+                print(f"  ❌ T{num_tabla} ID {id_campo}: "
+                      f"{valor if valor is not None else 'NULO'} [baja confianza]")
+        resultado["tiempo_validacion_local"] = time.time() - t0
+
+        print(f"\n[INFO] Validación local: "
+              f"{sum(len(r) for r in resueltos.values()) - len(resultado['campos_baja_confianza'])} "
+              f"campo(s) resueltos, {len(resultado['campos_baja_confianza'])} con confianza baja")
+
+        # ── PASO 3: Guardar (mismo orden de IDs que los pares crudos) ──
+        contenido_total = []
+        todos_los_resultados = []
+
+        for i in range(num_tablas):
+            num_tabla = i + 1
+            por_id = resueltos.get(num_tabla, {})
+            resultados_tabla = [por_id[par["id"]] for par in pares_por_tabla.get(num_tabla, [])
+                                if par["id"] in por_id]
+            todos_los_resultados.append(resultados_tabla)
+
+            lineas = [f"{r['id']} : {r['valor']}" for r in resultados_tabla if r["valor"] is not None]
+            if lineas:
+                contenido_total.append(f"--- DATOS EXTRAÍDOS TABLA {num_tabla} (Validado localmente, sin IA) ---")
+                contenido_total.append("\n".join(lineas))
+                contenido_total.append("\n")
+
+        if not contenido_total:
+            return resultado
+
+        ruta_final = f"{ruta_salida_base}.txt"
+        try:
+            with open(ruta_final, "w", encoding="utf-8") as f:
+                f.write("\n".join(contenido_total))
+            print(f"\n[INFO] Datos validados localmente exportados a: {ruta_final}")
+            resultado["exito"] = True
+        except Exception as e:
+            print(f"[ERROR] No se pudo guardar el archivo: {str(e)}")
+
+        # La lectura cruda marca con ❌ los campos de confianza baja
+        t0 = time.time()
+        self._generar_lectura_cruda(
+            resultado_azure, ruta_salida_base, num_tablas,
+            registros_por_tabla, todos_los_resultados
         )
         resultado["tiempo_lectura_cruda"] = time.time() - t0
 
@@ -284,17 +539,11 @@ class ToonExporter:
         print("[INFO]  MODO: Extracción con Regex (sin validación IA)")
         print("[INFO] ══════════════════════════════════════════════════════")
 
-        procesadores = [procesar_tabla_1, procesar_tabla_2, procesar_tabla_3]
         num_tablas = min(len(resultado_azure.tables), 3)
         contenido_total = []
 
         for i in range(num_tablas):
-            tabla = resultado_azure.tables[i]
-
-            if i < len(procesadores):
-                contenido = procesadores[i](tabla)
-            else:
-                contenido = formatear_tabla_generica(tabla)
+            contenido = texto_regex(extraer_registros(resultado_azure.tables[i], i + 1))
 
             if contenido.strip():
                 contenido_total.append(f"--- DATOS EXTRAÍDOS TABLA {i + 1} ---")
@@ -319,10 +568,11 @@ class ToonExporter:
     # ══════════════════════════════════════════════════════════════════════
 
     def _generar_lectura_cruda(self, resultado_azure, ruta_salida_base: str,
-                                num_tablas: int, todos_los_pares: list,
+                                num_tablas: int, registros_por_tabla: list,
                                 todos_los_resultados: list):
         """
         Genera archivo de lectura cruda: qué leyó y qué decidió.
+        Junto a cada decisión se muestran los dígitos del regex como verificación.
         """
         ruta_cruda = f"{ruta_salida_base}_lectura_cruda.txt"
         lineas = []
@@ -335,6 +585,8 @@ class ToonExporter:
 
         for i in range(num_tablas):
             resultados_combinados = todos_los_resultados[i] if i < len(todos_los_resultados) else []
+            registros = registros_por_tabla[i] if i < len(registros_por_tabla) else []
+            digitos_por_id = {r["id"]: r["digitos"] for r in registros if r["digitos"]}
 
             nombre = nombres_tablas[i] if i < len(nombres_tablas) else f"TABLA {i + 1}"
             lineas.append(f"{'═' * 50}")
@@ -362,6 +614,11 @@ class ToonExporter:
                 if razon:
                     lineas.append(f"       {razon}")
 
+                digitos = digitos_por_id.get(id_campo)
+                if digitos:
+                    coincide = valor is not None and str(valor) == str(int(digitos))
+                    lineas.append(f"       Regex: {digitos}{'' if coincide else '  ⚠️ difiere'}")
+
             lineas.append("")
 
         # Guardar
@@ -394,15 +651,15 @@ def _separar_letra_y_digito(contenidos: List[str]):
             continue
 
         # Detectar si es un número puro (solo dígitos, posiblemente con espacios/puntos)
-        solo_nums = re.sub(r'[^0-9]', '', c)
-        solo_letras = re.sub(r'[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ]', '', c)
+        solo_nums = solo_digitos(c)
+        letras = solo_letras(c)
 
         es_digito_puro = bool(solo_nums) and len(solo_nums) >= len(c) * 0.7
 
         if es_digito_puro and texto_digito is None:
             texto_digito = c
 
-        elif solo_letras and len(solo_letras) >= 3:
+        elif letras and len(letras) >= 3:
             # Preferir el texto más largo que contenga letras
             if texto_letra is None or len(c) > len(texto_letra):
                 texto_letra = c
@@ -3,49 +3,103 @@ Funciones de Limpieza de Texto — FLUJO 3
 =========================================
 Elimina ruido de Azure Document Intelligence
 (marcas de selección, instrucciones del acta, etc.)
+
+Todas las tablas de reemplazo y patrones se compilan una sola vez al
+importar el módulo, y las funciones de limpieza recuerdan sus resultados
+(las mismas celdas se repiten entre campos y entre actas).
 """
 
 import re
+from functools import lru_cache
+
+
+# Cantidad de textos distintos que recuerda cada función de limpieza
+_TAM_MEMO = 4096
+
+# Ruido en el orden en que se quita. El orden importa: al quitar
+# "selected" antes que "unselected", "unselected" deja "un", y una
+# marca quitada tarde ya no vuelve a formar un ruido anterior.
+_RUIDO_SELECCION = (":unselected:", ":selected:", "selected", "unselected")
+_RUIDO_CON = ("(Con letra)", "(Con número)", "(Con numera)")
+_RUIDO_FRASES = ("Personas que votaron", "Representantes", "Total de personas")
+
+_SIN_MARCAS = str.maketrans("", "", "○□✓—")
+_SIN_ARROBA = str.maketrans("", "", "@")
+_SIN_MARCAS_NI_ARROBA = str.maketrans("", "", "○□✓—@")
+
+_HAY_FRASE = re.compile("|".join(map(re.escape, _RUIDO_FRASES)))
+_INSTRUCCION = re.compile(r"^(?:copie|escriba)|del apartado|de la hoja")
 
+_NO_DIGITOS = re.compile(r"[^0-9]")
+_NO_LETRAS = re.compile(r"[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ]")
 
+# Corrección OCR: letras confundidas con dígitos (IDs de la Tabla 2)
+CORRECCIONES_OCR = {'O': '0', 'o': '0', 'S': '5', 's': '5',
+                    'I': '1', 'l': '1', 'Z': '2', 'z': '2',
+                    'B': '8', 'G': '6', 'g': '9'}
+_TABLA_OCR = str.maketrans(CORRECCIONES_OCR)
+
+
+def _quitar(texto: str, ruido) -> str:
+    for r in ruido:
+        texto = texto.replace(r, "")
+    return texto
+
+
+@lru_cache(maxsize=_TAM_MEMO)
 def limpiar_texto(texto: str) -> str:
     """Limpia el ruido de Azure y símbolos innecesarios (modo estricto)."""
-    ruido = [
-        ":unselected:", ":selected:", "selected", "unselected",
-        "○", "□", "✓", "—",
-        "(Con letra)", "(Con número)", "(Con numera)", "@",
-        "Personas que votaron", "Representantes", "Total de personas"
-    ]
-
     resultado = texto
-    for r in ruido:
-        resultado = resultado.replace(r, "")
+    if "selected" in resultado:
+        resultado = _quitar(resultado, _RUIDO_SELECCION)
+    resultado = resultado.translate(_SIN_MARCAS)
+    if "(Con" in resultado:
+        resultado = _quitar(resultado, _RUIDO_CON)
+    resultado = resultado.translate(_SIN_ARROBA)
+    if _HAY_FRASE.search(resultado):
+        resultado = _quitar(resultado, _RUIDO_FRASES)
     resultado = resultado.strip(" .-_,")
 
     # Filtro de Instrucciones Largas
-    texto_lower = resultado.lower()
-    if (texto_lower.startswith("copie") or
-        texto_lower.startswith("escriba") or
-        "del apartado" in texto_lower or
-        "de la hoja" in texto_lower or
-        len(resultado) > 60):
+    if len(resultado) > 60 or _INSTRUCCION.search(resultado.lower()):
         return ""
 
     return resultado
 
 
+@lru_cache(maxsize=_TAM_MEMO)
 def limpiar_texto_ligero(texto: str) -> str:
     """
     Limpieza ligera que mantiene el texto con letra pero quita ruido de Azure.
     Usada para la extracción cruda (modo validación con IA).
     """
-    ruido_azure = [
-        ":unselected:", ":selected:",
-        "○", "□", "✓", "—", "@"
-    ]
-
     resultado = texto
-    for r in ruido_azure:
-        resultado = resultado.replace(r, "")
+    if "selected:" in resultado:
+        resultado = _quitar(resultado, _RUIDO_SELECCION[:2])
+    return resultado.translate(_SIN_MARCAS_NI_ARROBA).strip()
+
+
+def corregir_ocr(texto: str) -> str:
+    """Reemplaza las letras que el OCR confunde con dígitos (O→0, S→5, ...)."""
+    return texto.translate(_TABLA_OCR)
+
+
+def solo_digitos(texto: str) -> str:
+    """Los dígitos del texto, en orden."""
+    return _NO_DIGITOS.sub("", texto)
+
+
+def solo_letras(texto: str) -> str:
+    """Las letras del texto (incluye acentos y ñ), en orden."""
+    return _NO_LETRAS.sub("", texto)
+
+
+def estadisticas_memo() -> dict:
+    """Aciertos/fallos de la memoria de cada función de limpieza."""
+    return {f.__name__: f.cache_info()._asdict() for f in (limpiar_texto, limpiar_texto_ligero)}
+
 
-    return resultado.strip()
+def vaciar_memo():
+    """Olvida los textos recordados (p. ej. entre lotes muy distintos)."""
+    limpiar_texto.cache_clear()
+    limpiar_texto_ligero.cache_clear()
@@ -0,0 +1,208 @@
+"""
+Registros unificados por campo — FLUJO 3
+=========================================
+Una sola pasada por las celdas de cada tabla produce, por campo, todo lo
+que necesitan los dos modos de exportación y la lectura cruda:
+
+  {
+    "tabla":        1,
+    "id":           "94",               ← ID del par crudo (modo IA)
+    "contenidos":   ["Setecientos", "700"],  ← limpieza ligera (modo IA)
+    "texto_limpio": ["700"],            ← limpieza estricta (modo regex)
+    "id_digitos":   "94",               ← ID que usa el modo regex ("" = sin línea)
+    "digitos":      "700",              ← valor extraído con regex ("" = sin valor)
+  }
+
+Los pares crudos y el texto TOON del modo regex se renderizan desde estos
+registros (pares_crudos / texto_regex), así que con validación IA los
+dígitos del regex quedan disponibles como verificación sin recorrer la
+tabla otra vez.
+"""
+
+import re
+from typing import Dict, List
+
+from limpieza import corregir_ocr, limpiar_texto, limpiar_texto_ligero
+from vista_tabla import VistaTabla, obtener_vista
+
+
+IDS_TABLA_1 = ["94", "96", "97", "98"]
+ID_TABLA_3 = "99"
+
+_ID_TABLA_1 = re.compile(r'\b(9[4-8])\b')
+_NUMEROS = re.compile(r'\d+')
+_CON_NUMERO = re.compile(r'\(\s*Con\s*n[úu]mero\s*\)', re.IGNORECASE)
+_NUMERO_ENTRE_PARENTESIS = re.compile(r'\(\s*\d+\s*\)')
+
+
+def _registro(num_tabla: int, id_campo: str = "") -> Dict:
+    return {"tabla": num_tabla, "id": id_campo, "contenidos": [], "texto_limpio": [],
+            "id_digitos": "", "digitos": ""}
+
+
+def _registros_tabla_1(vista: VistaTabla) -> List[Dict]:
+    """
+    Tabla 1 (Boletas, Personas, Representantes, Total): 4 secciones
+    verticales por coordenadas Y, un registro por sección.
+    """
+    celdas_por_seccion = vista.secciones(4)
+    if celdas_por_seccion is None:
+        return []
+
+    registros = []
+    for idx_seccion, indices in enumerate(celdas_por_seccion):
+        registro = _registro(1)
+        id_crudo = ""
+
+        for i in indices:
+            contenido = vista.contenidos[i]
+            col = vista.columna[i]
+
+            # Modo IA: limpieza ligera, todas las columnas
+            texto = limpiar_texto_ligero(contenido.replace('\n', ' ').strip())
+            if texto:
+                if col == 0:
+                    numeros = _ID_TABLA_1.findall(texto)
+                    if numeros:
+                        id_crudo = numeros[0]
+                registro["contenidos"].append(texto)
+
+            # Modo regex: limpieza estricta, ID en columna 0 y dígitos en el resto
+            texto = limpiar_texto(contenido).strip()
+            if texto:
+                registro["texto_limpio"].append(texto)
+                if col == 0:
+                    numeros = _ID_TABLA_1.findall(texto)
+                    if numeros:
+                        registro["id_digitos"] = numeros[0]
+                elif col >= 1:
+                    valor = _CON_NUMERO.sub('', texto)
+                    valor = _NUMERO_ENTRE_PARENTESIS.sub('', valor)
+                    numeros = _NUMEROS.findall(valor)
+                    if numeros:
+                        registro["digitos"] = numeros[-1]
+
+        esperado = IDS_TABLA_1[idx_seccion] if idx_seccion < len(IDS_TABLA_1) else ""
+        registro["id"] = id_crudo or esperado or f"T1_{idx_seccion}"
+        registro["id_digitos"] = registro["id_digitos"] or esperado
+        registros.append(registro)
+
+    return registros
+
+
+def _registros_tabla_2(vista: VistaTabla) -> List[Dict]:
+    """Tabla 2 (Resultados por Partido): un registro por fila."""
+    mitad = vista.column_count / 2
+    registros = []
+
+    for _, indices in vista.filas():
+        registro = _registro(2)
+        limpios = []  # (columna, texto estricto)
+
+        for i in indices:
+            col = vista.columna[i]
+            contenido = vista.contenidos[i]
+
+            # Modo IA: ID de las primeras columnas con corrección OCR
+            texto = limpiar_texto_ligero(contenido)
+            if texto:
+                registro["contenidos"].append(texto)
+                if col < mitad and not registro["id"]:
+                    numeros = _NUMEROS.findall(corregir_ocr(texto))
+                    if numeros:
+                        registro["id"] = numeros[0].zfill(2)
+
+            texto = limpiar_texto(contenido)
+            if texto:
+                limpios.append((col, texto))
+
+        registro["texto_limpio"] = [texto for _, texto in limpios]
+
+        # Modo regex: ID = primer número de la primera columna izquierda,
+        # votos = último número de la última columna si está a la derecha
+        if limpios:
+            for col, texto in limpios:
+                if col < mitad:
+                    numeros = _NUMEROS.findall(texto)
+                    if numeros:
+                        registro["id_digitos"] = numeros[0]
+                    break
+            col, texto = limpios[-1]
+            if col >= mitad:
+                numeros = _NUMEROS.findall(texto)
+                if numeros:
+                    registro["digitos"] = numeros[-1]
+
+        registros.append(registro)
+
+    return registros
+
+
+def _registros_tabla_3(vista: VistaTabla) -> List[Dict]:
+    """Tabla 3 (Total de Votos Sacados): un solo registro con ID 99."""
+    registro = _registro(3, ID_TABLA_3)
+    datos_por_fila = {}
+    candidatos = []
+
+    for r, col, contenido in zip(vista.fila.tolist(), vista.columna.tolist(), vista.contenidos):
+        texto = limpiar_texto_ligero(contenido)
+        if texto:
+            registro["contenidos"].append(texto)
+
+        texto = limpiar_texto(contenido).strip()
+        if texto:
+            registro["texto_limpio"].append(texto)
+            datos = datos_por_fila.setdefault(r, {"id": "", "valor": ""})
+            if col == 0:
+                if ID_TABLA_3 in texto:
+                    datos["id"] = ID_TABLA_3
+            elif col == 2:
+                valor = texto.replace("(Con número)", "").strip()
+                numeros = _NUMEROS.findall(valor)
+                if numeros:
+                    datos["valor"] = numeros[-1]
+
+        # Respaldo: último número de cada celda, se prefiere la columna más a la derecha
+        numeros = _NUMEROS.findall(texto.replace("(Con número)", "").replace("(Con letra)", ""))
+        if numeros:
+            candidatos.append((col, numeros[-1]))
+
+    # Par exacto "99" + valor; si no, el candidato más a la derecha
+    valor = next((d["valor"] for d in datos_por_fila.values() if d["id"] == ID_TABLA_3 and d["valor"]), "")
+    if not valor and candidatos:
+        candidatos.sort(key=lambda c: c[0], reverse=True)
+        valor = candidatos[0][1]
+
+    if valor:
+        registro["id_digitos"], registro["digitos"] = ID_TABLA_3, valor
+    return [registro]
+
+
+_POR_TABLA = {1: _registros_tabla_1, 2: _registros_tabla_2, 3: _registros_tabla_3}
+
+
+def extraer_registros(tabla_azure, num_tabla: int, vista: VistaTabla = None) -> List[Dict]:
+    """
+    Registros unificados de una de las 3 tablas del acta.
+
+    Args:
+        tabla_azure: Tabla de Azure
+        num_tabla:   1, 2 o 3 (otras tablas no tienen registros)
+        vista:       VistaTabla ya construida (si es None se obtiene de la caché)
+    """
+    extractor = _POR_TABLA.get(num_tabla)
+    if extractor is None:
+        return []
+    return extractor(vista or obtener_vista(tabla_azure))
+
+
+def pares_crudos(registros: List[Dict]) -> List[Dict]:
+    """Pares {"id", "contenidos"} del modo con validación IA."""
+    return [{"id": r["id"], "contenidos": r["contenidos"]}
+            for r in registros if r["id"] and r["contenidos"]]
+
+
+def texto_regex(registros: List[Dict]) -> str:
+    """Líneas "ID : VALOR" del modo regex."""
+    return "\n".join(f"{r['id_digitos']} : {r['digitos']}"
+                     for r in registros if r["id_digitos"] and r["digitos"])
@@ -0,0 +1,147 @@
+"""
+Vista columnar de una tabla de Azure — FLUJO 3
+===============================================
+Se construye UNA vez por tabla y la comparten los extractores crudos
+(extractores.py) y los de regex (exportador_regex.py):
+
+  - Arreglos NumPy de fila, columna, y_min, y_max, y_centro y x_centro
+  - Índice de contenidos (misma posición que tabla.cells)
+  - Secciones verticales con np.searchsorted
+  - Agrupación por fila/columna con np.lexsort
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# Cantidad de tablas con vista en caché
+_MAX_CACHE = 16
+
+
+class VistaTabla:
+    """
+    Celdas de una tabla en arreglos paralelos.
+
+    Uso básico:
+        vista = obtener_vista(tabla_azure)
+        for idx_seccion, indices in enumerate(vista.secciones(4)):
+            for i in indices:
+                print(vista.columna[i], vista.contenidos[i])
+    """
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.celdas = list(tabla.cells or [])
+        self.column_count = tabla.column_count
+        n = len(self.celdas)
+
+        self.fila = np.fromiter((c.row_index for c in self.celdas), dtype=np.int64, count=n)
+        self.columna = np.fromiter((c.column_index for c in self.celdas), dtype=np.int64, count=n)
+        self.contenidos: List[str] = [c.content for c in self.celdas]
+
+        # Cajas de las celdas (NaN si la celda no tiene región)
+        primeros = []
+        for celda in self.celdas:
+            regiones = getattr(celda, "bounding_regions", None)
+            primeros.append(regiones[0].polygon if regiones else ())
+        poligonos = np.full((n, max((len(p) for p in primeros), default=0) or 8), np.nan)
+        for i, poligono in enumerate(primeros):
+            poligonos[i, :len(poligono)] = poligono
+        self.con_region = ~np.isnan(poligonos[:, 0])
+
+        xs, ys = poligonos[:, 0::2], poligonos[:, 1::2]
+        self.y_min = np.full(n, np.nan)
+        self.y_max = np.full(n, np.nan)
+        self.x_centro = np.full(n, np.nan)
+        if self.con_region.any():
+            validas = self.con_region
+            self.y_min[validas] = np.nanmin(ys[validas], axis=1)
+            self.y_max[validas] = np.nanmax(ys[validas], axis=1)
+            self.x_centro[validas] = (np.nanmin(xs[validas], axis=1) + np.nanmax(xs[validas], axis=1)) / 2
+        self.y_centro = (self.y_min + self.y_max) / 2
+
+        # Caja de la tabla
+        regiones = getattr(tabla, "bounding_regions", None)
+        self.caja: Optional[Tuple[float, float, float, float]] = None
+        if regiones:
+            poligono = regiones[0].polygon
+            self.caja = (min(poligono[0::2]), min(poligono[1::2]),
+                         max(poligono[0::2]), max(poligono[1::2]))
+
+        self._secciones = {}
+        self._filas = None
+
+    def secciones(self, num_secciones: int) -> Optional[List[np.ndarray]]:
+        """
+        Divide la tabla en franjas horizontales de igual alto y asigna cada
+        celda a la franja que contiene su centro vertical.
+
+        Returns:
+            num_secciones arreglos de índices de celda (en el orden original),
+            o None si la tabla no tiene región
+        """
+        if num_secciones in self._secciones:
+            return self._secciones[num_secciones]
+        if self.caja is None:
+            return None
+
+        y_min, alto = self.caja[1], self.caja[3] - self.caja[1]
+        bordes = y_min + alto * (np.arange(num_secciones + 1) / num_secciones)
+
+        # bordes[k] <= y_centro < bordes[k + 1]; las celdas sin región o fuera
+        # de la tabla quedan con k fuera de rango
+        k = np.full(len(self.celdas), -1)
+        validas = self.con_region
+        k[validas] = np.searchsorted(bordes, self.y_centro[validas], side="right") - 1
+
+        secciones = [np.flatnonzero(k == i) for i in range(num_secciones)]
+        self._secciones[num_secciones] = secciones
+        return secciones
+
+    def filas(self) -> List[Tuple[int, np.ndarray]]:
+        """
+        Celdas agrupadas por fila, en orden de fila y columna.
+        Si dos celdas comparten fila y columna se conserva la última.
+
+        Returns:
+            Lista de (fila, índices de celda ordenados por columna)
+        """
+        if self._filas is not None:
+            return self._filas
+        if not self.celdas:
+            self._filas = []
+            return self._filas
+
+        posicion = np.arange(len(self.celdas))
+        orden = np.lexsort((posicion, self.columna, self.fila))
+        fila, columna = self.fila[orden], self.columna[orden]
+
+        # Última aparición de cada (fila, columna)
+        ultima = np.ones(len(orden), dtype=bool)
+        ultima[:-1] = (fila[1:] != fila[:-1]) | (columna[1:] != columna[:-1])
+        orden, fila = orden[ultima], fila[ultima]
+
+        cortes = np.flatnonzero(np.diff(fila)) + 1
+        self._filas = [(int(grupo_fila[0]), grupo)
+                       for grupo, grupo_fila in zip(np.split(orden, cortes), np.split(fila, cortes))]
+        return self._filas
+
+
+_CACHE_VISTAS: "OrderedDict[int, Tuple[object, VistaTabla]]" = OrderedDict()
+
+
+def obtener_vista(tabla) -> VistaTabla:
+    """Devuelve la vista de la tabla, construyéndola solo la primera vez."""
+    clave = id(tabla)
+    entrada = _CACHE_VISTAS.get(clave)
+    if entrada is not None and entrada[0] is tabla:
+        _CACHE_VISTAS.move_to_end(clave)
+        return entrada[1]
+
+    vista = VistaTabla(tabla)
+    _CACHE_VISTAS[clave] = (tabla, vista)
+    while len(_CACHE_VISTAS) > _MAX_CACHE:
+        _CACHE_VISTAS.popitem(last=False)
+    return vista
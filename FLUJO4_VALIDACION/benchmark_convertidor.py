@@ -0,0 +1,234 @@
+"""
+Benchmark del convertidor de texto a números - FLUJO 4
+=======================================================
+Compara la búsqueda difusa de ConvertidorTextoNumeros (palabras agrupadas
+por longitud + Levenshtein acotado) con la versión original (Levenshtein
+completo contra todo el diccionario) sobre palabras corruptas como las del
+OCR, y verifica que ambas den el mismo valor y la misma confianza.
+
+Compara normalizar (tabla de str.translate y camino rápido para ASCII) con
+la versión original (NFD + re.sub) sobre textos como los del OCR, con
+acentos, símbolos y caracteres Unicode al azar, y verifica que den
+exactamente el mismo texto.
+
+También mide campos por segundo de validar_campo uno por uno contra
+validar_campos_lote sobre campos como los de las actas (muchos valores
+repetidos) y verifica que ambos den los mismos resultados.
+
+Uso:
+    python benchmark_convertidor.py              # 5000 palabras, 20000 campos
+    python benchmark_convertidor.py 20000 100000 # otras cantidades
+"""
+
+import random
+import re
+import sys
+import time
+import unicodedata
+
+from convertidor_texto_numeros import ConvertidorTextoNumeros
+from lexico_numeros import generar_grafias
+
+REPETICIONES = 3
+
+_ALFABETO = "abcdefghijklmnopqrstuvwxyzñ"
+
+# Lo que trae el OCR además de letras: acentos, signos, dígitos y espacios raros
+_SIMBOLOS_OCR = "ÁÉÍÓÚÜÑáéíóúüñàèç¿?¡!.,;:-_/\\'\"()°º#$%&*+=@|~‘’“”–—•…€0123456789 \t\n\r\xa0"
+
+
+# ─── Versión original (referencia) ───────────────────────────────────────────
+
+def _fuzzy_palabra_original(conv: ConvertidorTextoNumeros, palabra: str):
+    if not palabra:
+        return None, 0.0
+
+    candidatos = []
+    for ref_palabra, ref_valor in conv.PALABRAS.items():
+        ratio_len = len(palabra) / max(len(ref_palabra), 1)
+        if ratio_len < 0.65 or ratio_len > 1.50:
+            continue
+        candidatos.append((ref_palabra, ref_valor, conv.levenshtein(palabra, ref_palabra)))
+
+    if not candidatos:
+        return None, 0.0
+
+    # Empates: menor distancia ponderada y luego orden de PALABRAS (min devuelve el primero)
+    mejor_dist = min(c[2] for c in candidatos)
+    empatados = [c for c in candidatos if c[2] == mejor_dist]
+    ref_palabra, ref_valor, _ = min(empatados, key=lambda x: conv._distancia_ponderada(palabra, x[0], mejor_dist))
+
+    if mejor_dist > conv._umbral(len(ref_palabra)):
+        # Mismo respaldo por huella (también la de la clave fonética)
+        valor = conv._huella_unica(palabra)
+        return (valor, 0.65) if valor is not None else (None, 0.0)
+
+    # La confianza (con costos de confusión) es la misma en ambas versiones
+    return ref_valor, conv._confianza(palabra, ref_palabra, mejor_dist)
+
+
+def _normalizar_original(texto: str) -> str:
+    texto = texto.lower().strip()
+    texto = unicodedata.normalize('NFD', texto)
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    texto = re.sub(r'[^a-z\s]', '', texto)
+    texto = re.sub(r'\s+', ' ', texto).strip()
+    return texto
+
+
+# ─── Corpus ──────────────────────────────────────────────────────────────────
+
+def _corromper(aleatorio: random.Random, palabra: str) -> str:
+    """Aplica de 1 a 3 ediciones (borrar, insertar o cambiar una letra)."""
+    letras = list(palabra)
+    for _ in range(aleatorio.randint(1, 3)):
+        i = aleatorio.randrange(len(letras) + 1)
+        operacion = aleatorio.random()
+        if operacion < 0.33 and letras:
+            letras.pop(min(i, len(letras) - 1))
+        elif operacion < 0.66:
+            letras.insert(i, aleatorio.choice(_ALFABETO))
+        elif letras:
+            letras[min(i, len(letras) - 1)] = aleatorio.choice(_ALFABETO)
+    return "".join(letras)
+
+
+def corpus_palabras(cantidad: int, semilla: int = 0) -> list:
+    """Palabras numéricas corruptas (80%) y basura sin parecido (20%)."""
+    aleatorio = random.Random(semilla)
+    referencia = list(ConvertidorTextoNumeros.PALABRAS)
+    palabras = []
+    for _ in range(cantidad):
+        if aleatorio.random() < 0.8:
+            palabras.append(_corromper(aleatorio, aleatorio.choice(referencia)))
+        else:
+            palabras.append("".join(aleatorio.choice(_ALFABETO)
+                                    for _ in range(aleatorio.randint(2, 14))))
+    return palabras
+
+
+def corpus_textos(cantidad: int, semilla: int = 0) -> list:
+    """
+    Textos para normalizar: grafías con mayúsculas y errores de OCR (la
+    mitad solo ASCII), con símbolos del OCR y, uno de cada cinco, con
+    caracteres Unicode cualesquiera del plano básico.
+    """
+    aleatorio = random.Random(semilla)
+    grafias = list(generar_grafias(ConvertidorTextoNumeros.PALABRAS))
+    textos = []
+    for _ in range(cantidad):
+        letras = list(aleatorio.choice(grafias).title())
+        for _ in range(aleatorio.randint(0, 4)):
+            if aleatorio.random() < 0.2:
+                simbolo = chr(aleatorio.randrange(0x80, 0xFFFE))
+            else:
+                simbolo = aleatorio.choice(_SIMBOLOS_OCR)
+            letras.insert(aleatorio.randrange(len(letras) + 1), simbolo)
+        texto = "".join(letras)
+        if aleatorio.random() < 0.5:
+            texto = texto.encode("ascii", "ignore").decode("ascii")
+        textos.append(texto)
+    return textos
+
+
+def corpus_campos(cantidad: int, semilla: int = 0) -> list:
+    """
+    Pares (texto con letra, texto con dígito) como los de las actas: los
+    valores chicos se repiten mucho, 30% del texto con letra trae errores
+    de OCR y 10% de los dígitos no coincide.
+    """
+    aleatorio = random.Random(semilla)
+    por_valor = {}
+    for grafia, valor in generar_grafias(ConvertidorTextoNumeros.PALABRAS).items():
+        por_valor.setdefault(valor, []).append(grafia)
+
+    campos = []
+    for _ in range(cantidad):
+        valor = min(int(aleatorio.expovariate(1 / 60)), 999)
+        letra = aleatorio.choice(por_valor[valor])
+        if aleatorio.random() < 0.3:
+            letra = " ".join(_corromper(aleatorio, p) if aleatorio.random() < 0.5 else p
+                             for p in letra.split())
+        digito = str(valor if aleatorio.random() < 0.9 else aleatorio.randint(0, 999))
+        campos.append((letra.capitalize(), digito))
+    return campos
+
+
+# ─── Medición ────────────────────────────────────────────────────────────────
+
+def medir(nombre: str, funcion, palabras: list) -> float:
+    """Imprime el tiempo medio por palabra de aplicar funcion a todo el corpus."""
+    t0 = time.perf_counter()
+    for _ in range(REPETICIONES):
+        for palabra in palabras:
+            funcion(palabra)
+    por_palabra = (time.perf_counter() - t0) / (REPETICIONES * len(palabras))
+    print(f"  {nombre:<34} {por_palabra * 1e6:>9.1f} µs/palabra")
+    return por_palabra
+
+
+def medir_campos(nombre: str, funcion, campos: list) -> float:
+    """Imprime los campos por segundo de funcion(campos) con un convertidor nuevo."""
+    t0 = time.perf_counter()
+    funcion(ConvertidorTextoNumeros(), campos)
+    por_segundo = len(campos) / (time.perf_counter() - t0)
+    print(f"  {nombre:<34} {por_segundo:>9,.0f} campos/s")
+    return por_segundo
+
+
+def _uno_por_uno(conv: ConvertidorTextoNumeros, campos: list) -> list:
+    return [conv.validar_campo(letra, digito) for letra, digito in campos]
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cantidad_campos = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    conv = ConvertidorTextoNumeros()
+    palabras = corpus_palabras(cantidad)
+
+    # Mismo resultado que la versión original
+    for palabra in palabras:
+        if conv._fuzzy_palabra(palabra) != _fuzzy_palabra_original(conv, palabra):
+            print(f"[ERROR] _fuzzy_palabra difiere de la original en {palabra!r}")
+            sys.exit(1)
+
+    print("\n" + "=" * 60)
+    print(f"  {len(palabras)} palabras ({len(set(palabras))} distintas), "
+          f"{len(conv.PALABRAS)} en el diccionario")
+    print("=" * 60)
+    original = medir("_fuzzy_palabra (original)", lambda p: _fuzzy_palabra_original(conv, p), palabras)
+    nuevo = medir("_fuzzy_palabra", conv._fuzzy_palabra, palabras)
+    print(f"  {'':<34} {original / nuevo:>9.1f}x")
+    print("=" * 60)
+
+    # normalizar contra la versión original
+    textos = corpus_textos(cantidad)
+    normalizar = conv.normalizar.__wrapped__
+    for texto in textos:
+        if normalizar(texto) != _normalizar_original(texto):
+            print(f"[ERROR] normalizar difiere de la original en {texto!r}")
+            sys.exit(1)
+
+    print(f"  {len(textos)} textos ({sum(t.isascii() for t in textos)} solo ASCII)")
+    print("=" * 60)
+    original = medir("normalizar (original)", _normalizar_original, textos)
+    nuevo = medir("normalizar", normalizar, textos)
+    print(f"  {'':<34} {original / nuevo:>9.1f}x")
+    print("=" * 60)
+
+    # validar_campo uno por uno contra el lote
+    campos = corpus_campos(cantidad_campos)
+    if _uno_por_uno(ConvertidorTextoNumeros(), campos) != ConvertidorTextoNumeros().validar_campos_lote(campos):
+        print("[ERROR] validar_campos_lote difiere de validar_campo")
+        sys.exit(1)
+
+    print(f"  {len(campos)} campos ({len(set(campos))} distintos)")
+    print("=" * 60)
+    uno = medir_campos("validar_campo (uno por uno)", _uno_por_uno, campos)
+    lote = medir_campos("validar_campos_lote", lambda conv, c: conv.validar_campos_lote(c), campos)
+    print(f"  {'':<34} {lote / uno:>9.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Calibración de umbrales del convertidor - FLUJO 4
+==================================================
+Reproduce un corpus etiquetado de pares crudos con validar_campo y barre
+los umbrales que deciden cuántos campos terminan en OpenAI:
+
+  - _CONFIANZA_MINIMA del exportador (FLUJO 3): confianza para aceptar el
+    resultado local sin IA
+  - confianza_fuzzy_min del convertidor: confianza difusa desde la que
+    validar_campo da un valor
+  - proporcion_umbral del convertidor: distancia máxima contra una palabra,
+    como proporción de su largo
+
+Para cada combinación mide la proporción de campos enviados a OpenAI y la
+exactitud del acta (los campos enviados se cuentan como correctos: solo
+fallan los aceptados localmente con el valor equivocado), e imprime la
+frontera de Pareto y la combinación más barata que cumple el objetivo.
+
+Corpus: una línea JSON por campo, con el par crudo tal como sale de
+pares_crudos o con el texto ya separado, y el valor correcto:
+
+    {"contenidos": ["Treinta y sinco", "35"], "valor": 35}
+    {"letra": "Treinta y sinco", "digito": "35", "valor": 35}
+
+Uso:
+    python calibracion.py corpus.jsonl [objetivo]      # objetivo por defecto 0.995
+    python calibracion.py --sintetico 5000 [objetivo]  # corpus de OCR simulado
+"""
+
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from convertidor_texto_numeros import (ConvertidorTextoNumeros, CONFIANZA_FUZZY_MIN,
+                                       PROPORCION_UMBRAL)
+from lexico_numeros import generar_grafias
+
+# El exportador (FLUJO 3) separa la letra del dígito y fija _CONFIANZA_MINIMA
+_flujo3_path = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'FLUJO3_EXTRACCION'))
+if _flujo3_path not in sys.path:
+    sys.path.insert(0, _flujo3_path)
+from exportador import _CONFIANZA_MINIMA, _separar_letra_y_digito
+
+PROPORCIONES_UMBRAL = (0.25, 0.30, 0.35, 0.40, 0.45)
+CONFIANZAS_FUZZY_MIN = (0.50, 0.60, 0.70)
+CONFIANZAS_MINIMAS = (0.60, 0.65, 0.70, 0.75, 0.80, 0.85, 0.90, 0.95)
+
+OBJETIVO = 0.995
+
+
+# ─── Corpus ──────────────────────────────────────────────────────────────────
+
+def leer_corpus(ruta: str) -> List[Tuple[str, str, int]]:
+    """Lee el corpus etiquetado como [(texto con letra, texto con dígito, valor)]."""
+    campos = []
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            registro = json.loads(linea)
+            if "contenidos" in registro:
+                letra, digito = _separar_letra_y_digito(registro["contenidos"])
+            else:
+                letra, digito = registro.get("letra"), registro.get("digito")
+            campos.append((letra or "", digito or "", int(registro["valor"])))
+    return campos
+
+
+def corpus_sintetico(cantidad: int, semilla: int = 0) -> List[Tuple[str, str, int]]:
+    """
+    Campos como los de benchmark_convertidor.corpus_campos, con su valor:
+    40% con errores de OCR en la letra y 10% con el dígito equivocado.
+    """
+    from benchmark_convertidor import _corromper
+
+    aleatorio = random.Random(semilla)
+    por_valor: Dict[int, List[str]] = {}
+    for grafia, valor in generar_grafias(ConvertidorTextoNumeros.PALABRAS).items():
+        por_valor.setdefault(valor, []).append(grafia)
+
+    campos = []
+    for _ in range(cantidad):
+        valor = min(int(aleatorio.expovariate(1 / 60)), 999)
+        letra = aleatorio.choice(por_valor[valor])
+        if aleatorio.random() < 0.4:
+            letra = " ".join(_corromper(aleatorio, p) if aleatorio.random() < 0.6 else p
+                             for p in letra.split())
+        digito = str(valor if aleatorio.random() < 0.9 else aleatorio.randint(0, 999))
+        campos.append((letra.capitalize(), digito, valor))
+    return campos
+
+
+# ─── Barrido ─────────────────────────────────────────────────────────────────
+
+def evaluar(campos: List[Tuple[str, str, int]]) -> List[dict]:
+    """
+    Mide cada combinación de umbrales. Cada ajuste del convertidor valida
+    el corpus una vez; _CONFIANZA_MINIMA solo filtra esos resultados.
+
+    Returns:
+        [{'proporcion_umbral', 'confianza_fuzzy_min', 'confianza_minima',
+          'enviados', 'errores', 'exactitud'}, ...]
+    """
+    puntos = []
+    for proporcion in PROPORCIONES_UMBRAL:
+        for fuzzy_min in CONFIANZAS_FUZZY_MIN:
+            conv = ConvertidorTextoNumeros(proporcion_umbral=proporcion, confianza_fuzzy_min=fuzzy_min)
+            resultados = conv.validar_campos_lote([(letra, digito) for letra, digito, _ in campos])
+            for confianza_minima in CONFIANZAS_MINIMAS:
+                aceptados = errores = 0
+                for (letra, _, valor), res in zip(campos, resultados):
+                    # Misma regla que ToonExporter._prevalidar_local
+                    if (letra and res["metodo"] not in ("necesita_ia", "sin_resultado") and
+                            res["confianza"] >= confianza_minima and res["valor"] is not None):
+                        aceptados += 1
+                        errores += res["valor"] != valor
+                puntos.append({
+                    "proporcion_umbral": proporcion,
+                    "confianza_fuzzy_min": fuzzy_min,
+                    "confianza_minima": confianza_minima,
+                    "enviados": 1.0 - aceptados / len(campos),
+                    "errores": errores,
+                    "exactitud": 1.0 - errores / len(campos),
+                })
+    return puntos
+
+
+def frontera_pareto(puntos: List[dict]) -> List[dict]:
+    """Las combinaciones que ninguna otra mejora en envíos y exactitud a la vez."""
+    frontera = []
+    for punto in sorted(puntos, key=lambda p: (p["enviados"], -p["exactitud"])):
+        if not frontera or punto["exactitud"] > frontera[-1]["exactitud"]:
+            frontera.append(punto)
+    return frontera
+
+
+def mas_barato(puntos: List[dict], objetivo: float) -> Optional[dict]:
+    """La combinación que menos envía a OpenAI con exactitud >= objetivo."""
+    cumplen = [p for p in puntos if p["exactitud"] >= objetivo]
+    return min(cumplen, key=lambda p: (p["enviados"], -p["exactitud"])) if cumplen else None
+
+
+def _linea(punto: dict, marca: str = " ") -> str:
+    return (f" {marca} {punto['proporcion_umbral']:>9.2f} {punto['confianza_fuzzy_min']:>10.2f} "
+            f"{punto['confianza_minima']:>10.2f} {punto['enviados']:>9.1%} "
+            f"{punto['exactitud']:>10.2%} {punto['errores']:>8}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python calibracion.py corpus.jsonl [objetivo]")
+        print("     python calibracion.py --sintetico 5000 [objetivo]")
+        sys.exit(1)
+
+    if sys.argv[1] == "--sintetico":
+        campos = corpus_sintetico(int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
+        objetivo = float(sys.argv[3]) if len(sys.argv) > 3 else OBJETIVO
+    else:
+        campos = leer_corpus(sys.argv[1])
+        objetivo = float(sys.argv[2]) if len(sys.argv) > 2 else OBJETIVO
+    if not campos:
+        print("[ERROR] El corpus está vacío.")
+        sys.exit(1)
+
+    print(f"[INFO] {len(campos)} campos, "
+          f"{len(PROPORCIONES_UMBRAL) * len(CONFIANZAS_FUZZY_MIN) * len(CONFIANZAS_MINIMAS)} combinaciones")
+    puntos = evaluar(campos)
+    actual = next(p for p in puntos if p["proporcion_umbral"] == PROPORCION_UMBRAL and
+                  p["confianza_fuzzy_min"] == CONFIANZA_FUZZY_MIN and
+                  p["confianza_minima"] == _CONFIANZA_MINIMA)
+    elegido = mas_barato(puntos, objetivo)
+
+    print("\n" + "=" * 66)
+    print("  FRONTERA DE PARETO (exactitud del acta vs. envío a OpenAI)")
+    print("=" * 66)
+    print(f"    {'distancia':>9} {'fuzzy min':>10} {'conf. mín':>10} {'enviados':>9} "
+          f"{'exactitud':>10} {'errores':>8}")
+    for punto in frontera_pareto(puntos):
+        print(_linea(punto, "*" if punto is elegido else " "))
+    print("=" * 66)
+    print(f"  Actual:\n{_linea(actual)}")
+    if elegido:
+        print(f"  Más barato con exactitud >= {objetivo:.2%}:\n{_linea(elegido, '*')}")
+    else:
+        print(f"  [ADVERTENCIA] Ninguna combinación llega a {objetivo:.2%} de exactitud")
+    print("=" * 66)
+
+
+if __name__ == "__main__":
+    main()
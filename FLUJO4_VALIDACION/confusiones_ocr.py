@@ -0,0 +1,239 @@
+"""
+Confusiones de OCR — FLUJO 4
+=============================
+Distancia de edición ponderada para la letra manuscrita en español: cambiar
+una letra por otra que se confunde seguido (c/s/z, v/b, ll/y, qu/k, la "h"
+muda) cuesta menos que un cambio cualquiera, así que "sinco" queda más cerca
+de "cinco" que "xinco".
+
+Los costos por defecto salen de las confusiones que ya lista el SYSTEM_PROMPT
+del validador. Pueden aprenderse del historial etiquetado (campos que GPT-4o
+resolvió con confianza alta, ver procesador_documentos.py):
+
+    python confusiones_ocr.py aprender historial_etiquetado.jsonl [confusiones_ocr.json]
+
+donde cada línea del historial es {"texto": "sinco", "valor": 5}. El JSON
+resultante junto a este módulo se carga solo al crear el convertidor.
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RUTA_CONFUSIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "confusiones_ocr.json")
+
+# Costos por defecto (1.0 = cualquier otro cambio). Las claves "a|b" valen en
+# los dos sentidos; "indel" es el costo de sobrar o faltar esa letra
+CONFUSIONES_OCR = {
+    "sustituciones": {
+        "c|s": 0.3, "s|z": 0.3, "c|z": 0.3, "b|v": 0.3,
+        "c|q": 0.4, "c|k": 0.4, "k|q": 0.4, "i|y": 0.4,
+    },
+    "grupos": {
+        "ll|y": 0.3, "k|qu": 0.3, "c|qu": 0.3,
+    },
+    "indel": {
+        "h": 0.3,
+    },
+}
+
+# Aprendizaje: costo = 1 / (1 + veces / SUAVIZADO), nunca por debajo de COSTO_MINIMO
+SUAVIZADO = 3.0
+COSTO_MINIMO = 0.2
+MIN_OBSERVACIONES = 2
+
+
+def _clave(a: str, b: str) -> str:
+    return "|".join(sorted((a, b)))
+
+
+class MatrizConfusiones:
+    """Costos de sustitución, de grupos de letras y de letras sobrantes/faltantes."""
+
+    def __init__(self, confusiones: Dict[str, Dict[str, float]]):
+        self.confusiones = {seccion: dict(confusiones.get(seccion, {})) for seccion in CONFUSIONES_OCR}
+        self._sustituciones = {}
+        for clave, costo in self.confusiones["sustituciones"].items():
+            a, b = clave.split("|")
+            self._sustituciones[(a, b)] = self._sustituciones[(b, a)] = float(costo)
+        self._indel = {letra: float(costo) for letra, costo in self.confusiones["indel"].items()}
+        self._grupos = []
+        for clave, costo in self.confusiones["grupos"].items():
+            a, b = clave.split("|")
+            self._grupos += [(a, b, float(costo)), (b, a, float(costo))]
+        self.distancia = lru_cache(maxsize=65536)(self._distancia)
+
+    def _distancia(self, s1: str, s2: str) -> float:
+        """
+        Levenshtein con costos: min sobre borrar, insertar, sustituir y
+        cambiar un grupo de letras por otro ("ll" ↔ "y") que termine en (i, j).
+        """
+        indel = self._indel
+        sustituciones = self._sustituciones
+        fila = [0.0]
+        for c in s2:
+            fila.append(fila[-1] + indel.get(c, 1.0))
+        filas = [fila]
+        for i, a in enumerate(s1, start=1):
+            previa = fila
+            fila = [previa[0] + indel.get(a, 1.0)]
+            grupos = [(x, y, costo) for x, y, costo in self._grupos if s1.endswith(x, 0, i)]
+            for j, b in enumerate(s2, start=1):
+                costo = 0.0 if a == b else sustituciones.get((a, b), 1.0)
+                valor = min(previa[j] + indel.get(a, 1.0),
+                            fila[j - 1] + indel.get(b, 1.0),
+                            previa[j - 1] + costo)
+                for x, y, costo in grupos:
+                    if s2.endswith(y, 0, j):
+                        valor = min(valor, filas[i - len(x)][j - len(y)] + costo)
+                fila.append(valor)
+            filas.append(fila)
+        return fila[-1]
+
+
+def cargar_confusiones(ruta_json: Optional[str] = RUTA_CONFUSIONES) -> MatrizConfusiones:
+    """
+    Costos por defecto combinados con los aprendidos en ruta_json (si existe).
+
+    Returns:
+        MatrizConfusiones lista para distancia(s1, s2)
+    """
+    confusiones = {seccion: dict(costos) for seccion, costos in CONFUSIONES_OCR.items()}
+    if ruta_json and os.path.exists(ruta_json):
+        try:
+            with open(ruta_json, "r", encoding="utf-8") as f:
+                for seccion, costos in json.load(f).items():
+                    if seccion in confusiones:
+                        confusiones[seccion].update({k: float(v) for k, v in costos.items()})
+            print(f"[INFO] Confusiones de OCR cargadas de: {ruta_json}")
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudieron leer las confusiones de {ruta_json} ({e}); se usan las de fábrica")
+            confusiones = {seccion: dict(costos) for seccion, costos in CONFUSIONES_OCR.items()}
+    return MatrizConfusiones(confusiones)
+
+
+def alinear(texto: str, referencia: str) -> List[Tuple[str, str]]:
+    """
+    Alineación de Levenshtein (costo 1) de texto contra referencia.
+
+    Returns:
+        [(letra de referencia, letra leída)] sin las coincidencias;
+        "" marca la letra que falta o sobra
+    """
+    n, m = len(referencia), len(texto)
+    d = [[i + j if i * j == 0 else 0 for j in range(m + 1)] for i in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1,
+                          d[i - 1][j - 1] + (referencia[i - 1] != texto[j - 1]))
+
+    cambios = []
+    i, j = n, m
+    while i or j:
+        if i and j and d[i][j] == d[i - 1][j - 1] + (referencia[i - 1] != texto[j - 1]):
+            if referencia[i - 1] != texto[j - 1]:
+                cambios.append((referencia[i - 1], texto[j - 1]))
+            i, j = i - 1, j - 1
+        elif i and d[i][j] == d[i - 1][j] + 1:
+            cambios.append((referencia[i - 1], ""))
+            i -= 1
+        else:
+            cambios.append(("", texto[j - 1]))
+            j -= 1
+    return cambios
+
+
+def aprender_confusiones(ejemplos: Iterable[Tuple[str, int]],
+                         grafias: Dict[str, int]) -> Dict[str, Dict[str, float]]:
+    """
+    Aprende costos de sustitución y de letras sobrantes/faltantes del historial.
+
+    Cada texto se alinea contra la grafía de su valor más parecida; los
+    cambios vistos al menos MIN_OBSERVACIONES veces reciben un costo menor
+    cuanto más se repiten. El historial solo agrega o abarata confusiones
+    (las de fábrica nunca se encarecen) y los grupos ("ll|y") no se aprenden.
+
+    Args:
+        ejemplos: [(texto leído por el OCR, valor correcto)]
+        grafias:  {grafía normalizada: valor} (lexico_numeros.generar_grafias)
+
+    Returns:
+        Confusiones en el formato de CONFUSIONES_OCR
+    """
+    from convertidor_texto_numeros import ConvertidorTextoNumeros
+    from lexico_numeros import compactar
+
+    por_valor: Dict[int, List[str]] = {}
+    for grafia, valor in grafias.items():
+        por_valor.setdefault(valor, []).append(compactar(grafia))
+
+    sustituciones = Counter()
+    indel = Counter()
+    usados = 0
+    for texto, valor in ejemplos:
+        compacto = compactar(ConvertidorTextoNumeros.normalizar(texto))
+        if not compacto or valor not in por_valor:
+            continue
+        referencia = min(por_valor[valor], key=lambda g: (ConvertidorTextoNumeros.levenshtein(compacto, g), g))
+        cambios = alinear(compacto, referencia)
+        # Si hay que cambiar más de la mitad, la etiqueta o la lectura no sirven
+        if len(cambios) > max(2, len(referencia) // 2):
+            continue
+        usados += 1
+        for correcta, leida in cambios:
+            if correcta and leida:
+                sustituciones[_clave(correcta, leida)] += 1
+            else:
+                indel[correcta or leida] += 1
+
+    def costo(veces: int) -> float:
+        return round(max(COSTO_MINIMO, 1.0 / (1.0 + veces / SUAVIZADO)), 3)
+
+    print(f"[INFO] {usados} ejemplos alineados, {sum(sustituciones.values())} sustituciones, "
+          f"{sum(indel.values())} letras sobrantes/faltantes")
+    confusiones = {seccion: dict(costos) for seccion, costos in CONFUSIONES_OCR.items()}
+    for seccion, cuentas in (("sustituciones", sustituciones), ("indel", indel)):
+        for clave, veces in cuentas.items():
+            if veces >= MIN_OBSERVACIONES:
+                confusiones[seccion][clave] = min(confusiones[seccion].get(clave, 1.0), costo(veces))
+    return confusiones
+
+
+def leer_historial(ruta: str) -> List[Tuple[str, int]]:
+    """Lee el historial etiquetado (una línea JSON {"texto", "valor"} por campo)."""
+    ejemplos = []
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            if linea.strip():
+                registro = json.loads(linea)
+                ejemplos.append((registro["texto"], int(registro["valor"])))
+    return ejemplos
+
+
+def main():
+    """
+    Punto de entrada para aprender las confusiones desde línea de comandos.
+    Uso: python confusiones_ocr.py aprender <historial.jsonl> [salida.json]
+    """
+    if len(sys.argv) < 3 or sys.argv[1] != "aprender":
+        print("Uso: python confusiones_ocr.py aprender <historial.jsonl> [salida.json]")
+        print('\nCada línea del historial: {"texto": "sinco", "valor": 5}')
+        sys.exit(1)
+
+    from convertidor_texto_numeros import ConvertidorTextoNumeros
+    from lexico_numeros import generar_grafias
+
+    ruta_salida = sys.argv[3] if len(sys.argv) > 3 else RUTA_CONFUSIONES
+    ejemplos = leer_historial(sys.argv[2])
+    confusiones = aprender_confusiones(ejemplos, generar_grafias(ConvertidorTextoNumeros.PALABRAS))
+
+    with open(ruta_salida, "w", encoding="utf-8") as f:
+        json.dump(confusiones, f, indent=2, sort_keys=True)
+    print(f"[ÉXITO] Confusiones guardadas en: {ruta_salida}")
+
+
+if __name__ == "__main__":
+    main()
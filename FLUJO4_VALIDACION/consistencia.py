@@ -0,0 +1,290 @@
+"""
+Motor de Consistencia Aritmética — FLUJO 4
+===========================================
+Un acta trae redundancia propia que sirve para resolver campos dudosos
+sin preguntarle a Azure OpenAI:
+
+  R1  96 + 97 = 98                 (personas + representantes = total)
+  R2  Suma de la Tabla 2 = 99      (votos por partido = votos sacados)
+  R3  98 = 99                      (blanda: se relaja si el acta no cuadra)
+
+Cada campo llega con sus k valores más probables (letra con
+ConvertidorTextoNumeros.candidatos + dígito). Los campos seguros quedan
+fijos; para los dudosos se prueban todas las combinaciones y se elige la
+que cumple las restricciones con mayor confianza. Un campo sin ningún
+candidato se deduce si es el único desconocido de una restricción.
+
+Solo se marcan como resueltos los campos cuyo valor no cambia entre las
+combinaciones válidas casi igual de probables y que están en al menos una
+restricción comprobada; el resto sigue siendo ambiguo (→ OpenAI).
+
+Uso básico:
+    motor = MotorConsistencia()
+    campos = {(1, "96"): candidatos_campo(conv, "Trescientos", "300"), ...}
+    resultado = motor.resolver(campos)
+    resultado["resueltos"]   # {(1, "98"): 412, ...}
+"""
+
+import itertools
+import math
+from typing import Dict, List, Optional, Tuple
+
+
+# (tabla, id) de un campo del acta
+CampoId = Tuple[int, str]
+Candidatos = List[Tuple[int, float]]
+
+# Sumandos especiales: todos los campos presentes de la Tabla 2
+TABLA_2 = "tabla_2"
+
+# (nombre, sumandos, total, blanda)
+RESTRICCIONES = [
+    ("96 + 97 = 98", [(1, "96"), (1, "97")], (1, "98"), False),
+    ("Suma de la Tabla 2 = 99", TABLA_2, (3, "99"), False),
+    ("98 = 99", [(1, "98")], (3, "99"), True),
+]
+
+# Confianza del valor en dígitos cuando no coincide con ningún candidato de la letra
+CONFIANZA_DIGITO = 0.60
+
+
+def candidatos_campo(convertidor, letra, texto_digito: Optional[str], k: int = 3) -> Candidatos:
+    """
+    Combina los candidatos de la letra con el valor en dígitos.
+
+    letra puede ser el texto con letra o sus candidatos ya calculados
+    (lista de (valor, confianza)).
+
+    Si el dígito coincide con el mejor candidato de la letra, el campo queda
+    con ese único valor; si coincide con otro, ese candidato sube de confianza;
+    si no coincide con ninguno, se agrega con CONFIANZA_DIGITO.
+    """
+    if isinstance(letra, str):
+        candidatos = convertidor.candidatos(letra, k) if letra else []
+    else:
+        candidatos = list(letra or [])
+    digito = convertidor._extraer_digito(texto_digito or "")
+    if digito is None:
+        return candidatos
+
+    if candidatos and candidatos[0][0] == digito:
+        return [(digito, 1.0)]
+
+    por_valor = dict(candidatos)
+    previa = por_valor.get(digito, 0.0)
+    # Dos lecturas independientes del mismo valor (o-ruidoso)
+    por_valor[digito] = 1.0 - (1.0 - previa) * (1.0 - CONFIANZA_DIGITO)
+    return sorted(por_valor.items(), key=lambda x: -x[1])
+
+
+class MotorConsistencia:
+    """
+    Elige la combinación de valores que cumple las sumas del acta.
+
+    Args:
+        confianza_minima: Un campo es seguro si su mejor candidato la alcanza
+                          y el segundo no es comparable (ver margen)
+        margen:           Dos valores son "casi igual de probables" si la razón
+                          entre sus probabilidades es al menos este margen
+        max_combinaciones: Límite de combinaciones a probar (se recortan los
+                           candidatos de los campos dudosos si se pasa)
+    """
+
+    def __init__(self, confianza_minima: float = 0.75, margen: float = 0.5,
+                 max_combinaciones: int = 50000):
+        self.confianza_minima = confianza_minima
+        self.margen = margen
+        self.max_combinaciones = max_combinaciones
+
+    # ══════════════════════════════════════════════════════════════════════
+    # CLASIFICACIÓN DE CAMPOS
+    # ══════════════════════════════════════════════════════════════════════
+
+    def es_seguro(self, candidatos: Candidatos) -> bool:
+        """True si el mejor candidato basta y ningún otro le compite."""
+        if not candidatos or candidatos[0][1] < self.confianza_minima:
+            return False
+        return len(candidatos) == 1 or candidatos[1][1] < candidatos[0][1] * self.margen
+
+    @staticmethod
+    def restricciones_para(campos: Dict[CampoId, Candidatos]) -> list:
+        """
+        Restricciones con los sumandos de la Tabla 2 ya expandidos. Sin
+        ningún campo de la Tabla 2 su suma no se comprueba (si no, 99 se
+        deduciría como 0).
+        """
+        tabla_2 = sorted(c for c in campos if c[0] == 2)
+        return [(nombre, tabla_2 if sumandos == TABLA_2 else sumandos, total, blanda)
+                for nombre, sumandos, total, blanda in RESTRICCIONES
+                if sumandos != TABLA_2 or tabla_2]
+
+    # ══════════════════════════════════════════════════════════════════════
+    # RESOLUCIÓN
+    # ══════════════════════════════════════════════════════════════════════
+
+    def resolver(self, campos: Dict[CampoId, Candidatos]) -> dict:
+        """
+        Args:
+            campos: {(tabla, id): [(valor, confianza), ...]} — lista vacía si
+                    el campo no tiene ningún valor legible
+
+        Returns:
+            {
+                'resueltos':     {campo: valor}  — dudosos resueltos por las sumas
+                'confirmados':   {campo: valor}  — seguros que además cuadran con las sumas
+                'derivados':     {campo: valor}  — sin candidatos, deducidos
+                'ambiguos':      [campo, ...]    — siguen dudosos
+                'restricciones': [(nombre, 'cumple' | 'no cumple' | 'sin datos'), ...]
+                'relajadas':     [nombre, ...]   — blandas ignoradas porque el acta no cuadra
+                'combinaciones': int
+            }
+        """
+        restricciones = self.restricciones_para(campos)
+        variables = set(campos)
+        for _, sumandos, total, _ in restricciones:
+            variables.update(sumandos)
+            variables.add(total)
+
+        seguros = {c: campos[c][0][0] for c in variables if c in campos and self.es_seguro(campos[c])}
+        dudosos = sorted(c for c in variables if campos.get(c) and c not in seguros)
+        libres = sorted(c for c in variables if not campos.get(c))
+        dominios = self._recortar([campos[c] for c in dudosos])
+
+        resultado = {'resueltos': {}, 'confirmados': {}, 'derivados': {}, 'ambiguos': list(dudosos),
+                     'restricciones': [], 'relajadas': [], 'combinaciones': 0}
+        if dominios is None:
+            print(f"[ADVERTENCIA] Consistencia: demasiadas combinaciones ({len(dudosos)} campos dudosos)")
+            return resultado
+
+        validas, evaluadas = self._combinaciones_validas(restricciones, seguros, dudosos, libres, dominios)
+        if not validas:
+            duras = [r for r in restricciones if not r[3]]
+            resultado['relajadas'] = [r[0] for r in restricciones if r[3]]
+            validas, mas = self._combinaciones_validas(duras, seguros, dudosos, libres, dominios)
+            evaluadas += mas
+            restricciones = duras
+        resultado['combinaciones'] = evaluadas
+
+        if not validas:
+            # Ni relajando cuadra: se reporta el estado con la mejor lectura de cada campo
+            resultado['relajadas'] = []
+            mejores = {**seguros, **{c: campos[c][0][0] for c in dudosos}}
+            resultado['restricciones'] = self._estado_restricciones(self.restricciones_para(campos), mejores)
+            return resultado
+
+        # Las mejores: máxima evidencia y, entre ellas, mayor probabilidad
+        max_evidencia = max(v[1] for v in validas)
+        validas = [v for v in validas if v[1] == max_evidencia]
+        mejor_puntaje = max(v[0] for v in validas)
+        cercanas = [v for v in validas if v[0] >= mejor_puntaje + math.log(self.margen)]
+        mejor = max(validas, key=lambda v: v[0])
+        valores, derivados, completas = mejor[2], mejor[3], mejor[4]
+
+        # Un dudoso se resuelve si está en una restricción completa, las sumas
+        # comprueban algo (no solo deducen) y ninguna alternativa cercana lo cambia
+        comprobados = set()
+        if max_evidencia >= 1:
+            comprobados = {c for nombre, sumandos, total, _ in restricciones if nombre in completas
+                           for c in list(sumandos) + [total]}
+        estables = {c for c in variables if all(v[2].get(c) == valores.get(c) for v in cercanas)}
+
+        resultado['ambiguos'] = []
+        for campo in dudosos:
+            if campo in estables and campo in comprobados:
+                resultado['resueltos'][campo] = valores[campo]
+            else:
+                resultado['ambiguos'].append(campo)
+        for campo in seguros:
+            if campo in comprobados:
+                resultado['confirmados'][campo] = valores[campo]
+        for campo in libres:
+            if campo in derivados and campo in estables:
+                resultado['derivados'][campo] = valores[campo]
+
+        resultado['restricciones'] = self._estado_restricciones(restricciones, valores)
+        return resultado
+
+    def _recortar(self, dominios: List[Candidatos]) -> Optional[List[Candidatos]]:
+        """Recorta los candidatos de los dudosos hasta caber en max_combinaciones."""
+        for k in (None, 3, 2):
+            recortados = [d[:k] if k else d for d in dominios]
+            if math.prod(len(d) for d in recortados) <= self.max_combinaciones:
+                return recortados
+        return None
+
+    def _combinaciones_validas(self, restricciones, seguros, dudosos, libres, dominios):
+        """
+        Prueba todas las combinaciones de los dudosos.
+
+        La evidencia de una combinación es cuántas restricciones quedan
+        completas menos cuántos campos hubo que deducir: cada deducción
+        "gasta" una restricción, el resto realmente comprueba valores.
+
+        Returns:
+            ([(log_prob, evidencia, valores, derivados, completas), ...], evaluadas)
+        """
+        validas = []
+        evaluadas = 0
+        for eleccion in itertools.product(*dominios):
+            evaluadas += 1
+            valores = dict(seguros)
+            log_prob = 0.0
+            for campo, (valor, conf) in zip(dudosos, eleccion):
+                valores[campo] = valor
+                log_prob += math.log(max(conf, 1e-6))
+
+            derivados = self._deducir(restricciones, valores, libres)
+            if derivados is None:
+                continue
+
+            completas = set()
+            valida = True
+            for nombre, sumandos, total, _ in restricciones:
+                if total not in valores or any(c not in valores for c in sumandos):
+                    continue
+                if sum(valores[c] for c in sumandos) != valores[total]:
+                    valida = False
+                    break
+                completas.add(nombre)
+            if valida:
+                validas.append((log_prob, len(completas) - len(derivados), valores, derivados, completas))
+        return validas, evaluadas
+
+    @staticmethod
+    def _deducir(restricciones, valores: dict, libres: list) -> Optional[set]:
+        """
+        Deduce los libres que sean el único desconocido de una restricción.
+        Modifica valores; devuelve los deducidos o None si alguno sale negativo.
+        """
+        derivados = set()
+        pendientes = [c for c in libres if c not in valores]
+        cambio = True
+        while pendientes and cambio:
+            cambio = False
+            for _, sumandos, total, _ in restricciones:
+                faltan = [c for c in list(sumandos) + [total] if c not in valores]
+                if len(faltan) != 1:
+                    continue
+                campo = faltan[0]
+                suma = sum(valores[c] for c in sumandos if c in valores)
+                valor = valores[total] - suma if campo != total else suma
+                if valor < 0:
+                    return None
+                valores[campo] = valor
+                derivados.add(campo)
+                pendientes.remove(campo)
+                cambio = True
+        return derivados
+
+    @staticmethod
+    def _estado_restricciones(restricciones, valores: dict) -> list:
+        estados = []
+        for nombre, sumandos, total, _ in restricciones:
+            miembros = list(sumandos) + [total]
+            if any(c not in valores for c in miembros):
+                estados.append((nombre, "sin datos"))
+            elif sum(valores[c] for c in sumandos) == valores[total]:
+                estados.append((nombre, "cumple"))
+            else:
+                estados.append((nombre, "no cumple"))
+        return estados
@@ -6,6 +6,12 @@ Convierte números escritos con palabras en español (0-999) a enteros.
 Tres niveles de conversión:
   1. EXACTA:  Normaliza el texto (minúsculas, sin acentos) y busca coincidencias
   2. DIFUSA:  Usa distancia Levenshtein para texto con errores de OCR/ortografía
+              (solo contra palabras de largo parecido, con distancia acotada);
+              la frase completa se busca además en el léxico de todas las
+              grafías de 0-999 (lexico_numeros.py), que tolera palabras
+              pegadas o partidas ("cuatro cientos", "treintaycinco"), y si
+              no aparece se vuelve a partir en palabras siguiendo la
+              gramática de abajo, con errores en cada una ("kuatrosientosbeintitrez")
   3. HUELLA:  Usa longitud + primera letra + última letra como "fingerprint"
 
 Rango soportado: 0 a 999 (números electorales mexicanos)
@@ -25,13 +31,92 @@ Reglas de composición en español:
 
 import re
 import unicodedata
+from collections import Counter
+from functools import lru_cache
 from typing import Optional, Tuple, List, Dict
 
+import numpy as np
+
+from confusiones_ocr import RUTA_CONFUSIONES, cargar_confusiones
+from lexico_numeros import APOCOPES, cargar_lexico, compactar
+
+
+# Cantidad de textos normalizados distintos que recuerda cada nivel
+TAM_MEMO = 4096
+
+# Distancia máxima aceptada contra una palabra, como proporción de su largo
+# (mínimo 2), y confianza difusa mínima para que validar_campo decida sin IA.
+# Se calibran con calibracion.py
+PROPORCION_UMBRAL = 0.35
+CONFIANZA_FUZZY_MIN = 0.60
+
+# Confianza de una grafía válida con las palabras pegadas o partidas
+CONFIANZA_ESPACIOS = 0.95
+
+# Confianza de una grafía que se pronuncia igual que una válida ("sinkuenta y sinco");
+# medida: 99.8% de aciertos aun con errores de OCR al azar (sin confusiones típicas)
+CONFIANZA_FONETICA = 0.95
+
+# Palabras desconocidas por bloque de la matriz de distancias de validar_campos_lote
+TAM_BLOQUE_LOTE = 2048
+
+# Gramática del segmentador: estado → [(clase de palabra, estado siguiente)]
+#   0 inicio, 1 tras centena, 2 tras decena, 3 tras "y", 4 número completo
+GRAMATICA_SEGMENTOS = {
+    0: [('centena', 1), ('cien', 4), ('cero', 4), ('decena', 2), ('especial', 4), ('unidad', 4)],
+    1: [('decena', 2), ('especial', 4), ('unidad', 4)],
+    2: [('y', 3), ('unidad', 4)],
+    3: [('unidad', 4)],
+}
+ESTADOS_FINALES = (1, 2, 4)
+
+_NO_LETRA = re.compile(r'[^a-z\s]')
+_QU_SUAVE = re.compile(r'qu(?=[ei])')
+_C_SUAVE = re.compile(r'c(?=[ei])')
+_LETRA_DOBLE = re.compile(r'(.)\1+')
+
+
+def _normalizar_caracter(caracter: str) -> str:
+    """
+    Lo que queda de un carácter tras minúsculas, NFD, quitar las marcas
+    diacríticas y todo lo que no sea a-z o espacio ('É' → 'e', 'ñ' → 'n',
+    '¿' → ''); cualquier espacio en blanco queda como ' '.
+    """
+    texto = unicodedata.normalize('NFD', caracter.lower())
+    texto = _NO_LETRA.sub('', ''.join(c for c in texto if unicodedata.category(c) != 'Mn'))
+    return ''.join(' ' if c.isspace() else c for c in texto)
+
+
+class _TablaNormalizar(dict):
+    """
+    Tabla de str.translate para normalizar: los caracteres que no están
+    precalculados se calculan (y se guardan) la primera vez que aparecen.
+    """
+
+    def __missing__(self, codigo: int) -> str:
+        self[codigo] = _normalizar_caracter(chr(codigo))
+        return self[codigo]
+
+
+# Latín-1, Latín extendido (acentos, ñ, ü) y símbolos comunes del OCR, ya calculados
+_TABLA_NORMALIZAR = _TablaNormalizar()
+for _codigo in list(range(0x250)) + [ord(c) for c in "‘’“”–—•…€"]:
+    _TABLA_NORMALIZAR[_codigo]
+
+# Texto solo ASCII: bytes.translate a minúsculas, espacios en blanco → ' ' y
+# todo lo demás borrado, sin pasar por Unicode
+_ASCII_TABLA = bytes(ord(_TABLA_NORMALIZAR[b] or ' ') for b in range(256))
+_ASCII_BORRAR = bytes(b for b in range(128) if not _TABLA_NORMALIZAR[b])
+
 
 class ConvertidorTextoNumeros:
     """
     Convierte texto en español (0-999) a enteros.
     Soporta conversión exacta, difusa (OCR corrupto) y por huella digital.
+
+    Cada nivel recuerda sus resultados por texto normalizado ("Cero", "CERO"
+    y "cero " comparten entrada); para compartir esa memoria entre actas usa
+    obtener_convertidor() en lugar de crear una instancia por documento.
     """
 
     # ══════════════════════════════════════════════════════════════════════
@@ -127,8 +212,28 @@ class ConvertidorTextoNumeros:
     # 50(cincuenta), 80(ochenta), 90(noventa), 100(cien),
     # 400(cuatrocientos), 500(quinientos), 800(ochocientos), 900(novecientos)
 
-    def __init__(self):
-        """Construye las tablas de huellas y referencia inversa."""
+    def __init__(self, tam_memo: int = TAM_MEMO, ruta_confusiones: Optional[str] = RUTA_CONFUSIONES,
+                 proporcion_umbral: float = PROPORCION_UMBRAL,
+                 confianza_fuzzy_min: float = CONFIANZA_FUZZY_MIN):
+        """
+        Construye las tablas de huellas y referencia inversa.
+
+        Args:
+            tam_memo: Textos normalizados distintos que recuerda cada nivel
+                      (exacto, difuso y candidatos)
+            ruta_confusiones: JSON con costos de confusión aprendidos
+                              (confusiones_ocr.py; None = solo los de fábrica)
+            proporcion_umbral: Distancia máxima contra una palabra, como
+                               proporción de su largo (ver _umbral)
+            confianza_fuzzy_min: Confianza difusa desde la que validar_campo
+                                 da un valor (si no, 'necesita_ia')
+        """
+        self.proporcion_umbral = proporcion_umbral
+        self.confianza_fuzzy_min = confianza_fuzzy_min
+
+        # Costos de las confusiones típicas de la letra manuscrita (para la confianza)
+        self.confusiones = cargar_confusiones(ruta_confusiones)
+
         # Huella: (longitud, primera_letra, ultima_letra) → [(palabra, valor)]
         self.huellas: Dict[Tuple[int, str, str], List[Tuple[str, int]]] = {}
 
@@ -144,26 +249,98 @@ class ConvertidorTextoNumeros:
             1 for v in self.huellas.values() if len(v) == 1
         )
 
+        # Las mismas huellas, pero de la clave fonética ("kinse" → quince)
+        self.huellas_foneticas: Dict[Tuple[int, str, str], List[Tuple[str, int]]] = {}
+        for palabra, valor in self.PALABRAS.items():
+            clave = self.clave_fonetica(palabra)
+            self.huellas_foneticas.setdefault((len(clave), clave[0], clave[-1]), []).append((palabra, valor))
+
+        # Palabras agrupadas por longitud: longitud → [(posición, palabra, valor)]
+        # La posición en PALABRAS desempata igual que recorrer el diccionario en orden
+        self._por_longitud: Dict[int, List[Tuple[int, str, int]]] = {}
+        for posicion, (palabra, valor) in enumerate(self.PALABRAS.items()):
+            self._por_longitud.setdefault(len(palabra), []).append((posicion, palabra, valor))
+        # Cuántas veces aparece cada letra en cada palabra del diccionario
+        self._letras: Dict[str, Dict[str, int]] = {p: dict(Counter(p)) for p in self.PALABRAS}
+
+        # Todas las grafías de 0-999 en un trie (se carga ya compilado del disco)
+        self.lexico = cargar_lexico(self.PALABRAS)
+
+        # Clave fonética de cada grafía → valor; las claves que comparten dos
+        # valores distintos no se usan
+        self._foneticas: Dict[str, int] = {}
+        choques = set()
+        for compacta, valor in zip(self.lexico.compactas, self.lexico.valores):
+            clave = self.clave_fonetica(compacta)
+            if self._foneticas.setdefault(clave, valor) != valor:
+                choques.add(clave)
+        for clave in choques:
+            del self._foneticas[clave]
+
+        # Memoria acotada (LRU) por texto normalizado
+        self._memo_exacto = lru_cache(maxsize=tam_memo)(self._convertir_normalizado)
+        self._memo_fuzzy = lru_cache(maxsize=tam_memo)(self._fuzzy_normalizado)
+        self._memo_candidatos = lru_cache(maxsize=tam_memo)(self._candidatos_normalizado)
+        self._memo_segmentar = lru_cache(maxsize=tam_memo)(self._segmentar_compacto)
+
+        # Palabras de cada clase de la gramática del segmentador (con apócopes)
+        self._clases_segmento: Dict[str, List[Tuple[str, int]]] = {
+            'cero': [], 'unidad': [], 'especial': [], 'decena': [], 'cien': [], 'centena': [], 'y': [('y', 0)],
+        }
+        for palabra, valor in list(self.PALABRAS.items()) + list(APOCOPES.items()):
+            if palabra == 'cien':
+                clase = 'cien'
+            elif valor >= 100:
+                clase = 'centena'
+            elif valor >= 30:
+                clase = 'decena'
+            elif valor >= 10:
+                clase = 'especial'
+            else:
+                clase = 'unidad' if valor else 'cero'
+            self._clases_segmento[clase].append((palabra, valor))
+
+        # Resultados de _fuzzy_palabra y _fuzzy_frase ya calculados en bloque
+        # (solo durante validar_campos_lote)
+        self._fuzzy_lote: Dict[str, Tuple[Optional[int], float]] = {}
+        self._frase_lote: Dict[str, Tuple[Optional[int], float]] = {}
+        self._letras_lexico: Optional[np.ndarray] = None
+
     # ══════════════════════════════════════════════════════════════════════
     # UTILIDADES
     # ══════════════════════════════════════════════════════════════════════
 
     @staticmethod
+    @lru_cache(maxsize=TAM_MEMO)
     def normalizar(texto: str) -> str:
         """
         Normaliza texto: minúsculas, quita acentos, solo letras y espacios.
         'Veintitrés' → 'veintitres'
         'Seiscientos  treinta' → 'seiscientos treinta'
         """
-        texto = texto.lower().strip()
-        # Quitar acentos (NFD decompose + filtrar marcas diacríticas)
-        texto = unicodedata.normalize('NFD', texto)
-        texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
-        # Solo letras y espacios
-        texto = re.sub(r'[^a-z\s]', '', texto)
+        if texto.isascii():
+            texto = texto.encode('ascii').translate(_ASCII_TABLA, _ASCII_BORRAR).decode('ascii')
+        else:
+            # Carácter por carácter equivale a minúsculas + NFD + quitar marcas
+            # diacríticas + solo letras y espacios sobre el texto entero
+            texto = texto.translate(_TABLA_NORMALIZAR)
         # Normalizar espacios múltiples
-        texto = re.sub(r'\s+', ' ', texto).strip()
-        return texto
+        return ' '.join(texto.split())
+
+    @staticmethod
+    @lru_cache(maxsize=TAM_MEMO)
+    def clave_fonetica(texto: str) -> str:
+        """
+        Cómo suena el texto normalizado: c/s/z → s (c → k ante a/o/u),
+        qu/k → k, v/b → b, ll → y, sin "h" muda y sin letras dobles.
+        'sinkuenta' → 'sinkuenta', 'cincuenta' → 'sinkuenta', 'nuebe' → 'nuebe'
+        """
+        clave = texto.replace('ch', '#').replace('ll', 'y').replace('h', '')
+        clave = _QU_SUAVE.sub('k', clave).replace('qu', 'ku')
+        clave = _C_SUAVE.sub('s', clave).replace('c', 'k')
+        clave = clave.replace('z', 's').replace('v', 'b')
+        clave = _LETRA_DOBLE.sub(r'\1', clave)
+        return clave.replace('#', 'ch')
 
     @staticmethod
     def levenshtein(s1: str, s2: str) -> int:
@@ -187,6 +364,65 @@ class ConvertidorTextoNumeros:
             prev_row = curr_row
         return prev_row[-1]
 
+    @staticmethod
+    def levenshtein_acotada(s1: str, s2: str, cota: int) -> int:
+        """
+        Distancia Levenshtein que solo recorre la franja de ±cota alrededor
+        de la diagonal y abandona en cuanto toda una fila supera la cota.
+
+        Returns:
+            La distancia exacta si es <= cota; cota + 1 si la supera.
+        """
+        if abs(len(s1) - len(s2)) > cota:
+            return cota + 1
+        if len(s1) < len(s2):
+            s1, s2 = s2, s1
+        if len(s2) == 0:
+            return len(s1)
+
+        fuera = cota + 1
+        m = len(s2)
+        prev_row = [j if j <= cota else fuera for j in range(m + 1)]
+        for i in range(1, len(s1) + 1):
+            c1 = s1[i - 1]
+            desde, hasta = max(1, i - cota), min(m, i + cota)
+            curr_row = [fuera] * (m + 1)
+            curr_row[0] = i if i <= cota else fuera
+            minimo = curr_row[0]
+            for j in range(desde, hasta + 1):
+                valor = min(prev_row[j] + 1, curr_row[j - 1] + 1, prev_row[j - 1] + (c1 != s2[j - 1]))
+                curr_row[j] = valor
+                if valor < minimo:
+                    minimo = valor
+            if minimo > cota:
+                return fuera
+            prev_row = curr_row
+        return prev_row[m] if prev_row[m] <= cota else fuera
+
+    def _cota_por_letras(self, letras: Dict[str, int], n: int, ref_palabra: str) -> int:
+        """
+        Mínimo de ediciones que impone el conteo de letras: cada edición
+        agrega o quita a lo sumo una letra de cada lado.
+        """
+        ref_letras = self._letras[ref_palabra]
+        sobran = 0
+        for letra, veces in letras.items():
+            exceso = veces - ref_letras.get(letra, 0)
+            if exceso > 0:
+                sobran += exceso
+        # Las que faltan salen de las que sobran y de la diferencia de largo
+        return max(sobran, sobran + len(ref_palabra) - n)
+
+    def _umbral(self, longitud_ref: int) -> int:
+        """Distancia máxima aceptada contra una palabra de esa longitud (35% por defecto)."""
+        return max(2, int(longitud_ref * self.proporcion_umbral))
+
+    def _longitudes_compatibles(self, palabra: str) -> List[int]:
+        """Longitudes del diccionario dentro del filtro ±30%, de la más cercana a la más lejana."""
+        n = len(palabra)
+        return sorted((L for L in self._por_longitud if 0.65 <= n / max(L, 1) <= 1.50),
+                      key=lambda L: abs(n - L))
+
     # ══════════════════════════════════════════════════════════════════════
     # NIVEL 1: CONVERSIÓN EXACTA (normalizada)
     # ══════════════════════════════════════════════════════════════════════
@@ -208,7 +444,10 @@ class ConvertidorTextoNumeros:
         normalizado = self.normalizar(texto)
         if not normalizado:
             return None
+        return self._memo_exacto(normalizado)
 
+    def _convertir_normalizado(self, normalizado: str) -> Optional[int]:
+        """convertir() sobre texto ya normalizado (no vacío)."""
         # Caso 1: una sola palabra
         if normalizado in self.PALABRAS:
             return self.PALABRAS[normalizado]
@@ -269,12 +508,26 @@ class ConvertidorTextoNumeros:
         normalizado = self.normalizar(texto)
         if not normalizado:
             return None, 0.0
+        return self._memo_fuzzy(normalizado)
 
+    def _fuzzy_normalizado(self, normalizado: str) -> Tuple[Optional[int], float]:
+        """convertir_fuzzy() sobre texto ya normalizado (no vacío)."""
         # Primero intentar conversión exacta
-        resultado_exacto = self.convertir(texto)
+        resultado_exacto = self._memo_exacto(normalizado)
         if resultado_exacto is not None:
             return resultado_exacto, 1.0
 
+        # Grafía válida con las palabras pegadas o partidas
+        compacto = compactar(normalizado)
+        valor = self.lexico.buscar_exacto(compacto)
+        if valor is not None:
+            return valor, CONFIANZA_ESPACIOS
+
+        # Se pronuncia igual que una grafía válida (sin distancia de edición)
+        valor = self._foneticas.get(self.clave_fonetica(compacto))
+        if valor is not None:
+            return valor, CONFIANZA_FONETICA
+
         # Limpiar "y" de conexión
         palabras = normalizado.replace(' y ', ' ').split()
         palabras = [p for p in palabras if p]
@@ -282,11 +535,25 @@ class ConvertidorTextoNumeros:
         if not palabras:
             return None, 0.0
 
-        # Caso: una sola palabra
+        # Caso: una sola palabra (si no se parece a ninguna, quizá son varias pegadas)
         if len(palabras) == 1:
-            return self._fuzzy_palabra(palabras[0])
-
-        # Caso: múltiples palabras → fuzzy cada una y sumar
+            valor, conf = self._fuzzy_palabra(palabras[0])
+            if valor is None:
+                valor, conf = self._fuzzy_frase(compacto)
+            if valor is None:
+                valor, conf, _ = self._memo_segmentar(compacto)
+            return valor, conf
+
+        # Caso: múltiples palabras → primero la frase completa contra el léxico
+        # (respeta la gramática: "cuatro sientos" no es 4 + 100), luego la
+        # segmentación con errores repartidos entre las palabras
+        valor, conf = self._fuzzy_frase(compacto)
+        if valor is None:
+            valor, conf, _ = self._memo_segmentar(compacto)
+        if valor is not None:
+            return valor, conf
+
+        # Si no, fuzzy cada una y sumar
         total = 0
         confianza_min = 1.0
         encontro_algo = False
@@ -298,6 +565,14 @@ class ConvertidorTextoNumeros:
                 encontro_algo = True
                 continue
 
+            # Luego por cómo suena
+            valor = self._foneticas.get(self.clave_fonetica(palabra))
+            if valor is not None:
+                total += valor
+                confianza_min = min(confianza_min, CONFIANZA_FONETICA)
+                encontro_algo = True
+                continue
+
             # Si no, intentar fuzzy
             valor, conf = self._fuzzy_palabra(palabra)
             if valor is not None:
@@ -312,52 +587,248 @@ class ConvertidorTextoNumeros:
             return total, confianza_min
         return None, 0.0
 
+    @staticmethod
+    def _cota_frase(longitud: int) -> int:
+        """Ediciones toleradas en una frase compacta: 1 cada 6 letras, de 1 a 3."""
+        return max(1, min(3, longitud // 6))
+
+    def _fuzzy_frase(self, compacto: str) -> Tuple[Optional[int], float]:
+        """
+        Busca la frase completa (sin espacios) en el léxico con distancia acotada.
+        Si dos números distintos quedan igual de cerca, no decide.
+        """
+        precalculado = self._frase_lote.get(compacto)
+        if precalculado is not None:
+            return precalculado
+
+        # Cota creciente: solo interesan las más cercanas, y con cota chica
+        # el trie poda casi todo
+        coincidencias = []
+        for cota in range(1, self._cota_frase(len(compacto)) + 1):
+            coincidencias = self.lexico.buscar(compacto, cota)
+            if coincidencias:
+                break
+        return self._elegir_frase(compacto, coincidencias)
+
+    def _elegir_frase(self, compacto: str, coincidencias: List[Tuple[str, int, int]]) -> Tuple[Optional[int], float]:
+        """El valor de las grafías más cercanas, o nada si no coinciden en valor."""
+        if not coincidencias:
+            return None, 0.0
+        distancia = min(dist for _, _, dist in coincidencias)
+        mejores = [(grafia, valor) for grafia, valor, dist in coincidencias if dist == distancia]
+        if len({valor for _, valor in mejores}) > 1:
+            return None, 0.0
+        conf = max(self._confianza_frase(compacto, grafia, distancia) for grafia, _ in mejores)
+        return mejores[0][1], conf
+
+    def _confianza_frase(self, compacto: str, grafia: str, dist: int) -> float:
+        """
+        Proporción de letras correctas de la frase, sin el bono de huella
+        (en una frase larga casi siempre coinciden la primera y la última) y
+        nunca por encima de una grafía sin errores de letra.
+        """
+        dist = self._distancia_ponderada(compacto, grafia, dist)
+        return min(CONFIANZA_ESPACIOS, max(0.50, 1.0 - dist / max(len(grafia), 1)))
+
+    # ══════════════════════════════════════════════════════════════════════
+    # SEGMENTACIÓN (palabras pegadas o partidas con errores)
+    # ══════════════════════════════════════════════════════════════════════
+
+    def segmentar(self, texto: str) -> Tuple[Optional[int], float, List[str]]:
+        """
+        Vuelve a partir el texto (sin espacios) en palabras del diccionario
+        que sigan la composición del español: centena → decena → "y" → unidad.
+
+        Cada palabra tolera 1 error cada 4 letras y el total 1 cada 5 letras
+        del texto; gana la partición con menos errores y, si dos números
+        distintos empatan, no decide.
+
+        Ejemplos:
+            'kuatrosientosbeintitrez'   → (423, 0.83, ['cuatrocientos', 'veintitres'])
+            'nobesientos noventa i nuebe' → (999, ..., ['novecientos', 'noventa', 'nueve'])
+
+        Returns:
+            (valor, confianza, palabras) — (None, 0.0, []) si no hay partición
+        """
+        normalizado = self.normalizar(texto)
+        if not normalizado:
+            return None, 0.0, []
+        valor, conf, palabras = self._memo_segmentar(compactar(normalizado))
+        return valor, conf, list(palabras)
+
+    @staticmethod
+    def _presupuesto_palabra(palabra: str) -> int:
+        """Errores tolerados dentro de una palabra ("y" tiene que estar bien escrita)."""
+        return 0 if palabra == 'y' else max(1, len(palabra) // 4)
+
+    def _segmentar_compacto(self, compacto: str) -> Tuple[Optional[int], float, Tuple[str, ...]]:
+        """
+        Programación dinámica sobre las posiciones del texto:
+        mejor[(posición, estado, valor)] = (errores, palabras usadas, de dónde viene).
+        Las distancias de cada palabra desde cada posición se calculan una vez.
+        """
+        n = len(compacto)
+        presupuesto = max(1, n // 5)
+        mejor = {(0, 0, 0): (0, 0, None, None)}
+        distancias_desde: Dict[Tuple[int, str], Dict[int, int]] = {}
+
+        for i in range(n):
+            en_i = [(clave, datos) for clave, datos in mejor.items() if clave[0] == i]
+            for (_, estado, acumulado), (errores, usadas, _, _) in en_i:
+                for clase, siguiente in GRAMATICA_SEGMENTOS.get(estado, []):
+                    for palabra, valor in self._clases_segmento[clase]:
+                        cota = min(self._presupuesto_palabra(palabra), presupuesto - errores)
+                        if cota < 0:
+                            continue
+                        clave_dist = (i, palabra)
+                        if clave_dist not in distancias_desde:
+                            distancias_desde[clave_dist] = self._distancias_prefijos(
+                                compacto, i, palabra, self._presupuesto_palabra(palabra))
+                        for fin, dist in distancias_desde[clave_dist].items():
+                            if dist > cota:
+                                continue
+                            clave = (fin, siguiente, acumulado + valor)
+                            candidato = (errores + dist, usadas + 1, (i, estado, acumulado), palabra)
+                            if clave not in mejor or candidato[:2] < mejor[clave][:2]:
+                                mejor[clave] = candidato
+
+        finales = [(datos[0], clave) for clave, datos in mejor.items()
+                   if clave[0] == n and clave[1] in ESTADOS_FINALES and datos[1] > 0]
+        if not finales:
+            return None, 0.0, ()
+        menos_errores = min(errores for errores, _ in finales)
+        empatados = [clave for errores, clave in finales if errores == menos_errores]
+        if len({clave[2] for clave in empatados}) > 1:
+            return None, 0.0, ()
+
+        # Reconstruir las palabras de la mejor partición
+        clave = min(empatados, key=lambda c: mejor[c][1])
+        palabras = []
+        while mejor[clave][2] is not None:
+            palabras.append(mejor[clave][3])
+            clave = mejor[clave][2]
+        palabras.reverse()
+        conf = self._confianza_frase(compacto, ''.join(palabras), menos_errores)
+        return empatados[0][2], conf, tuple(palabras)
+
+    @staticmethod
+    def _distancias_prefijos(texto: str, inicio: int, palabra: str, cota: int) -> Dict[int, int]:
+        """
+        Distancia de palabra contra cada tramo texto[inicio:fin] que no la
+        supere la cota (una sola tabla: la última fila da todos los fines).
+
+        Returns:
+            {fin: distancia}
+        """
+        tramo = texto[inicio:inicio + len(palabra) + cota]
+        m = len(tramo)
+        fuera = cota + 1
+        fila = [j if j <= cota else fuera for j in range(m + 1)]
+        # Solo la franja de ±cota alrededor de la diagonal (como LexicoNumeros.buscar)
+        for r, letra in enumerate(palabra, start=1):
+            previa = fila
+            fila = [fuera] * (m + 1)
+            fila[0] = r if r <= cota else fuera
+            minimo = fila[0]
+            for j in range(max(1, r - cota), min(m, r + cota) + 1):
+                valor = min(previa[j] + 1, fila[j - 1] + 1, previa[j - 1] + (tramo[j - 1] != letra))
+                fila[j] = valor
+                if valor < minimo:
+                    minimo = valor
+            # Ningún fin puede bajar del mínimo de la fila
+            if minimo > cota:
+                return {}
+        return {inicio + j: d for j, d in enumerate(fila) if j > 0 and d <= cota}
+
     def _fuzzy_palabra(self, palabra: str) -> Tuple[Optional[int], float]:
         """
         Intenta resolver una sola palabra corrupta.
 
         Estrategia:
-        1. Levenshtein contra TODO el diccionario (mejor match global)
-        2. Si empata, usar huella digital para desempatar
+        1. Levenshtein contra el diccionario (mejor match global); solo se
+           miran las longitudes compatibles y cada distancia se corta en
+           cuanto supera la mejor encontrada
+        2. Si empata, gana la de menor distancia ponderada (confusiones de
+           OCR, la misma que usa la confianza) y luego la que va primero en
+           PALABRAS
         3. Requiere longitud similar (±30%) para evitar falsos positivos
         """
         if not palabra:
             return None, 0.0
 
-        # ── Estrategia principal: Levenshtein contra todo el diccionario ──
-        # Filtra candidatos por longitud similar (±30%)
-        candidatos = []
-        for ref_palabra, ref_valor in self.PALABRAS.items():
-            # Filtro de longitud: no comparar palabras con tamaños muy diferentes
-            ratio_len = len(palabra) / max(len(ref_palabra), 1)
-            if ratio_len < 0.65 or ratio_len > 1.50:
-                continue
-
-            dist = self.levenshtein(palabra, ref_palabra)
-            candidatos.append((ref_palabra, ref_valor, dist))
+        precalculado = self._fuzzy_lote.get(palabra)
+        if precalculado is not None:
+            return precalculado
 
-        if not candidatos:
+        longitudes = self._longitudes_compatibles(palabra)
+        if not longitudes:
             return None, 0.0
 
-        # Ordenar por distancia (menor = mejor)
-        candidatos.sort(key=lambda x: x[2])
-        mejor = candidatos[0]
-        ref_palabra, ref_valor, mejor_dist = mejor
+        # Nada por encima del mayor umbral en juego puede aceptarse; luego la
+        # cota baja a la mejor distancia (los empates se juntan y se desempatan
+        # al final)
+        cota = max(self._umbral(L) for L in longitudes)
+        letras = dict(Counter(palabra))
+        mejor_dist = None
+        empatados = []  # (posición, palabra, valor) a la mejor distancia
+        for L in longitudes:
+            if abs(len(palabra) - L) > cota:
+                break
+            for posicion, ref_palabra, ref_valor in self._por_longitud[L]:
+                if self._cota_por_letras(letras, len(palabra), ref_palabra) > cota:
+                    continue
+                dist = self.levenshtein_acotada(palabra, ref_palabra, cota)
+                if dist > cota:
+                    continue
+                if mejor_dist is None or dist < mejor_dist:
+                    mejor_dist, empatados = dist, []
+                empatados.append((posicion, ref_palabra, ref_valor))
+                cota = dist
+
+        mejor = self._desempatar(palabra, mejor_dist, empatados) if empatados else None
 
         # Umbral: permitir hasta 35% de diferencia
-        umbral = max(2, int(len(ref_palabra) * 0.35))
-        if mejor_dist > umbral:
+        if mejor is None or mejor_dist > self._umbral(len(mejor[1])):
             # ── Fallback: huella digital ──
-            if len(palabra) >= 2:
-                huella = (len(palabra), palabra[0], palabra[-1])
-                if huella in self.huellas:
-                    h_candidatos = self.huellas[huella]
-                    if len(h_candidatos) == 1:
-                        return h_candidatos[0][1], 0.65
+            valor = self._huella_unica(palabra)
+            if valor is not None:
+                return valor, 0.65
             return None, 0.0
 
+        _, ref_palabra, ref_valor = mejor
+        return ref_valor, self._confianza(palabra, ref_palabra, mejor_dist)
+
+    def _desempatar(self, palabra: str, dist: int, empatados: List[Tuple[int, str, int]]) -> Tuple[int, str, int]:
+        """
+        Entre las palabras a la misma distancia, la de menor distancia
+        ponderada y luego la primera en PALABRAS: así el valor elegido y su
+        confianza salen del mismo orden que candidatos().
+        """
+        if len(empatados) == 1:
+            return empatados[0]
+        return min(empatados, key=lambda e: (self._distancia_ponderada(palabra, e[1], dist), e[0]))
+
+    def _huella_unica(self, palabra: str) -> Optional[int]:
+        """
+        Valor de la única palabra con la misma huella (longitud + primera y
+        última letra), o si no la hay, con la misma huella de la clave fonética.
+        """
+        if len(palabra) < 2:
+            return None
+        clave = self.clave_fonetica(palabra)
+        for huellas, texto in ((self.huellas, palabra), (self.huellas_foneticas, clave)):
+            if texto:
+                h_candidatos = huellas.get((len(texto), texto[0], texto[-1]), [])
+                if len(h_candidatos) == 1:
+                    return h_candidatos[0][1]
+        return None
+
+    def _confianza(self, palabra: str, ref_palabra: str, dist: int) -> float:
+        """Confianza de leer palabra como ref_palabra a distancia dist."""
         # Calcular confianza basada en proporción de caracteres correctos
-        conf = max(0.50, 1.0 - (mejor_dist / max(len(ref_palabra), 1)))
+        # ("sinco" → "cinco" cuenta menos que "xinco": ver confusiones_ocr.py)
+        dist = self._distancia_ponderada(palabra, ref_palabra, dist)
+        conf = max(0.50, 1.0 - (dist / max(len(ref_palabra), 1)))
 
         # Bonus si la huella coincide (misma longitud + primera/última letra)
         if (len(palabra) == len(ref_palabra) and
@@ -365,7 +836,114 @@ class ConvertidorTextoNumeros:
             palabra[-1] == ref_palabra[-1]):
             conf = min(1.0, conf + 0.10)
 
-        return ref_valor, conf
+        return conf
+
+    def _distancia_ponderada(self, texto: str, referencia: str, dist: int) -> float:
+        """La distancia con costos de confusión, sin pasar de la de Levenshtein."""
+        if dist == 0:
+            return 0
+        return min(dist, self.confusiones.distancia(texto, referencia))
+
+    # ══════════════════════════════════════════════════════════════════════
+    # CANDIDATOS (top-k) PARA EL MOTOR DE CONSISTENCIA
+    # ══════════════════════════════════════════════════════════════════════
+
+    def candidatos(self, texto: str, k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Los k valores más probables del texto, no solo el mejor.
+
+        Cada palabra aporta sus mejores coincidencias (mismo umbral y misma
+        confianza que _fuzzy_palabra) y los valores se combinan sumando,
+        con la confianza mínima de sus palabras.
+
+        Ejemplos:
+            'Quinientos'  → [(500, 1.0)]
+            'Secenta'     → [(60, 0.96), (70, 0.96)]   — sesenta o setenta
+            'Seisientos'  → [(600, 0.91), (700, 0.73), (500, 0.70)]
+
+        Returns:
+            Lista de (valor, confianza) de mayor a menor confianza (vacía si
+            ninguna palabra se parece a un número).
+        """
+        normalizado = self.normalizar(texto)
+        if not normalizado:
+            return []
+        return list(self._memo_candidatos(normalizado, k))
+
+    def _candidatos_normalizado(self, normalizado: str, k: int) -> Tuple[Tuple[int, float], ...]:
+        """candidatos() sobre texto ya normalizado (no vacío); tupla para poder recordarla."""
+        exacto = self._memo_exacto(normalizado)
+        if exacto is not None:
+            return ((exacto, 1.0),)
+
+        compacto = compactar(normalizado)
+        valor = self.lexico.buscar_exacto(compacto)
+        if valor is not None:
+            return ((valor, CONFIANZA_ESPACIOS),)
+
+        palabras = [p for p in normalizado.replace(' y ', ' ').split() if p]
+        if not palabras:
+            return ()
+
+        # Combinaciones parciales: valor acumulado → confianza
+        parciales = {0: 1.0}
+        for palabra in palabras:
+            opciones = ([(self.PALABRAS[palabra], 1.0)] if palabra in self.PALABRAS
+                        else self._candidatos_palabra(palabra, k))
+            if not opciones:
+                # Alguna palabra no se parece a nada: la frase completa en el léxico
+                frase = self._candidatos_frase(compacto, k)
+                if frase:
+                    return frase
+                valor, conf, _ = self._memo_segmentar(compacto)
+                return ((valor, conf),) if valor is not None else ()
+            siguientes = {}
+            for acumulado, conf_acumulada in parciales.items():
+                for valor, conf in opciones:
+                    total = acumulado + valor
+                    siguientes[total] = max(siguientes.get(total, 0.0), min(conf_acumulada, conf))
+            # Conservar solo las k mejores combinaciones en cada paso
+            parciales = dict(sorted(siguientes.items(), key=lambda x: -x[1])[:k])
+
+        # Varias palabras: la frase completa también vota (ver _fuzzy_frase)
+        if len(palabras) > 1:
+            for valor, conf in self._candidatos_frase(compacto, k):
+                parciales[valor] = max(parciales.get(valor, 0.0), conf)
+
+        return tuple(sorted(parciales.items(), key=lambda x: -x[1])[:k])
+
+    def _candidatos_frase(self, compacto: str, k: int) -> Tuple[Tuple[int, float], ...]:
+        """Hasta k valores distintos para la frase completa según el léxico."""
+        por_valor = {}
+        for grafia, valor, dist in self.lexico.buscar(compacto, self._cota_frase(len(compacto))):
+            por_valor[valor] = max(por_valor.get(valor, 0.0), self._confianza_frase(compacto, grafia, dist))
+        return tuple(sorted(por_valor.items(), key=lambda x: -x[1])[:k])
+
+    def _candidatos_palabra(self, palabra: str, k: int) -> List[Tuple[int, float]]:
+        """Hasta k valores distintos para una palabra corrupta (ver _fuzzy_palabra)."""
+        coincidencias = []
+        letras = dict(Counter(palabra))
+        for L in self._longitudes_compatibles(palabra):
+            umbral = self._umbral(L)
+            for posicion, ref_palabra, ref_valor in self._por_longitud[L]:
+                if self._cota_por_letras(letras, len(palabra), ref_palabra) > umbral:
+                    continue
+                dist = self.levenshtein_acotada(palabra, ref_palabra, umbral)
+                if dist <= umbral:
+                    coincidencias.append((posicion, ref_valor, self._confianza(palabra, ref_palabra, dist)))
+
+        # En orden del diccionario, para que los empates salgan siempre igual
+        por_valor = {}
+        for _, ref_valor, conf in sorted(coincidencias):
+            por_valor[ref_valor] = max(por_valor.get(ref_valor, 0.0), conf)
+
+        if not por_valor:
+            # Mismo respaldo que _fuzzy_palabra: huella única
+            valor = self._huella_unica(palabra)
+            if valor is not None:
+                return [(valor, 0.65)]
+
+        return sorted(por_valor.items(), key=lambda x: -x[1])[:k]
 
     # ══════════════════════════════════════════════════════════════════════
     # NIVEL 3: DETECCIÓN POR HUELLA (solo longitud + primera/última)
@@ -471,7 +1049,7 @@ class ConvertidorTextoNumeros:
         # ── PRIORIDAD 2: Conversión difusa del texto ──
         fuzzy_int, fuzzy_conf = self.convertir_fuzzy(texto_letra)
 
-        if fuzzy_int is not None and fuzzy_conf >= 0.60:
+        if fuzzy_int is not None and fuzzy_conf >= self.confianza_fuzzy_min:
             if digito_int is not None and fuzzy_int == digito_int:
                 resultado['valor'] = fuzzy_int
                 resultado['confianza'] = min(fuzzy_conf, 0.95)
@@ -506,6 +1084,223 @@ class ConvertidorTextoNumeros:
 
         return resultado
 
+    # ══════════════════════════════════════════════════════════════════════
+    # VALIDACIÓN EN LOTE
+    # ══════════════════════════════════════════════════════════════════════
+
+    def validar_campos_lote(self, pares: List[Tuple[str, str]]) -> List[dict]:
+        """
+        validar_campo para muchos campos a la vez (re-validaciones masivas).
+
+        Los pares repetidos se validan una sola vez, y las palabras
+        desconocidas de todos ellos se comparan contra el diccionario completo
+        en una sola programación dinámica de NumPy (ver distancias_diccionario);
+        igual las frases que hay que buscar en el léxico (ver _frases_lote).
+
+        Args:
+            pares: [(texto_letra, texto_digito), ...]
+
+        Returns:
+            Un dict por par, en el mismo orden e idéntico al de validar_campo
+        """
+        unicos = list(dict.fromkeys((letra or "", digito or "") for letra, digito in pares))
+
+        # Textos que no se resuelven de forma exacta (ni con espacios de más o de menos)
+        difusos = set()
+        for letra, _ in unicos:
+            normalizado = self.normalizar(letra)
+            if (normalizado and self._memo_exacto(normalizado) is None and
+                    self.lexico.buscar_exacto(compactar(normalizado)) is None and
+                    self.clave_fonetica(compactar(normalizado)) not in self._foneticas):
+                difusos.add(normalizado)
+
+        desconocidas = {palabra for normalizado in difusos
+                        for palabra in normalizado.replace(' y ', ' ').split()
+                        if palabra not in self.PALABRAS}
+        self._fuzzy_lote = self._fuzzy_palabras_lote(sorted(desconocidas))
+
+        # Frases que _fuzzy_normalizado buscará en el léxico: las de varias
+        # palabras y las de una sola que no se parece a ninguna
+        frases = set()
+        for normalizado in difusos:
+            palabras = normalizado.replace(' y ', ' ').split()
+            if len(palabras) > 1 or (palabras and self._fuzzy_lote[palabras[0]][0] is None):
+                frases.add(compactar(normalizado))
+        self._frase_lote = self._frases_lote(sorted(frases))
+        try:
+            resultados = {par: self.validar_campo(*par) for par in unicos}
+        finally:
+            self._fuzzy_lote = {}
+            self._frase_lote = {}
+
+        return [dict(resultados[(letra or "", digito or "")]) for letra, digito in pares]
+
+    def distancias_diccionario(self, palabras: List[str]) -> np.ndarray:
+        """
+        Distancia Levenshtein de cada palabra contra cada entrada de PALABRAS
+        de largo compatible (el filtro ±30% de _fuzzy_palabra); las parejas
+        que el filtro descarta quedan con el máximo de int16.
+
+        Las palabras se agrupan por largo y cada bloque avanza junto por la
+        misma tabla de programación dinámica (caracteres rellenados a la más
+        larga); como cada celda depende solo de los prefijos, el relleno no
+        altera la celda (largo de la palabra, largo de la referencia).
+
+        Returns:
+            Matriz int16 (len(palabras), len(PALABRAS)) en el orden de PALABRAS
+        """
+        referencias = list(self.PALABRAS)
+        todos_largos_ref = np.array([len(r) for r in referencias])
+        distancias = np.full((len(palabras), len(referencias)), np.iinfo(np.int16).max, dtype=np.int16)
+
+        orden = sorted(range(len(palabras)), key=lambda k: len(palabras[k]))
+        for inicio in range(0, len(orden), TAM_BLOQUE_LOTE):
+            indices = orden[inicio:inicio + TAM_BLOQUE_LOTE]
+            bloque = [palabras[k] for k in indices]
+            largo = np.array([len(p) for p in bloque])
+
+            # Solo las referencias que alguna palabra del bloque deja pasar
+            utiles = np.flatnonzero((largo.max() / todos_largos_ref >= 0.65) &
+                                    (largo.min() / todos_largos_ref <= 1.50))
+            if not len(utiles):
+                continue
+            largo_ref = todos_largos_ref[utiles]
+            ref = self._codificar([referencias[r] for r in utiles], int(largo_ref.max()), relleno='\x01')
+            texto = self._codificar(bloque, int(largo.max()), relleno='\x02')
+            columnas = np.arange(ref.shape[1] + 1, dtype=np.int16)
+
+            # fila[k, r, j] = distancia entre texto[k][:i] y ref[r][:j]
+            fila = np.broadcast_to(columnas, (len(bloque), len(utiles), len(columnas))).copy()
+            salida = np.empty((len(bloque), len(utiles)), dtype=np.int16)
+            for i in range(1, texto.shape[1] + 1):
+                # Sustitución y borrado salen de la fila anterior...
+                base = np.empty_like(fila)
+                base[:, :, 0] = i
+                distinto = texto[:, i - 1, None, None] != ref[None, :, :]
+                np.minimum(fila[:, :, :-1] + distinto, fila[:, :, 1:] + 1, out=base[:, :, 1:])
+                # ...y la inserción encadena dentro de la fila: min_k(base[k] + j - k)
+                fila = np.minimum.accumulate(base - columnas, axis=2) + columnas
+
+                terminan = np.flatnonzero(largo == i)
+                if len(terminan):
+                    salida[terminan] = fila[terminan][:, np.arange(len(utiles)), largo_ref]
+
+            # Las parejas fuera del filtro de la propia palabra no cuentan
+            proporcion = largo[:, None] / largo_ref[None, :]
+            salida[(proporcion < 0.65) | (proporcion > 1.50)] = np.iinfo(np.int16).max
+            distancias[np.ix_(indices, utiles)] = salida
+        return distancias
+
+    def _frases_lote(self, compactos: List[str]) -> Dict[str, Tuple[Optional[int], float]]:
+        """
+        _fuzzy_frase de muchas frases compactas a la vez.
+
+        En vez de recorrer el trie por frase, se descartan con NumPy las
+        grafías que ni el largo ni el conteo de letras dejan a la cota de la
+        frase, y las parejas que quedan se miden juntas en distancias_pares.
+        """
+        if not compactos:
+            return {}
+        grafias, valores = self.lexico.compactas, self.lexico.valores
+        largo_grafia = np.array([len(g) for g in grafias])
+        if self._letras_lexico is None:
+            self._letras_lexico = self._contar_letras(grafias)
+
+        coincidencias: Dict[int, list] = {}
+        for inicio in range(0, len(compactos), 256):
+            bloque = compactos[inicio:inicio + 256]
+            cotas = np.array([self._cota_frase(len(c)) for c in bloque])
+            largo = np.array([len(c) for c in bloque])
+
+            # Cotas inferiores baratas de la distancia: primero el largo...
+            filas, columnas = np.nonzero(np.abs(largo[:, None] - largo_grafia[None, :]) <= cotas[:, None])
+            # ...y en lo que queda, las letras que sobran o faltan
+            sobran = np.clip(self._contar_letras(bloque)[filas] - self._letras_lexico[columnas], 0, None).sum(axis=1)
+            faltan = sobran + largo_grafia[columnas] - largo[filas]
+            posibles = np.maximum(sobran, faltan) <= cotas[filas]
+            filas, columnas = filas[posibles], columnas[posibles]
+
+            distancias = self.distancias_pares([bloque[f] for f in filas], [grafias[c] for c in columnas])
+            for f, c, d in zip(filas, columnas, distancias):
+                if d <= cotas[f]:
+                    coincidencias.setdefault(inicio + int(f), []).append((grafias[c], valores[c], int(d)))
+
+        return {compacto: self._elegir_frase(compacto, coincidencias.get(k, []))
+                for k, compacto in enumerate(compactos)}
+
+    @classmethod
+    def distancias_pares(cls, textos: List[str], referencias: List[str]) -> np.ndarray:
+        """
+        Distancia Levenshtein de textos[k] contra referencias[k], todas las
+        parejas en la misma programación dinámica (ver distancias_diccionario).
+        """
+        distancias = np.empty(len(textos), dtype=np.int16)
+        for inicio in range(0, len(textos), 16 * TAM_BLOQUE_LOTE):
+            a = textos[inicio:inicio + 16 * TAM_BLOQUE_LOTE]
+            b = referencias[inicio:inicio + 16 * TAM_BLOQUE_LOTE]
+            largo_a = np.array([len(t) for t in a])
+            largo_b = np.array([len(r) for r in b])
+            codigos_a = cls._codificar(a, int(largo_a.max()), relleno='\x02')
+            codigos_b = cls._codificar(b, int(largo_b.max()), relleno='\x01')
+            columnas = np.arange(codigos_b.shape[1] + 1, dtype=np.int16)
+
+            fila = np.broadcast_to(columnas, (len(a), len(columnas))).copy()
+            salida = largo_b.astype(np.int16)  # texto vacío: tantas inserciones como letras
+            for i in range(1, codigos_a.shape[1] + 1):
+                base = np.empty_like(fila)
+                base[:, 0] = i
+                distinto = codigos_a[:, i - 1, None] != codigos_b
+                np.minimum(fila[:, :-1] + distinto, fila[:, 1:] + 1, out=base[:, 1:])
+                fila = np.minimum.accumulate(base - columnas, axis=1) + columnas
+
+                terminan = np.flatnonzero(largo_a == i)
+                salida[terminan] = fila[terminan, largo_b[terminan]]
+            distancias[inicio:inicio + len(a)] = salida
+        return distancias
+
+    @staticmethod
+    def _contar_letras(textos: List[str]) -> np.ndarray:
+        """Cuántas veces aparece cada letra a-z en cada texto (normalizado)."""
+        conteo = np.zeros((len(textos), 26), dtype=np.int16)
+        for k, texto in enumerate(textos):
+            for letra, veces in Counter(texto).items():
+                if 'a' <= letra <= 'z':
+                    conteo[k, ord(letra) - ord('a')] = veces
+        return conteo
+
+    @staticmethod
+    def _codificar(palabras: List[str], largo: int, relleno: str) -> np.ndarray:
+        """Códigos de carácter de cada palabra, rellenados hasta largo."""
+        texto = "".join(palabra.ljust(largo, relleno) for palabra in palabras)
+        return np.frombuffer(texto.encode("utf-32-le"), dtype=np.uint32).reshape(len(palabras), largo)
+
+    def _fuzzy_palabras_lote(self, palabras: List[str]) -> Dict[str, Tuple[Optional[int], float]]:
+        """_fuzzy_palabra de muchas palabras a partir de una sola matriz de distancias."""
+        if not palabras:
+            return {}
+        referencias = list(self.PALABRAS.items())
+        distancias = self.distancias_diccionario(palabras)
+
+        compatibles = distancias != np.iinfo(np.int16).max
+        minimas = distancias.min(axis=1)
+
+        resultados = {}
+        for k, palabra in enumerate(palabras):
+            if not compatibles[k].any():
+                resultados[palabra] = (None, 0.0)
+                continue
+            # Los empates se resuelven igual que en _fuzzy_palabra
+            dist = int(minimas[k])
+            empatados = [(i, *referencias[i]) for i in np.flatnonzero(distancias[k] == dist)]
+            _, ref_palabra, ref_valor = self._desempatar(palabra, dist, empatados)
+            if dist > self._umbral(len(ref_palabra)):
+                # Mismo respaldo que _fuzzy_palabra: huella única
+                valor = self._huella_unica(palabra)
+                resultados[palabra] = (valor, 0.65) if valor is not None else (None, 0.0)
+                continue
+            resultados[palabra] = (ref_valor, self._confianza(palabra, ref_palabra, dist))
+        return resultados
+
     @staticmethod
     def _extraer_digito(texto_digito: str) -> Optional[int]:
         """Extrae un entero del texto de dígito, limpiando caracteres extra."""
@@ -530,6 +1325,52 @@ class ConvertidorTextoNumeros:
             f"{total_huellas} huellas ({self._huellas_unicas} únicas)"
         )
 
+    def estadisticas_memo(self) -> dict:
+        """
+        Aciertos/fallos de la memoria de cada nivel.
+
+        Returns:
+            {nivel: {'hits', 'misses', 'maxsize', 'currsize', 'tasa_aciertos'}}
+        """
+        memorias = {
+            'normalizar': self.normalizar,
+            'exacto': self._memo_exacto,
+            'fuzzy': self._memo_fuzzy,
+            'candidatos': self._memo_candidatos,
+            'segmentar': self._memo_segmentar,
+        }
+        estadisticas = {}
+        for nombre, memo in memorias.items():
+            info = memo.cache_info()._asdict()
+            consultas = info['hits'] + info['misses']
+            info['tasa_aciertos'] = info['hits'] / consultas if consultas else 0.0
+            estadisticas[nombre] = info
+        return estadisticas
+
+    def vaciar_memo(self):
+        """Olvida los textos recordados (normalizar es compartido por todas las instancias)."""
+        self.normalizar.cache_clear()
+        self._memo_exacto.cache_clear()
+        self._memo_fuzzy.cache_clear()
+        self._memo_candidatos.cache_clear()
+        self._memo_segmentar.cache_clear()
+
+
+# Instancia compartida por todo el proceso (ver obtener_convertidor)
+_CONVERTIDOR_COMPARTIDO: Optional[ConvertidorTextoNumeros] = None
+
+
+def obtener_convertidor() -> ConvertidorTextoNumeros:
+    """
+    Devuelve el convertidor del proceso, construyéndolo solo la primera vez.
+    Las huellas y la memoria de valores ya vistos se conservan entre actas
+    (en lote o en servicio, "Cero" o "Veinte" se resuelven una sola vez).
+    """
+    global _CONVERTIDOR_COMPARTIDO
+    if _CONVERTIDOR_COMPARTIDO is None:
+        _CONVERTIDOR_COMPARTIDO = ConvertidorTextoNumeros()
+    return _CONVERTIDOR_COMPARTIDO
+
 
 # ══════════════════════════════════════════════════════════════════════════
 # PRUEBAS DE VERIFICACIÓN
@@ -0,0 +1,203 @@
+"""
+Léxico de Números Escritos — FLUJO 4
+=====================================
+Todas las grafías válidas de 0 a 999 en español, generadas una sola vez
+a partir de las palabras base de ConvertidorTextoNumeros:
+
+  - Femeninos:          "doscientas una", "veintiuna"
+  - Apócopes:           "un", "veintiún" → "veintiun", "ciento un"
+  - Uniones con "y":    "treinta y cinco", también sin la "y" ("treinta cinco")
+  - Formas separadas:   "diez y seis", "veinte y tres"
+  - Sin acentos:        se guardan ya normalizadas ("dieciséis" → "dieciseis")
+
+Las grafías se compilan en un trie por su forma compacta (sin espacios),
+así que "cuatro cientos", "cuatrocientos" y "treintaycinco" se encuentran
+igual que la grafía correcta, y la búsqueda con distancia de edición acotada
+recorre el trie con una fila de Levenshtein por nodo (equivalente a simular
+un autómata de Levenshtein) y poda cada rama en cuanto la supera.
+
+El trie se guarda en .cache/lexico_numeros.pkl (junto a este módulo) y se
+reconstruye solo si cambian las palabras base o la versión del generador.
+
+Uso:
+    lexico = cargar_lexico(ConvertidorTextoNumeros.PALABRAS)
+    lexico.buscar_exacto("cuatrocientos")        # 400
+    lexico.buscar("trescientosdoze", cota=1)      # [('trescientosdoce', 312, 1)]
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+# Cambiar al modificar las reglas de generación o lo que se guarda (invalida el trie guardado)
+VERSION_GENERADOR = 2
+
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "lexico_numeros.pkl")
+
+# Marca de fin de grafía en un nodo del trie (ninguna letra es la cadena vacía)
+_FIN = ""
+
+# Apócopes que no están entre las palabras base del convertidor
+APOCOPES = {"un": 1, "veintiun": 21}
+
+
+def generar_grafias(palabras: Dict[str, int]) -> Dict[str, int]:
+    """
+    Genera todas las grafías de 0 a 999.
+
+    Args:
+        palabras: Palabras base normalizadas → valor (ConvertidorTextoNumeros.PALABRAS)
+
+    Returns:
+        {grafía normalizada con espacios: valor}
+    """
+    formas: Dict[int, List[str]] = {}
+    for palabra, valor in list(palabras.items()) + list(APOCOPES.items()):
+        formas.setdefault(valor, []).append(palabra)
+
+    # 1 a 99 tal como van después de una centena
+    resto: Dict[int, List[str]] = {}
+    for valor in range(1, 30):
+        resto[valor] = list(formas.get(valor, []))
+    for valor in range(16, 20):
+        resto[valor] += [f"diez y {u}" for u in formas[valor - 10]]
+    for valor in range(21, 30):
+        resto[valor] += [f"veinte y {u}" for u in formas[valor - 20]]
+    for decena in range(30, 100, 10):
+        resto[decena] = list(formas[decena])
+        for unidad in range(1, 10):
+            resto[decena + unidad] = [f"{d}{union}{u}" for d in formas[decena]
+                                      for union in (" y ", " ") for u in formas[unidad]]
+
+    grafias = {forma: 0 for forma in formas[0]}
+    for valor, lista in resto.items():
+        for forma in lista:
+            grafias[forma] = valor
+
+    # Centenas: "cien" sola, "ciento" con complemento (también se acepta sola)
+    centenas = {1: ["ciento"]}
+    for centena in range(2, 10):
+        centenas[centena] = list(formas[centena * 100])
+    for forma in formas[100]:
+        grafias[forma] = 100
+    for centena, lista in centenas.items():
+        for forma_centena in lista:
+            grafias[forma_centena] = centena * 100
+            for valor, formas_resto in resto.items():
+                for forma in formas_resto:
+                    grafias[f"{forma_centena} {forma}"] = centena * 100 + valor
+    return grafias
+
+
+def compactar(texto: str) -> str:
+    """Quita los espacios (las palabras pegadas o partidas pesan igual)."""
+    return texto.replace(" ", "")
+
+
+class LexicoNumeros:
+    """Trie de las grafías compactas de 0 a 999 con búsqueda exacta y acotada."""
+
+    def __init__(self, grafias: Dict[str, int]):
+        self.total_grafias = len(grafias)
+        self.raiz: dict = {}
+        self.nodos = 1
+        # Las mismas grafías compactas en lista (para comparar en bloque con NumPy)
+        self.compactas: List[str] = []
+        self.valores: List[int] = []
+        for grafia, valor in grafias.items():
+            nodo = self.raiz
+            for letra in compactar(grafia):
+                if letra not in nodo:
+                    nodo[letra] = {}
+                    self.nodos += 1
+                nodo = nodo[letra]
+            previo = nodo.get(_FIN)
+            if previo is not None and previo != valor:
+                raise ValueError(f"Grafía compacta ambigua: '{compactar(grafia)}' = {previo} y {valor}")
+            if previo is None:
+                self.compactas.append(compactar(grafia))
+                self.valores.append(valor)
+            nodo[_FIN] = valor
+
+    def buscar_exacto(self, compacto: str) -> Optional[int]:
+        """Valor de la grafía compacta, o None si no es una grafía válida."""
+        nodo = self.raiz
+        for letra in compacto:
+            nodo = nodo.get(letra)
+            if nodo is None:
+                return None
+        return nodo.get(_FIN)
+
+    def buscar(self, compacto: str, cota: int) -> List[Tuple[str, int, int]]:
+        """
+        Grafías a distancia Levenshtein <= cota de la forma compacta.
+
+        Returns:
+            [(grafía compacta, valor, distancia), ...] de menor a mayor distancia
+        """
+        resultados = []
+        n = len(compacto)
+        fuera = cota + 1
+        fila_inicial = [j if j <= cota else fuera for j in range(n + 1)]
+        if _FIN in self.raiz and n <= cota:
+            resultados.append(("", self.raiz[_FIN], n))
+
+        # Recorrido en profundidad: (nodo, letra que llevó a él, prefijo, fila del padre).
+        # Solo se calcula la franja de ±cota alrededor de la diagonal: fuera
+        # de ella la distancia ya supera la cota
+        pila = [(hijo, letra, letra, fila_inicial) for letra, hijo in self.raiz.items() if letra != _FIN]
+        while pila:
+            nodo, letra, prefijo, fila_previa = pila.pop()
+            i = len(prefijo)
+            fila = [fuera] * (n + 1)
+            fila[0] = i if i <= cota else fuera
+            minimo = fila[0]
+            for j in range(max(1, i - cota), min(n, i + cota) + 1):
+                valor = min(fila[j - 1] + 1, fila_previa[j] + 1,
+                            fila_previa[j - 1] + (compacto[j - 1] != letra))
+                fila[j] = valor
+                if valor < minimo:
+                    minimo = valor
+
+            if _FIN in nodo and fila[n] <= cota:
+                resultados.append((prefijo, nodo[_FIN], fila[n]))
+            # Ninguna grafía de esta rama puede bajar del mínimo de la fila
+            if minimo <= cota:
+                pila.extend((hijo, siguiente, prefijo + siguiente, fila)
+                            for siguiente, hijo in nodo.items() if siguiente != _FIN)
+
+        resultados.sort(key=lambda r: (r[2], r[0]))
+        return resultados
+
+
+def _huella_palabras(palabras: Dict[str, int]) -> str:
+    """Identifica las palabras base y la versión del generador."""
+    contenido = repr((VERSION_GENERADOR, sorted(palabras.items())))
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def cargar_lexico(palabras: Dict[str, int], ruta: Optional[str] = RUTA_CACHE) -> LexicoNumeros:
+    """
+    Devuelve el léxico guardado en ruta si corresponde a las mismas palabras
+    base; si no, lo genera y lo guarda. ruta=None no usa el disco.
+    """
+    huella = _huella_palabras(palabras)
+    if ruta and os.path.exists(ruta):
+        try:
+            with open(ruta, "rb") as f:
+                datos = pickle.load(f)
+            if datos.get("huella") == huella:
+                return datos["lexico"]
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo leer el léxico guardado ({e}); se regenera")
+
+    lexico = LexicoNumeros(generar_grafias(palabras))
+    if ruta:
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, "wb") as f:
+                pickle.dump({"huella": huella, "lexico": lexico}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo guardar el léxico en {ruta}: {e}")
+    return lexico
@@ -0,0 +1,129 @@
+"""
+Pruebas del Motor de Consistencia Aritmética
+=============================================
+Actas pequeñas armadas a mano (96 = 300, 97 = 12, 98 = 312; Tabla 2 con
+200 + 112; 99 = 312) donde se vuelve dudoso o se borra algún campo:
+
+  - Un 98 dudoso se resuelve con 96 + 97 = 98
+  - Un campo sin lectura se deduce si es el único desconocido
+  - 96 y 97 intercambiables quedan ambiguos (las dos asignaciones cuadran)
+  - 98 = 99 (blanda) se relaja cuando el acta no cuadra
+  - Pasar de max_combinaciones deja todo ambiguo
+  - En el exportador, un valor ya aceptado localmente que no cuadra se corrige
+
+Ejecutar: python -m pytest -q test_consistencia.py
+"""
+
+import os
+import sys
+
+from consistencia import MotorConsistencia
+
+# ToonExporter vive en FLUJO 3
+_flujo3_path = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'FLUJO3_EXTRACCION'))
+if _flujo3_path not in sys.path:
+    sys.path.insert(0, _flujo3_path)
+from exportador import ToonExporter
+
+ACTA = {
+    (1, "96"): [(300, 1.0)],
+    (1, "97"): [(12, 1.0)],
+    (1, "98"): [(312, 1.0)],
+    (2, "1"): [(200, 1.0)],
+    (2, "2"): [(112, 1.0)],
+    (3, "99"): [(312, 1.0)],
+}
+
+
+def acta(**cambios):
+    """ACTA con algunos campos reemplazados: acta(c98=[...]) cambia (1, "98")."""
+    campos = dict(ACTA)
+    for nombre, candidatos in cambios.items():
+        campo = next(c for c in ACTA if c[1] == nombre[1:])
+        campos[campo] = candidatos
+    return campos
+
+
+# ─── MotorConsistencia ───────────────────────────────────────────────────────
+
+def test_98_dudoso_se_resuelve_con_96_mas_97():
+    # La mejor lectura (302) no cuadra; la segunda sí
+    campos = {(1, "96"): [(300, 1.0)], (1, "97"): [(12, 1.0)], (1, "98"): [(302, 0.5), (312, 0.45)]}
+    resultado = MotorConsistencia().resolver(campos)
+
+    assert resultado["resueltos"] == {(1, "98"): 312}
+    assert resultado["confirmados"] == {(1, "96"): 300, (1, "97"): 12}
+    assert resultado["ambiguos"] == []
+    assert ("96 + 97 = 98", "cumple") in resultado["restricciones"]
+
+
+def test_sin_tabla_2_no_se_deduce_99_como_cero():
+    campos = {(1, "96"): [(300, 1.0)], (1, "97"): [(12, 1.0)], (1, "98"): [(312, 1.0)]}
+    resultado = MotorConsistencia().resolver(campos)
+
+    assert resultado["relajadas"] == []
+    assert resultado["derivados"] == {(3, "99"): 312}
+    assert "Suma de la Tabla 2 = 99" not in dict(resultado["restricciones"])
+
+
+def test_campo_sin_lectura_se_deduce():
+    resultado = MotorConsistencia().resolver(acta(c98=[]))
+
+    assert resultado["derivados"] == {(1, "98"): 312}
+    assert resultado["resueltos"] == {}
+    assert resultado["ambiguos"] == []
+
+
+def test_96_y_97_intercambiables_quedan_ambiguos():
+    resultado = MotorConsistencia().resolver(acta(c96=[(300, 0.6), (12, 0.5)], c97=[(12, 0.6), (300, 0.5)]))
+
+    assert sorted(resultado["ambiguos"]) == [(1, "96"), (1, "97")]
+    assert resultado["resueltos"] == {}
+    # 98 sí queda comprobado: las dos asignaciones suman 312
+    assert resultado["confirmados"][(1, "98")] == 312
+
+
+def test_98_igual_a_99_se_relaja_si_el_acta_no_cuadra():
+    resultado = MotorConsistencia().resolver(acta(c2=[(110, 1.0)], c99=[(310, 1.0)]))
+
+    assert resultado["relajadas"] == ["98 = 99"]
+    assert dict(resultado["restricciones"]) == {"96 + 97 = 98": "cumple", "Suma de la Tabla 2 = 99": "cumple"}
+    assert resultado["confirmados"][(1, "98")] == 312
+    assert resultado["confirmados"][(3, "99")] == 310
+
+
+def test_demasiadas_combinaciones_deja_todo_ambiguo():
+    motor = MotorConsistencia(max_combinaciones=1)
+    resultado = motor.resolver(acta(c96=[(300, 0.6), (12, 0.5)], c97=[(12, 0.6), (300, 0.5)]))
+
+    assert sorted(resultado["ambiguos"]) == [(1, "96"), (1, "97")]
+    assert resultado["resueltos"] == resultado["confirmados"] == resultado["derivados"] == {}
+    assert resultado["combinaciones"] == 0
+
+
+# ─── ToonExporter._aplicar_consistencia ──────────────────────────────────────
+
+def test_valor_aceptado_localmente_se_corrige():
+    pares_por_tabla = {
+        1: [{"id": "96", "contenidos": ["Trescientos", "300"]},
+            {"id": "97", "contenidos": ["Doce", "12"]},
+            {"id": "98", "contenidos": ["Trescientos doce", "312"]}],
+        2: [{"id": "1", "contenidos": ["Doscientos", "200"]},
+            {"id": "2", "contenidos": ["Ciento doce", "112"]}],
+        3: [{"id": "99", "contenidos": ["Trescientos doce", "312"]}],
+    }
+    registros_por_tabla = [[{"id": par["id"], "digitos": par["contenidos"][1]} for par in pares_por_tabla[t]]
+                           for t in (1, 2, 3)]
+    # La pre-validación local ya había aceptado 98 con otro valor
+    resueltos = {1: {"98": {"id": "98", "tabla": 1, "valor": 302, "confianza": "media",
+                            "razonamiento": "[LOCAL] texto_fuzzy"}}, 2: {}, 3: {}}
+    pendientes = {1: [], 2: [], 3: []}
+
+    informe = ToonExporter()._aplicar_consistencia(pares_por_tabla, registros_por_tabla, resueltos, pendientes)
+
+    assert informe["corregidos"] == 1
+    assert informe["resueltos"] == 0
+    assert resueltos[1]["98"]["valor"] == 312
+    assert "Local decía 302" in resueltos[1]["98"]["razonamiento"]
+    # Los que ya cuadraban no se tocan
+    assert set(resueltos[1]) == {"98"}
@@ -1,13 +1,16 @@
 """
 Pruebas del Convertidor Texto → Números
 ========================================
-Ejecutar: python test_convertidor.py
+Ejecutar: python test_convertidor.py   (o con pytest, junto a test_propiedades_convertidor.py)
 """
 
+import sys
+
 from convertidor_texto_numeros import ConvertidorTextoNumeros
 
 
-def main():
+def main() -> int:
+    """Corre los casos a mano e imprime cada uno; devuelve cuántos fallaron."""
     conv = ConvertidorTextoNumeros()
     print(conv.info())
     errores = 0
@@ -43,6 +46,10 @@ def main():
         ("Selcarta", None), ("treivila", None), ("Ochodeutos", 800),
         ("Despula", None), ("Quinits", None), ("diecinneve", 19),
         ("sincuenta", 50), ("cuaranta", 40),
+        # Empate de Levenshtein con "seis": decide la confusión c/s ("cien")
+        ("Sin", 100),
+        # Misma pronunciación (clave fonética)
+        ("Kinse", 15), ("Sinkuenta y sinco", 55), ("trecientos", 300),
     ]
 
     for texto, esperado in pruebas_fuzzy:
@@ -65,6 +72,8 @@ def main():
         ("Treinta y Cinco", "035", 35, 1.0),
         ("Cincuenta", "050", 50, 1.0),
         ("Ochocientos", "800", 800, 1.0),
+        # Confusiones típicas de la letra manuscrita (v/b, c/s, qu/k) pesan menos
+        ("Nuebe", "9", 9, 0.95), ("Sinkuenta", "50", 50, 0.90),
     ]
 
     for texto, digito, esperado_val, esperado_conf_min in pruebas_campo:
@@ -75,12 +84,70 @@ def main():
             errores += 1
         print(f"  {'✅' if ok else '❌'} '{texto}' / '{digito}' → {val} [{conf:.0%}] vía {metodo}")
 
+    # ── Pruebas del léxico (palabras pegadas o partidas) ──
+    print("\n" + "═" * 60)
+    print(" PRUEBAS DEL LÉXICO (palabras pegadas o partidas)")
+    print("═" * 60)
+
+    pruebas_lexico = [
+        ("Cuatro cientos", 400), ("Treintaycinco", 35), ("dieci seis", 16),
+        ("Diez y seis", 16), ("Doscientas una", 201), ("Veintiún", 21),
+        ("cuatro sientos", 400), ("trescientosdoze", 312),
+    ]
+
+    for texto, esperado in pruebas_lexico:
+        resultado, conf = conv.convertir_fuzzy(texto)
+        ok = resultado == esperado
+        if not ok:
+            errores += 1
+        print(f"  {'✅' if ok else '❌'} '{texto}' → {resultado} [{conf:.0%}] (esperado: {esperado})")
+
+    # ── Pruebas de segmentación (pegadas o partidas, con errores) ──
+    print("\n" + "═" * 60)
+    print(" PRUEBAS DE SEGMENTACIÓN")
+    print("═" * 60)
+
+    pruebas_segmentacion = [
+        ("kuatrosientosbeintitrez", 423), ("nobesientos noventa i nuebe", 999),
+        ("dos sientos sinkuenta y ocho", 258), ("treivila", None),
+    ]
+
+    for texto, esperado in pruebas_segmentacion:
+        resultado, conf, palabras = conv.segmentar(texto)
+        ok = resultado == esperado
+        if not ok:
+            errores += 1
+        print(f"  {'✅' if ok else '❌'} '{texto}' → {resultado} [{conf:.0%}] {palabras} (esperado: {esperado})")
+
+    # ── Pruebas de candidatos (motor de consistencia) ──
+    print("\n" + "═" * 60)
+    print(" PRUEBAS DE CANDIDATOS (top-k)")
+    print("═" * 60)
+
+    pruebas_candidatos = [
+        ("Quinientos", [500]), ("Secenta", [60, 70]),
+        ("Seisientos", [600, 700, 500]), ("treivila", []),
+    ]
+
+    for texto, esperados in pruebas_candidatos:
+        valores = [valor for valor, _ in conv.candidatos(texto)]
+        ok = valores == esperados
+        if not ok:
+            errores += 1
+        print(f"  {'✅' if ok else '❌'} '{texto}' → {valores} (esperado: {esperados})")
+
     # ── Resumen ──
-    total = len(pruebas_exactas) + len(pruebas_fuzzy) + len(pruebas_campo)
+    total = (len(pruebas_exactas) + len(pruebas_fuzzy) + len(pruebas_campo) +
+             len(pruebas_lexico) + len(pruebas_segmentacion) + len(pruebas_candidatos))
     print(f"\n{'═' * 60}")
     print(f" RESULTADO: {total - errores}/{total} pruebas pasadas {'✅' if errores == 0 else '❌'}")
     print(f"{'═' * 60}")
+    return errores
+
+
+def test_casos_a_mano():
+    assert main() == 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(1 if main() else 0)
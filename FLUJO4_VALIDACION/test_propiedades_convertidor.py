@@ -0,0 +1,186 @@
+"""
+Propiedades del Convertidor Texto → Números
+============================================
+Recorre todos los números de 0 a 999 en lugar de una lista de casos:
+
+  - Ida y vuelta: la grafía canónica de cada número vuelve a su valor con
+    convertir, y todas las grafías del léxico con convertir_fuzzy
+  - Recuperación: con errores de OCR simulados (semilla fija), qué proporción
+    recupera convertir_fuzzy y cuántas veces se equivoca sin avisar
+  - Lote: validar_campos_lote da lo mismo que validar_campo
+  - normalizar: exactamente el mismo texto que la versión original (NFD +
+    re.sub) en un corpus grande y en cada carácter del plano básico
+
+Ejecutar: python -m pytest -q test_propiedades_convertidor.py
+"""
+
+import random
+
+import pytest
+
+from benchmark_convertidor import _normalizar_original, corpus_textos
+from convertidor_texto_numeros import ConvertidorTextoNumeros
+from lexico_numeros import generar_grafias
+
+_LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+# Pisos según ediciones por grafía, medidos sobre 3000 grafías corruptas
+# (99.4% / 97.5% recuperadas, 0.6% / 2.3% equivocadas) con algo de margen
+RECUPERACION_MINIMA = {1: 0.98, 2: 0.95}
+ERRORES_MAXIMOS = {1: 0.01, 2: 0.035}
+
+
+@pytest.fixture(scope="module")
+def conv():
+    return ConvertidorTextoNumeros()
+
+
+def escribir(numero: int) -> str:
+    """Grafía canónica (masculino, sin apócopes) de 0 a 999."""
+    palabra = {}
+    for texto, valor in ConvertidorTextoNumeros.PALABRAS.items():
+        palabra.setdefault(valor, texto)
+    if numero == 0:
+        return palabra[0]
+    if numero == 100:
+        return palabra[100]
+
+    centena, resto = divmod(numero, 100)
+    partes = []
+    if centena:
+        partes.append("ciento" if centena == 1 else palabra[centena * 100])
+    if resto:
+        if resto < 30 or resto % 10 == 0:
+            partes.append(palabra[resto])
+        else:
+            partes.append(f"{palabra[resto - resto % 10]} y {palabra[resto % 10]}")
+    return " ".join(partes)
+
+
+def corromper(aleatorio: random.Random, texto: str, ediciones: int) -> str:
+    """Borra, inserta o cambia letras (nunca los espacios) como el OCR."""
+    letras = list(texto)
+    for _ in range(ediciones):
+        posiciones = [i for i, c in enumerate(letras) if c != " "]
+        i = aleatorio.choice(posiciones)
+        operacion = aleatorio.randrange(3)
+        if operacion == 0 and len(posiciones) > 1:
+            letras.pop(i)
+        elif operacion == 1:
+            letras.insert(i, aleatorio.choice(_LETRAS))
+        else:
+            letras[i] = aleatorio.choice(_LETRAS.replace(letras[i], ""))
+    return "".join(letras)
+
+
+# ─── Ida y vuelta ────────────────────────────────────────────────────────────
+
+def test_grafia_canonica_ida_y_vuelta(conv):
+    fallan = [(n, escribir(n), conv.convertir(escribir(n))) for n in range(1000)
+              if conv.convertir(escribir(n)) != n]
+    assert not fallan
+
+
+def test_mayusculas_acentos_y_espacios_no_importan(conv):
+    for n in range(1000):
+        texto = escribir(n)
+        variante = "  " + texto.upper().replace(" ", "   ").replace("VEINTITRES", "VEINTITRÉS") + " "
+        assert conv.convertir(variante) == n, variante
+
+
+def test_todas_las_grafias_del_lexico(conv):
+    grafias = generar_grafias(ConvertidorTextoNumeros.PALABRAS)
+    fallan = []
+    for grafia, valor in grafias.items():
+        resultado, confianza = conv.convertir_fuzzy(grafia)
+        if resultado != valor or confianza < 0.95:
+            fallan.append((grafia, valor, resultado, confianza))
+    assert not fallan
+
+
+def test_grafias_pegadas(conv):
+    for n in range(1000):
+        pegada = escribir(n).replace(" ", "")
+        assert conv.convertir_fuzzy(pegada)[0] == n, pegada
+
+
+def test_normalizar_es_idempotente(conv):
+    for n in range(0, 1000, 7):
+        normalizado = conv.normalizar(escribir(n).title() + "  ¿?")
+        assert conv.normalizar(normalizado) == normalizado
+
+
+def test_normalizar_igual_que_la_original(conv):
+    normalizar = conv.normalizar.__wrapped__
+    difieren = [t for t in corpus_textos(50000, semilla=5) if normalizar(t) != _normalizar_original(t)]
+    assert not difieren
+
+
+def test_normalizar_cada_caracter_igual_que_la_original(conv):
+    normalizar = conv.normalizar.__wrapped__
+    difieren = []
+    for codigo in range(0x10000):
+        if 0xD800 <= codigo < 0xE000:
+            continue
+        texto = f"Cin{chr(codigo)}co {chr(codigo)}"
+        if normalizar(texto) != _normalizar_original(texto):
+            difieren.append(hex(codigo))
+    assert not difieren
+
+
+# ─── Recuperación con errores de OCR ─────────────────────────────────────────
+
+@pytest.mark.parametrize("ediciones", [1, 2])
+def test_recuperacion_con_errores(conv, ediciones):
+    aleatorio = random.Random(ediciones)
+    aciertos = errores = 0
+    total = 3000
+    for _ in range(total):
+        n = aleatorio.randrange(1000)
+        resultado, _ = conv.convertir_fuzzy(corromper(aleatorio, escribir(n), ediciones))
+        aciertos += resultado == n
+        errores += resultado is not None and resultado != n
+
+    assert aciertos / total >= RECUPERACION_MINIMA[ediciones]
+    assert errores / total <= ERRORES_MAXIMOS[ediciones]
+
+
+def test_empate_se_decide_igual_que_candidatos(conv):
+    # "sin" queda a 2 ediciones de "seis" y de "cien"; con la confusión c/s
+    # "cien" está más cerca, y convertir_fuzzy y candidatos deben coincidir
+    resultado = conv.convertir_fuzzy("Sin")
+    assert resultado[0] == 100
+    assert resultado == conv.candidatos("Sin")[0]
+    assert conv.validar_campos_lote([("Sin", "")])[0] == conv.validar_campo("Sin", "")
+
+
+def test_candidatos_incluyen_el_valor_difuso(conv):
+    aleatorio = random.Random(3)
+    for _ in range(500):
+        texto = corromper(aleatorio, escribir(aleatorio.randrange(1000)), 1)
+        valor, _ = conv.convertir_fuzzy(texto)
+        if valor is not None:
+            assert valor in [v for v, _ in conv.candidatos(texto, k=5)], texto
+
+
+# ─── validar_campo y el lote ─────────────────────────────────────────────────
+
+def test_texto_exacto_y_digito_coinciden(conv):
+    for n in range(0, 1000, 13):
+        resultado = conv.validar_campo(escribir(n).capitalize(), str(n))
+        assert resultado["valor"] == n
+        assert resultado["confianza"] == 1.0
+        assert resultado["metodo"] == "texto_exacto_coincide"
+
+
+def test_lote_igual_que_uno_por_uno():
+    aleatorio = random.Random(4)
+    pares = []
+    for _ in range(1500):
+        n = min(int(aleatorio.expovariate(1 / 60)), 999)
+        texto = corromper(aleatorio, escribir(n), aleatorio.randint(0, 3)) if aleatorio.random() < 0.5 else escribir(n)
+        pares.append((texto, str(n if aleatorio.random() < 0.9 else aleatorio.randrange(1000))))
+
+    conv = ConvertidorTextoNumeros()
+    uno_por_uno = [conv.validar_campo(letra, digito) for letra, digito in pares]
+    assert ConvertidorTextoNumeros().validar_campos_lote(pares) == uno_por_uno
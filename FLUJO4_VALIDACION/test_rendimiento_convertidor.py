@@ -0,0 +1,101 @@
+"""
+Rendimiento del Convertidor Texto → Números
+============================================
+Mide normalizar, levenshtein y validar_campo con pytest-benchmark y falla
+si alguno tarda más de TOLERANCIA veces lo guardado en rendimiento_base.json
+(segundos por ronda, mediana).
+
+Los tiempos de la base son absolutos y dependen de la máquina, así que el
+módulo solo corre a pedido (y se omite sin pytest-benchmark):
+
+    MEDIR_RENDIMIENTO=1 python -m pytest -q test_rendimiento_convertidor.py
+
+En una máquina nueva (p.ej. la de CI) la base se regenera primero ahí mismo;
+es la única forma en que estas pruebas escriben rendimiento_base.json:
+
+    ACTUALIZAR_BASE_RENDIMIENTO=1 python -m pytest -q test_rendimiento_convertidor.py
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+ACTUALIZAR = bool(os.environ.get("ACTUALIZAR_BASE_RENDIMIENTO"))
+if not (os.environ.get("MEDIR_RENDIMIENTO") or ACTUALIZAR):
+    pytest.skip("pruebas de rendimiento a pedido: MEDIR_RENDIMIENTO=1", allow_module_level=True)
+pytest.importorskip("pytest_benchmark")
+
+from convertidor_texto_numeros import ConvertidorTextoNumeros
+from test_propiedades_convertidor import corromper, escribir
+
+RUTA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rendimiento_base.json")
+
+# Cuánto más lenta que la base puede ser una ronda antes de fallar
+TOLERANCIA = 1.5
+
+
+def _textos(cantidad: int, semilla: int) -> list:
+    """Grafías con mayúsculas, acentos y hasta 2 errores de OCR, como las de las actas."""
+    aleatorio = random.Random(semilla)
+    textos = []
+    for _ in range(cantidad):
+        texto = escribir(min(int(aleatorio.expovariate(1 / 60)), 999))
+        texto = corromper(aleatorio, texto, aleatorio.randint(0, 2)).capitalize()
+        textos.append(texto.replace("veintitres", "veintitrés").replace("dieciseis", "dieciséis"))
+    return textos
+
+
+@pytest.fixture(scope="module")
+def conv():
+    return ConvertidorTextoNumeros()
+
+
+def _comparar_con_base(benchmark, nombre: str):
+    mediana = benchmark.stats.stats.median
+    base = {}
+    if os.path.exists(RUTA_BASE):
+        with open(RUTA_BASE, "r", encoding="utf-8") as f:
+            base = json.load(f)
+
+    if ACTUALIZAR:
+        base[nombre] = round(mediana, 6)
+        with open(RUTA_BASE, "w", encoding="utf-8") as f:
+            json.dump(base, f, indent=2, sort_keys=True)
+        return
+    if nombre not in base:
+        pytest.fail(f"{nombre}: no está en {os.path.basename(RUTA_BASE)}; "
+                    f"regenerar la base con ACTUALIZAR_BASE_RENDIMIENTO=1")
+    assert mediana <= base[nombre] * TOLERANCIA, (
+        f"{nombre}: {mediana * 1e3:.2f} ms por ronda, base {base[nombre] * 1e3:.2f} ms")
+
+
+def test_rendimiento_normalizar(benchmark):
+    textos = _textos(2000, semilla=1)
+    # Sin la memoria de normalizar: mide el trabajo de cada texto nuevo
+    normalizar = ConvertidorTextoNumeros.normalizar.__wrapped__
+    benchmark(lambda: [normalizar(t) for t in textos])
+    _comparar_con_base(benchmark, "normalizar")
+
+
+def test_rendimiento_levenshtein(benchmark, conv):
+    aleatorio = random.Random(2)
+    palabras = list(conv.PALABRAS)
+    pares = [(corromper(aleatorio, p, 2), aleatorio.choice(palabras))
+             for p in aleatorio.choices(palabras, k=2000)]
+    benchmark(lambda: [conv.levenshtein(a, b) for a, b in pares])
+    _comparar_con_base(benchmark, "levenshtein")
+
+
+def test_rendimiento_validar_campo(benchmark, conv):
+    textos = _textos(500, semilla=3)
+    digitos = [str(random.Random(k).randrange(1000)) for k in range(len(textos))]
+
+    def ronda():
+        # Cada ronda empieza sin memoria, como un proceso nuevo
+        conv.vaciar_memo()
+        return [conv.validar_campo(t, d) for t, d in zip(textos, digitos)]
+
+    benchmark.pedantic(ronda, rounds=5, iterations=1)
+    _comparar_con_base(benchmark, "validar_campo")
@@ -54,6 +54,11 @@ Confianza: "alta"=claro, "media"=ambiguo pero inferible, "baja"=muy corrupto/inc
 """
 
 
+# Estimación de tokens sin llamar a la API (texto en español con JSON)
+CARACTERES_POR_TOKEN = 3.5
+TOKENS_RESPUESTA_POR_CAMPO = 35
+
+
 class ValidadorNumeros:
     """
     Valida números extraídos de actas electorales usando Azure OpenAI GPT.
@@ -62,17 +67,31 @@ class ValidadorNumeros:
     Recibe los pares de TODAS las tablas y los procesa en una sola petición.
     """
 
-    def __init__(self, endpoint: str, api_key: str, deployment: str = "gpt-4o"):
+    def __init__(self, endpoint: str, api_key: str, deployment: str = "gpt-4o",
+                 transporte=None):
+        """
+        Args:
+            endpoint:   Endpoint de Azure OpenAI
+            api_key:    Clave de Azure OpenAI
+            deployment: Nombre del deployment del modelo
+            transporte: TransporteCompartido opcional (FLUJO2_RECORTE/transporte.py);
+                        las llamadas reutilizan su pool de conexiones
+        """
         if not OPENAI_AVAILABLE:
             raise ImportError(
                 "La librería 'openai' no está instalada. "
                 "Ejecuta: pip install openai"
             )
 
+        opciones = {}
+        cliente_http = transporte.cliente_openai() if transporte is not None else None
+        if cliente_http is not None:
+            opciones["http_client"] = cliente_http
         self.client = AzureOpenAI(
             azure_endpoint=endpoint,
             api_key=api_key,
-            api_version="2024-10-21"
+            api_version="2024-10-21",
+            **opciones
         )
         self.deployment = deployment
         print(f"[INFO] Validador Azure OpenAI inicializado")
@@ -109,28 +128,10 @@ class ValidadorNumeros:
         }
 
         # Construir TODAS las entradas en un solo mensaje
-        todas_las_entradas = []
-        for num_tabla, pares in sorted(pares_por_tabla.items()):
-            for par in pares:
-                todas_las_entradas.append({
-                    "tabla": num_tabla,
-                    "id": par["id"],
-                    "contenidos": par["contenidos"]
-                })
-
+        todas_las_entradas, mensaje = self._construir_mensaje(pares_por_tabla)
         if not todas_las_entradas:
             return respuesta
 
-        # Construir mensaje para GPT-4o
-        mensaje = "Valida los siguientes datos extraídos de un acta electoral.\n"
-        mensaje += f"Total: {len(todas_las_entradas)} campos de {len(pares_por_tabla)} tablas.\n\n"
-
-        for i, entrada in enumerate(todas_las_entradas):
-            mensaje += f"Entrada {i + 1}:\n"
-            mensaje += f"  Tabla: {entrada['tabla']}\n"
-            mensaje += f"  ID del campo: {entrada['id']}\n"
-            mensaje += f"  Contenidos: {entrada['contenidos']}\n\n"
-
         try:
             print(f"[INFO] Enviando {len(todas_las_entradas)} entradas "
                   f"({len(pares_por_tabla)} tablas) a Azure OpenAI...")
@@ -209,6 +210,42 @@ class ValidadorNumeros:
             print(f"[ERROR] Error al validar con Azure OpenAI: {str(e)}")
             return respuesta
 
+    @staticmethod
+    def _construir_mensaje(pares_por_tabla: Dict[int, List[Dict]]):
+        """Entradas y mensaje de usuario para GPT-4o (todas las tablas juntas)."""
+        todas_las_entradas = []
+        for num_tabla, pares in sorted(pares_por_tabla.items()):
+            for par in pares:
+                todas_las_entradas.append({
+                    "tabla": num_tabla,
+                    "id": par["id"],
+                    "contenidos": par["contenidos"]
+                })
+
+        mensaje = "Valida los siguientes datos extraídos de un acta electoral.\n"
+        mensaje += f"Total: {len(todas_las_entradas)} campos de {len(pares_por_tabla)} tablas.\n\n"
+
+        for i, entrada in enumerate(todas_las_entradas):
+            mensaje += f"Entrada {i + 1}:\n"
+            mensaje += f"  Tabla: {entrada['tabla']}\n"
+            mensaje += f"  ID del campo: {entrada['id']}\n"
+            mensaje += f"  Contenidos: {entrada['contenidos']}\n\n"
+
+        return todas_las_entradas, mensaje
+
+    @staticmethod
+    def estimar_tokens(pares_por_tabla: Dict[int, List[Dict]]) -> int:
+        """
+        Estimación de los tokens (prompt + respuesta) que costaría validar
+        estos pares, sin llamar a la API. Sirve para reportar lo ahorrado
+        cuando un campo se resuelve localmente.
+        """
+        entradas, mensaje = ValidadorNumeros._construir_mensaje(pares_por_tabla)
+        if not entradas:
+            return 0
+        prompt = (len(SYSTEM_PROMPT) + len(mensaje)) / CARACTERES_POR_TOKEN
+        return int(prompt) + TOKENS_RESPUESTA_POR_CAMPO * len(entradas)
+
     @staticmethod
     def _inferir_tabla(id_campo: str, pares_por_tabla: dict) -> Optional[int]:
         """Si GPT no devolvió el campo 'tabla', lo infiere por el ID."""
@@ -11,7 +11,11 @@ Autor: Sistema de Procesamiento de Documentos
 Librerías: OpenCV, Azure AI Document Intelligence, Azure OpenAI
 """
 
+import glob
+import hashlib
+import json
 import os
+import shutil
 import sys
 import time
 from pathlib import Path
@@ -26,16 +30,26 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'FLUJO4_VALIDACION'))
 
 # Importar módulos de los flujos
 from document_scanner import escanear_documento
+from calidad import cargar_umbrales
+from duplicados import IndiceDuplicados, distancia_hamming
 from table_extractor import TableExtractor, cargar_credenciales
+from analisis_azure import analizar_documentos_lote, MAX_EN_VUELO
+from plantillas import RegistroPlantillas
 from exportador import ToonExporter
 from credenciales import cargar_credenciales_openai
+from transporte import TransporteCompartido
+from resultado_compacto import guardar_compacto, cargar_compacto
 
 # Importación condicional de FLUJO 4
 FLUJO4_DISPONIBLE = False
+CONVERTIDOR_DISPONIBLE = False
 try:
     from validador_numeros import ValidadorNumeros, OPENAI_AVAILABLE
     if OPENAI_AVAILABLE:
         FLUJO4_DISPONIBLE = True
+    # El mismo convertidor compartido que usa el exportador (solo para el resumen del lote)
+    from convertidor_texto_numeros import obtener_convertidor
+    CONVERTIDOR_DISPONIBLE = True
 except ImportError:
     print("[INFO] FLUJO 4 (Validación IA) no disponible. Instala: pip install openai")
 
@@ -50,7 +64,14 @@ class ProcesadorDocumentos:
 
     def __init__(self, azure_endpoint: Optional[str] = None,
                  azure_api_key: Optional[str] = None,
-                 usar_validacion_ia: bool = True):
+                 usar_validacion_ia: bool = True,
+                 usar_control_calidad: bool = True,
+                 rechazar_por_calidad: bool = False,
+                 ruta_umbrales_calidad: Optional[str] = None,
+                 usar_deduplicacion: bool = True,
+                 reutilizar_duplicados: bool = False,
+                 usar_plantillas: bool = True,
+                 solo_local: bool = False):
         """
         Inicializa el procesador de documentos.
 
@@ -58,9 +79,46 @@ class ProcesadorDocumentos:
             azure_endpoint: Endpoint de Azure Document Intelligence (opcional, se lee de .env)
             azure_api_key:  API key de Azure Document Intelligence (opcional, se lee de .env)
             usar_validacion_ia: Si True, intenta inicializar el validador de FLUJO 4
+            usar_control_calidad: Si True, mide la calidad de cada foto y avisa de las dudosas
+            rechazar_por_calidad: Si True (y usar_control_calidad), además descarta las fotos
+                                  que no llegan a los umbrales sin llamar a Azure; conviene
+                                  solo con umbrales calibrados (calidad.py calibrar)
+            ruta_umbrales_calidad: JSON con umbrales calibrados (por defecto
+                                   FLUJO1_ENDEREZADO/umbrales_calidad.json si existe)
+            usar_deduplicacion: Si True, marca las fotos casi idénticas a una ya procesada
+                                como posible duplicado (se procesan igual)
+            reutilizar_duplicados: Si True (y usar_deduplicacion), copia los resultados del
+                                   documento parecido en lugar de procesar la foto; el hash
+                                   no confirma que los números coincidan
+            usar_plantillas: Si True, ubica las tablas alineando con las plantillas de
+                             FLUJO2_RECORTE/plantillas (si hay alguna registrada)
+            solo_local: Si True, valida cada campo solo con ConvertidorTextoNumeros
+                        (sin Azure OpenAI); los no resueltos quedan con confianza baja
         """
         self.carpeta_resultados_base = "resultados"
 
+        # ── Control de calidad previo (FLUJO 1) ──
+        self.usar_control_calidad = usar_control_calidad
+        self.rechazar_por_calidad = usar_control_calidad and rechazar_por_calidad
+        if ruta_umbrales_calidad is None:
+            ruta_umbrales_calidad = os.path.join(os.path.dirname(__file__),
+                                                 'FLUJO1_ENDEREZADO', 'umbrales_calidad.json')
+        self.umbrales_calidad = cargar_umbrales(ruta_umbrales_calidad)
+        if self.rechazar_por_calidad and not os.path.exists(ruta_umbrales_calidad):
+            print("[ADVERTENCIA] Se rechazarán fotos con los umbrales de calidad por defecto "
+                  "(sin calibrar); ver FLUJO1_ENDEREZADO/calidad.py calibrar")
+
+        # ── Índice de duplicados por hash perceptual (FLUJO 1) ──
+        self.indice_duplicados = None
+        self.reutilizar_duplicados = usar_deduplicacion and reutilizar_duplicados
+        if usar_deduplicacion:
+            self.indice_duplicados = IndiceDuplicados(
+                os.path.join(self.carpeta_resultados_base, "indice_phash.json")
+            )
+
+        # ── Pool de conexiones HTTP compartido por FLUJO 2 y FLUJO 4 ──
+        self.transporte = TransporteCompartido(max_conexiones=MAX_EN_VUELO)
+
         # ── Credenciales Azure Document Intelligence (FLUJO 2) ──
         if azure_endpoint and azure_api_key:
             self.azure_endpoint = azure_endpoint
@@ -71,9 +129,16 @@ class ProcesadorDocumentos:
         # ── Inicializar extractor de tablas (FLUJO 2) ──
         self.extractor_tablas = None
         if self.azure_endpoint and self.azure_api_key:
+            registro_plantillas = None
+            if usar_plantillas:
+                registro_plantillas = RegistroPlantillas()
+                if not registro_plantillas.plantillas:
+                    registro_plantillas = None
             self.extractor_tablas = TableExtractor(
                 endpoint=self.azure_endpoint,
-                api_key=self.azure_api_key
+                api_key=self.azure_api_key,
+                registro_plantillas=registro_plantillas,
+                transporte=self.transporte
             )
             print("[INFO] FLUJO 2: Extractor de tablas inicializado con Azure AI")
         else:
@@ -81,17 +146,19 @@ class ProcesadorDocumentos:
 
         # ── Inicializar exportador TOON (FLUJO 3) ──
         self.exportador_toon = ToonExporter()
+        self.solo_local = solo_local
 
         # ── Inicializar validador IA (FLUJO 4) ──
         self.validador = None
-        if usar_validacion_ia and FLUJO4_DISPONIBLE:
+        if usar_validacion_ia and not solo_local and FLUJO4_DISPONIBLE:
             openai_endpoint, openai_key, openai_deployment = cargar_credenciales_openai()
             if openai_endpoint and openai_key:
                 try:
                     self.validador = ValidadorNumeros(
                         endpoint=openai_endpoint,
                         api_key=openai_key,
-                        deployment=openai_deployment or "gpt-4o"
+                        deployment=openai_deployment or "gpt-4o",
+                        transporte=self.transporte
                     )
                     print("[INFO] FLUJO 4: Validador IA inicializado con Azure OpenAI")
                 except Exception as e:
@@ -99,6 +166,8 @@ class ProcesadorDocumentos:
                     self.validador = None
             else:
                 print("[INFO] FLUJO 4: Deshabilitado (sin credenciales de Azure OpenAI)")
+        elif solo_local:
+            print("[INFO] FLUJO 4: Modo solo local (ConvertidorTextoNumeros, sin Azure OpenAI)")
         elif not usar_validacion_ia:
             print("[INFO] FLUJO 4: Deshabilitado por configuración del usuario")
 
@@ -111,16 +180,47 @@ class ProcesadorDocumentos:
         3. Extracción TOON
         4. Validación IA (si está habilitado)
         """
-        resultados = {
+        doc = self._iniciar_documento(ruta_imagen)
+        if doc is None:
+            return self._resultados_vacios()
+
+        if ejecutar_flujo1:
+            self._ejecutar_flujo1(doc, mostrar_resultados)
+
+        if ejecutar_flujo2 and self._requiere_flujo2(doc):
+            self._ejecutar_flujos_2_3_4(doc, mostrar_resultados)
+
+        return self._finalizar_documento(doc)
+
+    def _resultados_vacios(self) -> dict:
+        """Diccionario de resultados de un documento sin procesar."""
+        return {
             'flujo1_completado': False,
             'flujo2_completado': False,
             'flujo3_completado': False,
             'flujo4_usado': self.validador is not None,
+            'rechazo_calidad': None,
+            'aviso_calidad': None,
+            'duplicado_de': None,
+            'posible_duplicado_de': None,
+            'ahorro_duplicado': {},
+            'layout_reutilizado': False,
+            'consistencia': {},
+            'envio_ia': {},
             'imagen_enderezada': None,
             'tablas_extraidas': [],
             'archivo_toon': None
         }
 
+    def _iniciar_documento(self, ruta_imagen: str) -> Optional[dict]:
+        """
+        Prepara el estado de un documento (resultados, tiempos y carpetas).
+
+        Returns:
+            Estado del documento o None si el archivo no existe
+        """
+        resultados = self._resultados_vacios()
+
         # Tiempos
         tiempos = {
             'flujo1_enderezado': 0.0,
@@ -142,112 +242,243 @@ class ProcesadorDocumentos:
         print("="*80)
         print(f"\n[INFO] Imagen: {ruta_imagen}")
         print(f"[INFO] Destino: {carpeta_resultados_unica}")
-        print(f"[INFO] Validación IA: {'ACTIVADA ✅' if self.validador else 'DESACTIVADA (solo regex)'}")
+        if self.validador:
+            print("[INFO] Validación IA: ACTIVADA ✅")
+        elif self.solo_local:
+            print("[INFO] Validación IA: SOLO LOCAL (sin OpenAI)")
+        else:
+            print("[INFO] Validación IA: DESACTIVADA (solo regex)")
 
         # Verificar que el archivo existe
         if not os.path.exists(ruta_imagen):
             print(f"\n[ERROR] El archivo no existe: {ruta_imagen}")
-            return resultados
+            return None
         os.makedirs(carpeta_resultados_unica, exist_ok=True)
         os.makedirs(carpeta_proceso, exist_ok=True)
 
+        return {
+            'ruta_imagen': ruta_imagen,
+            'nombre_base': nombre_base,
+            'carpeta': carpeta_resultados_unica,
+            'carpeta_proceso': carpeta_proceso,
+            'imagen_para_flujo2': ruta_imagen,
+            'phash': None,
+            'resultados': resultados,
+            'tiempos': tiempos,
+            't_inicio': t_inicio_total,
+        }
+
+    def _ejecutar_flujo1(self, doc: dict, mostrar_resultados: bool = False):
+        """FLUJO 1: enderezado, control de calidad y búsqueda de duplicados."""
+        ruta_imagen, nombre_base = doc['ruta_imagen'], doc['nombre_base']
+        carpeta_resultados_unica, carpeta_proceso = doc['carpeta'], doc['carpeta_proceso']
+        resultados, tiempos = doc['resultados'], doc['tiempos']
+
         # ========================================================================
         # FLUJO 1: ENDEREZADO DEL DOCUMENTO
         # ========================================================================
-        imagen_para_flujo2 = ruta_imagen
-
-        if ejecutar_flujo1:
-            print("\n" + "-"*80)
-            print("EJECUTANDO FLUJO 1: ENDEREZADO Y ESCANEO")
-            print("-"*80)
+        print("\n" + "-"*80)
+        print("EJECUTANDO FLUJO 1: ENDEREZADO Y ESCANEO")
+        print("-"*80)
+
+        t0 = time.time()
+        diagnostico = {}
+        documento_escaneado = escanear_documento(
+            ruta_imagen=ruta_imagen,
+            mostrar_pasos=mostrar_resultados,
+            guardar_proceso=True,
+            carpeta_proceso=carpeta_proceso,
+            modo_efecto="original",
+            control_calidad=self.usar_control_calidad,
+            umbrales_calidad=self.umbrales_calidad,
+            rechazar_calidad=self.rechazar_por_calidad,
+            diagnostico=diagnostico
+        )
+        tiempos['flujo1_enderezado'] = time.time() - t0
+
+        calidad = diagnostico.get('calidad')
+        if calidad and not calidad['aceptada'] and self.rechazar_por_calidad:
+            resultados['rechazo_calidad'] = calidad['motivos']
+            print(f"[RECHAZO] Imagen descartada por calidad: {', '.join(calidad['motivos'])}. "
+                  f"No se llamará a Azure.")
+        elif documento_escaneado is not None:
+            if calidad and not calidad['aceptada']:
+                resultados['aviso_calidad'] = calidad['motivos']
+            ruta_enderezada = os.path.join(carpeta_resultados_unica, f"{nombre_base}_enderezado.jpg")
+            cv2.imwrite(ruta_enderezada, documento_escaneado, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+
+            resultados['flujo1_completado'] = True
+            resultados['imagen_enderezada'] = ruta_enderezada
+            doc['imagen_para_flujo2'] = ruta_enderezada
+            print(f"[ÉXITO] Documento enderezado guardado.")
+
+            # ¿Ya se procesó una foto casi idéntica de esta acta?
+            phash = diagnostico.get('phash')
+            doc['phash'] = phash
+            if phash is not None and self.indice_duplicados is not None:
+                previo = self.indice_duplicados.buscar(phash, excluir_documento=nombre_base)
+                if previo and self.reutilizar_duplicados:
+                    self._reutilizar_duplicado(previo, resultados, carpeta_resultados_unica, nombre_base)
+                elif previo:
+                    self._enlazar_posible_duplicado(previo, resultados, carpeta_resultados_unica,
+                                                    nombre_base)
+        else:
+            print("[FALLO] No se pudo enderezar el documento.")
 
-            t0 = time.time()
-            documento_escaneado = escanear_documento(
-                ruta_imagen=ruta_imagen,
-                mostrar_pasos=mostrar_resultados,
-                guardar_proceso=True,
-                carpeta_proceso=carpeta_proceso,
-                modo_efecto="original"
-            )
-            tiempos['flujo1_enderezado'] = time.time() - t0
+    def _requiere_flujo2(self, doc: dict) -> bool:
+        """True si el documento debe pasar por Azure (no rechazado ni duplicado)."""
+        resultados = doc['resultados']
+        return not resultados['rechazo_calidad'] and not resultados['duplicado_de']
 
-            if documento_escaneado is not None:
-                ruta_enderezada = os.path.join(carpeta_resultados_unica, f"{nombre_base}_enderezado.jpg")
-                cv2.imwrite(ruta_enderezada, documento_escaneado, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+    def _ejecutar_flujos_2_3_4(self, doc: dict, mostrar_resultados: bool = False,
+                               resultado_azure=None, tiempo_docint: float = 0.0):
+        """
+        FLUJOS 2, 3 y 4: recorte, extracción TOON y validación IA.
 
-                resultados['flujo1_completado'] = True
-                resultados['imagen_enderezada'] = ruta_enderezada
-                imagen_para_flujo2 = ruta_enderezada
-                print(f"[ÉXITO] Documento enderezado guardado.")
-            else:
-                print("[FALLO] No se pudo enderezar el documento.")
+        Args:
+            resultado_azure: AnalyzeResult ya obtenido en modo lote (None = usar el
+                             layout guardado de esta imagen o llamar a Azure)
+            tiempo_docint:   Segundos que tardó ese análisis en lote
+        """
+        if resultado_azure is None:
+            resultado_azure = self._cargar_layout(doc)
+        nombre_base, carpeta_resultados_unica = doc['nombre_base'], doc['carpeta']
+        imagen_para_flujo2 = doc['imagen_para_flujo2']
+        resultados, tiempos = doc['resultados'], doc['tiempos']
 
         # ========================================================================
         # FLUJO 2, 3 y 4: RECORTE, EXTRACCIÓN Y VALIDACIÓN
         # ========================================================================
-        if ejecutar_flujo2:
-            print("\n" + "-"*80)
-            if self.validador:
-                print("EJECUTANDO FLUJOS 2, 3 Y 4: RECORTE, EXTRACCIÓN Y VALIDACIÓN IA")
-            else:
-                print("EJECUTANDO FLUJOS 2 Y 3: RECORTE Y EXTRACCIÓN DE DATOS")
-            print("-"*80)
+        print("\n" + "-"*80)
+        if self.validador:
+            print("EJECUTANDO FLUJOS 2, 3 Y 4: RECORTE, EXTRACCIÓN Y VALIDACIÓN IA")
+        else:
+            print("EJECUTANDO FLUJOS 2 Y 3: RECORTE Y EXTRACCIÓN DE DATOS")
+        print("-"*80)
 
-            if self.extractor_tablas is None:
-                print("[ERROR] Se requieren credenciales de Azure para Flujos 2, 3 y 4.")
-            else:
-                # Flujo 2: Recorte + Azure Document Intelligence
-                nombre_img_tabla = f"{nombre_base}_tabla_extraida.jpg"
-                t0 = time.time()
-                analyze_result = self.extractor_tablas.procesar(
-                    ruta_imagen=imagen_para_flujo2,
-                    carpeta_salida=carpeta_resultados_unica,
-                    nombre_salida=nombre_img_tabla,
-                    mostrar=mostrar_resultados
-                )
-                tiempos['flujo2_azure_docint'] = time.time() - t0
+        if self.extractor_tablas is None:
+            print("[ERROR] Se requieren credenciales de Azure para Flujos 2, 3 y 4.")
+        else:
+            # Flujo 2: Recorte + Azure Document Intelligence
+            nombre_img_tabla = f"{nombre_base}_tabla_extraida.jpg"
+            t0 = time.time()
+            analyze_result = self.extractor_tablas.procesar(
+                ruta_imagen=imagen_para_flujo2,
+                carpeta_salida=carpeta_resultados_unica,
+                nombre_salida=nombre_img_tabla,
+                mostrar=mostrar_resultados,
+                resultado_azure=resultado_azure
+            )
+            tiempos['flujo2_azure_docint'] = tiempo_docint + time.time() - t0
 
-                if analyze_result:
-                    resultados['flujo2_completado'] = True
-                    resultados['tablas_extraidas'].append(
-                        os.path.join(carpeta_resultados_unica, nombre_img_tabla)
-                    )
+            if analyze_result:
+                resultados['flujo2_completado'] = True
+                resultados['tablas_extraidas'].append(
+                    os.path.join(carpeta_resultados_unica, nombre_img_tabla)
+                )
 
-                    # Flujo 3 + 4: Extracción TOON (con o sin validación IA)
-                    ruta_toon_base = os.path.join(carpeta_resultados_unica, f"{nombre_base}_datos")
-                    resultado_toon = self.exportador_toon.guardar_toon(
-                        resultado_azure=analyze_result,
-                        ruta_salida_base=ruta_toon_base,
-                        nombre_documento=nombre_base,
-                        validador=self.validador
-                    )
+                # Layout compacto en caché: volver a procesar la misma imagen no paga Azure
+                if not resultados['layout_reutilizado']:
+                    self._guardar_layout(doc, analyze_result)
+
+                # Flujo 3 + 4: Extracción TOON (con o sin validación IA)
+                ruta_toon_base = os.path.join(carpeta_resultados_unica, f"{nombre_base}_datos")
+                resultado_toon = self.exportador_toon.guardar_toon(
+                    resultado_azure=analyze_result,
+                    ruta_salida_base=ruta_toon_base,
+                    nombre_documento=nombre_base,
+                    validador=self.validador,
+                    solo_local=self.solo_local
+                )
 
-                    # Capturar tiempos del FLUJO 3+4
-                    if isinstance(resultado_toon, dict):
-                        # Modo validación IA: retorna dict con tiempos + tokens
-                        tiempos['flujo3_extraccion_cruda'] = resultado_toon.get('tiempo_extraccion_cruda', 0)
-                        tiempos['flujo4_validacion_ia'] = resultado_toon.get('tiempo_validacion_ia', 0)
-                        tiempos['lectura_cruda'] = resultado_toon.get('tiempo_lectura_cruda', 0)
-                        tokens = resultado_toon.get('tokens', {})
-                        tiempos['tokens_prompt'] = tokens.get('prompt', 0)
-                        tiempos['tokens_respuesta'] = tokens.get('respuesta', 0)
-                        tiempos['tokens_total'] = tokens.get('total', 0)
-                        if resultado_toon.get('exito'):
-                            resultados['flujo3_completado'] = True
-                            resultados['archivo_toon'] = f"{ruta_toon_base}.txt"
-                    elif resultado_toon:
-                        # Modo regex: retorna bool
+                # Capturar tiempos del FLUJO 3+4
+                if isinstance(resultado_toon, dict):
+                    # Modo validación IA o solo local: retorna dict con tiempos + tokens
+                    tiempos['flujo3_extraccion_cruda'] = resultado_toon.get('tiempo_extraccion_cruda', 0)
+                    tiempos['flujo4_validacion_ia'] = resultado_toon.get('tiempo_validacion_ia', 0)
+                    tiempos['lectura_cruda'] = resultado_toon.get('tiempo_lectura_cruda', 0)
+                    tokens = resultado_toon.get('tokens', {})
+                    tiempos['tokens_prompt'] = tokens.get('prompt', 0)
+                    tiempos['tokens_respuesta'] = tokens.get('respuesta', 0)
+                    tiempos['tokens_total'] = tokens.get('total', 0)
+                    resultados['consistencia'] = resultado_toon.get('consistencia', {})
+                    resultados['envio_ia'] = resultado_toon.get('envio_ia', {})
+                    if resultado_toon.get('etiquetas_ia'):
+                        self._registrar_etiquetas(resultado_toon['etiquetas_ia'])
+                    if 'campos_baja_confianza' in resultado_toon:
+                        tiempos['campos_baja_confianza'] = resultado_toon['campos_baja_confianza']
+                    if resultado_toon.get('exito'):
                         resultados['flujo3_completado'] = True
                         resultados['archivo_toon'] = f"{ruta_toon_base}.txt"
+                elif resultado_toon:
+                    # Modo regex: retorna bool
+                    resultados['flujo3_completado'] = True
+                    resultados['archivo_toon'] = f"{ruta_toon_base}.txt"
+
+                # Registrar el documento para detectar duplicados futuros
+                phash = doc['phash']
+                if resultados['flujo3_completado'] and phash is not None and self.indice_duplicados:
+                    self.indice_duplicados.registrar(
+                        phash, nombre_base, carpeta_resultados_unica,
+                        resultados['archivo_toon'],
+                        llamadas_openai=1 if tiempos.get('tokens_total', 0) > 0 else 0,
+                        tokens=tiempos.get('tokens_total', 0)
+                    )
+
+    @staticmethod
+    def _ruta_layout(doc: dict) -> str:
+        """
+        Archivo del layout compacto de la imagen que va a Azure. El nombre
+        lleva la huella SHA-1 de esa imagen: otra foto u otro enderezado
+        no reutilizan un layout que no les corresponde.
+        """
+        if 'ruta_layout' not in doc:
+            with open(doc['imagen_para_flujo2'], "rb") as f:
+                huella = hashlib.sha1(f.read()).hexdigest()[:16]
+            doc['ruta_layout'] = os.path.join(doc['carpeta_proceso'], f"{doc['nombre_base']}_layout_{huella}.rc")
+        return doc['ruta_layout']
+
+    def _cargar_layout(self, doc: dict):
+        """ResultadoCompacto guardado de esta misma imagen, o None si hay que llamar a Azure."""
+        try:
+            ruta_layout = self._ruta_layout(doc)
+            if not os.path.exists(ruta_layout):
+                return None
+            resultado = cargar_compacto(ruta_layout)
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo leer el layout guardado ({str(e)}); se llamará a Azure")
+            return None
+        doc['resultados']['layout_reutilizado'] = True
+        print(f"[INFO] Misma imagen ya analizada: se reutiliza el layout guardado ({ruta_layout})")
+        return resultado
+
+    def _guardar_layout(self, doc: dict, analyze_result):
+        """Guarda el layout compacto y borra los de imágenes anteriores del documento."""
+        try:
+            ruta_layout = self._ruta_layout(doc)
+            tamano = guardar_compacto(analyze_result, ruta_layout)
+            print(f"[INFO] Layout compacto guardado ({tamano / 1024:.1f} KB): {ruta_layout}")
+            for viejo in glob.glob(os.path.join(doc['carpeta_proceso'], f"{glob.escape(doc['nombre_base'])}_layout*.rc")):
+                if os.path.normpath(viejo) != os.path.normpath(ruta_layout):
+                    os.remove(viejo)
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo guardar el layout compacto: {str(e)}")
+
+    def _finalizar_documento(self, doc: dict) -> dict:
+        """Guarda los tiempos del documento, imprime su resumen y devuelve los resultados."""
+        nombre_base, carpeta_resultados_unica = doc['nombre_base'], doc['carpeta']
+        resultados, tiempos = doc['resultados'], doc['tiempos']
 
         # Calcular total
-        tiempos['total'] = time.time() - t_inicio_total
+        tiempos['total'] = time.time() - doc['t_inicio']
+        tiempos['conexiones'] = self.transporte.estadisticas()
 
         # ========================================================================
         # GUARDAR ARCHIVO DE TIEMPOS
         # ========================================================================
         ruta_tiempos = os.path.join(carpeta_resultados_unica, f"{nombre_base}_tiempos.txt")
-        self._guardar_tiempos(tiempos, ruta_tiempos, nombre_base)
+        self._guardar_tiempos(tiempos, ruta_tiempos, nombre_base, resultados['consistencia'],
+                              resultados['envio_ia'])
 
         # ========================================================================
         # RESUMEN FINAL
@@ -256,6 +487,14 @@ class ProcesadorDocumentos:
         print("RESUMEN DEL PROCESAMIENTO")
         print("="*80)
         print(f"  FLUJO 1 (Enderezado):        {'✅ COMPLETADO' if resultados['flujo1_completado'] else '❌ FALLIDO'}  ({tiempos['flujo1_enderezado']:.2f}s)")
+        if resultados['rechazo_calidad']:
+            print(f"  Control de calidad:          ⛔ RECHAZADA ({', '.join(resultados['rechazo_calidad'])})")
+        elif resultados['aviso_calidad']:
+            print(f"  Control de calidad:          ⚠️  DUDOSA ({', '.join(resultados['aviso_calidad'])})")
+        if resultados['duplicado_de']:
+            print(f"  Duplicado de:                ♻️  {resultados['duplicado_de']} (sin llamadas a Azure)")
+        elif resultados['posible_duplicado_de']:
+            print(f"  Posible duplicado de:        🔗 {resultados['posible_duplicado_de']} (procesada igual)")
         print(f"  FLUJO 2 (Doc Intelligence):  {'✅ COMPLETADO' if resultados['flujo2_completado'] else '❌ FALLIDO'}  ({tiempos['flujo2_azure_docint']:.2f}s)")
         print(f"  FLUJO 3 (Extracción cruda):  {'✅ COMPLETADO' if resultados['flujo3_completado'] else '❌ FALLIDO'}  ({tiempos['flujo3_extraccion_cruda']:.2f}s)")
         print(f"  FLUJO 4 (OpenAI GPT-4o):     {'✅ ACTIVADO' if resultados['flujo4_usado'] else '⬜ NO USADO'}  ({tiempos['flujo4_validacion_ia']:.2f}s)")
@@ -274,6 +513,25 @@ class ProcesadorDocumentos:
             print(f"  Respuesta (salida): {tr:,}")
             print(f"  Total:              {tt:,}")
 
+        consistencia = resultados['consistencia']
+        if consistencia:
+            print(f"\n  ═══ CONSISTENCIA ARITMÉTICA ═══")
+            print(f"  Campos resueltos por las sumas: {consistencia['resueltos']}"
+                  f"  (corregidos: {consistencia['corregidos']}, ambiguos: {consistencia['ambiguos']})")
+            if 'tokens_evitados' in consistencia:
+                print(f"  OpenAI evitado:   {consistencia['llamadas_evitadas']} llamada(s), "
+                      f"~{consistencia['tokens_evitados']:,} tokens")
+
+        envio = resultados['envio_ia']
+        if envio:
+            print(f"\n  ═══ ENVÍO A OPENAI ═══")
+            print(f"  Campos enviados:  {envio['enviados']}/{envio['campos']}  ({envio['proporcion']:.0%})")
+
+        baja = tiempos.get('campos_baja_confianza')
+        if baja is not None:
+            print(f"\n  ═══ VALIDACIÓN SOLO LOCAL ═══")
+            print(f"  Campos con confianza baja: {len(baja)}" + (f"  ({', '.join(baja)})" if baja else ""))
+
         print(f"\n  ═══ LLAMADAS A AZURE ═══")
         print(f"  Document Intelligence: 1 llamada")
         print(f"  OpenAI GPT-4o:         1 llamada")
@@ -287,7 +545,248 @@ class ProcesadorDocumentos:
 
         return resultados
 
-    def _guardar_tiempos(self, tiempos: dict, ruta: str, nombre: str):
+    def _reutilizar_duplicado(self, previo: dict, resultados: dict,
+                              carpeta_resultados: str, nombre_base: str):
+        """Enlaza el documento con uno ya procesado y copia sus datos TOON."""
+        print(f"[DUPLICADO] Foto casi idéntica a '{previo['documento']}' "
+              f"(distancia Hamming {previo['distancia']}). Se reutilizan sus resultados.")
+
+        resultados['duplicado_de'] = previo['documento']
+        resultados['ahorro_duplicado'] = {
+            'llamadas_docint': 1,
+            'llamadas_openai': previo.get('llamadas_openai', 0),
+            'tokens': previo.get('tokens', 0),
+        }
+
+        archivo_previo = previo.get('archivo_toon')
+        if archivo_previo and os.path.exists(archivo_previo):
+            ruta_toon = os.path.join(carpeta_resultados, f"{nombre_base}_datos.txt")
+            shutil.copyfile(archivo_previo, ruta_toon)
+            resultados['archivo_toon'] = ruta_toon
+
+        self._guardar_enlace_duplicado(previo, carpeta_resultados, nombre_base, "DUPLICADO DE")
+
+    def _enlazar_posible_duplicado(self, previo: dict, resultados: dict,
+                                   carpeta_resultados: str, nombre_base: str):
+        """Marca el documento como posible duplicado de otro, sin copiar nada: se procesa igual."""
+        print(f"[ADVERTENCIA] Posible duplicado de '{previo['documento']}' "
+              f"(distancia Hamming {previo['distancia']}). Se procesa igual; "
+              f"--reutilizar-duplicados copia sus resultados.")
+        resultados['posible_duplicado_de'] = previo['documento']
+        self._guardar_enlace_duplicado(previo, carpeta_resultados, nombre_base, "POSIBLE DUPLICADO DE")
+
+    @staticmethod
+    def _guardar_enlace_duplicado(previo: dict, carpeta_resultados: str, nombre_base: str,
+                                  encabezado: str):
+        """Deja junto a los resultados un archivo que apunta al documento parecido."""
+        ruta_enlace = os.path.join(carpeta_resultados, f"{nombre_base}_duplicado.txt")
+        try:
+            with open(ruta_enlace, "w", encoding="utf-8") as f:
+                f.write(f"{encabezado}: {previo['documento']}\n")
+                f.write(f"Carpeta original: {previo.get('carpeta', '')}\n")
+                f.write(f"Distancia Hamming: {previo['distancia']}\n")
+        except Exception as e:
+            print(f"[ERROR] No se pudo guardar el enlace de duplicado: {str(e)}")
+
+    def procesar_lote(self, rutas_imagenes: list, ejecutar_flujo1: bool = True,
+                      ejecutar_flujo2: bool = True) -> list:
+        """
+        Procesa varias imágenes y reporta duplicados y ahorro del lote.
+
+        Primero se endereza todo el lote (FLUJO 1, local). Luego todos los
+        documentos que requieren Azure se envían juntos a Document Intelligence
+        y cada uno continúa con los FLUJOS 2-4 en cuanto su análisis termina,
+        de modo que la espera del servicio se solapa entre documentos.
+
+        Returns:
+            Lista de diccionarios de resultados (uno por imagen)
+        """
+        docs = [self._iniciar_documento(ruta) for ruta in rutas_imagenes]
+        todos = [None if doc is not None else self._resultados_vacios() for doc in docs]
+
+        # FLUJO 1 de todo el lote
+        if ejecutar_flujo1:
+            for doc in docs:
+                if doc is not None:
+                    self._ejecutar_flujo1(doc)
+
+        # Documentos que van a Azure; las fotos repetidas dentro del mismo lote
+        # esperan a que termine su original en lugar de enviarse también, y
+        # las imágenes ya analizadas usan su layout guardado
+        pendientes, en_espera, con_layout = [], [], []
+        if ejecutar_flujo2:
+            for doc in docs:
+                if doc is None or not self._requiere_flujo2(doc):
+                    continue
+                layout = self._cargar_layout(doc)
+                if layout is not None:
+                    con_layout.append((doc, layout))
+                elif self._duplicado_en_lote(doc, pendientes):
+                    en_espera.append(doc)
+                else:
+                    pendientes.append(doc)
+
+        for doc, layout in con_layout:
+            self._ejecutar_flujos_2_3_4(doc, resultado_azure=layout)
+            todos[docs.index(doc)] = self._finalizar_documento(doc)
+
+        cliente = self.extractor_tablas.client if self.extractor_tablas else None
+        if cliente is not None and pendientes:
+            rutas_azure = [doc['imagen_para_flujo2'] for doc in pendientes]
+
+            # Las páginas ya enviadas se alinean con su plantilla mientras Azure las analiza
+            def localizar_enviados(indices):
+                for i in indices:
+                    self.extractor_tablas.localizar_tablas(rutas_azure[i])
+
+            for idx, resultado_azure, segundos in analizar_documentos_lote(
+                    cliente, rutas_azure, mientras_espera=localizar_enviados):
+                # Si el análisis en lote falló, procesar() reintenta la llamada individual
+                doc = pendientes[idx]
+                self._ejecutar_flujos_2_3_4(doc, resultado_azure=resultado_azure, tiempo_docint=segundos)
+                todos[docs.index(doc)] = self._finalizar_documento(doc)
+        else:
+            for doc in pendientes:
+                self._ejecutar_flujos_2_3_4(doc)
+
+        # Duplicados dentro del lote: su original ya quedó registrado en el índice
+        for doc in en_espera:
+            previo = self.indice_duplicados.buscar(doc['phash'], excluir_documento=doc['nombre_base'])
+            if previo:
+                self._reutilizar_duplicado(previo, doc['resultados'], doc['carpeta'], doc['nombre_base'])
+            else:
+                self._ejecutar_flujos_2_3_4(doc)
+
+        for i, doc in enumerate(docs):
+            if todos[i] is None:
+                todos[i] = self._finalizar_documento(doc)
+
+        self._guardar_resumen_lote(rutas_imagenes, todos, ejecutar_flujo2)
+        return todos
+
+    def _duplicado_en_lote(self, doc: dict, otros: list) -> bool:
+        """True si el documento es casi idéntico a otro del lote aún sin procesar."""
+        if not self.reutilizar_duplicados or doc['phash'] is None:
+            return False
+        return any(otro['phash'] is not None and
+                   distancia_hamming(doc['phash'], otro['phash']) <= self.indice_duplicados.umbral
+                   for otro in otros)
+
+    def _guardar_resumen_lote(self, rutas: list, todos: list, ejecutar_flujo2: bool = True):
+        """Imprime y guarda el resumen del lote (duplicados, rechazos y ahorro)."""
+        duplicados = [r for r in todos if r['duplicado_de']]
+        rechazados = [r for r in todos if r['rechazo_calidad']]
+        posibles = [r for r in todos if r['posible_duplicado_de']]
+        dudosas = [r for r in todos if r['aviso_calidad']]
+        ahorro_docint = sum(r['ahorro_duplicado'].get('llamadas_docint', 0) for r in duplicados)
+        ahorro_openai = sum(r['ahorro_duplicado'].get('llamadas_openai', 0) for r in duplicados)
+        ahorro_tokens = sum(r['ahorro_duplicado'].get('tokens', 0) for r in duplicados)
+        layouts_reutilizados = sum(1 for r in todos if r.get('layout_reutilizado'))
+        consistencias = [r['consistencia'] for r in todos if r.get('consistencia')]
+        envios = [r['envio_ia'] for r in todos if r.get('envio_ia')]
+
+        contenido = []
+        contenido.append(f"RESUMEN DEL LOTE — {len(rutas)} imágenes")
+        contenido.append(f"{'═' * 50}")
+        def completado(r):
+            return r['flujo3_completado'] or (not ejecutar_flujo2 and r['flujo1_completado'])
+
+        contenido.append(f"  Completadas:               {sum(1 for r in todos if completado(r))}")
+        contenido.append(f"  Duplicadas (reutilizadas): {len(duplicados)}")
+        contenido.append(f"  Posibles duplicados:       {len(posibles)}")
+        contenido.append(f"  Rechazadas por calidad:    {len(rechazados)}")
+        contenido.append(f"  Calidad dudosa (avisadas): {len(dudosas)}")
+        contenido.append(f"")
+        contenido.append(f"  Ahorro por duplicados:")
+        contenido.append(f"    Document Intelligence:  {ahorro_docint} llamada(s)")
+        contenido.append(f"    OpenAI GPT-4o:          {ahorro_openai} llamada(s)")
+        contenido.append(f"    Tokens:                 {ahorro_tokens:,}")
+        contenido.append(f"")
+        if layouts_reutilizados:
+            contenido.append(f"  Layouts guardados reutilizados (imagen ya analizada):")
+            contenido.append(f"    Document Intelligence:  {layouts_reutilizados} llamada(s)")
+            contenido.append(f"")
+        if consistencias:
+            contenido.append(f"  Ahorro por consistencia aritmética:")
+            contenido.append(f"    Campos resueltos:       {sum(c['resueltos'] for c in consistencias)}")
+            contenido.append(f"    OpenAI GPT-4o:          "
+                             f"{sum(c.get('llamadas_evitadas', 0) for c in consistencias)} llamada(s)")
+            contenido.append(f"    Tokens (estimado):      "
+                             f"{sum(c.get('tokens_evitados', 0) for c in consistencias):,}")
+            contenido.append(f"")
+        if envios:
+            campos = sum(e['campos'] for e in envios)
+            enviados = sum(e['enviados'] for e in envios)
+            contenido.append(f"  Envío a OpenAI (lo que la validación local no resolvió):")
+            contenido.append(f"    Campos enviados:        {enviados}/{campos}"
+                             f"  ({enviados / campos if campos else 0.0:.0%})")
+            contenido.append(f"")
+        # Solo si el convertidor se usó (con validación IA o solo local); en
+        # modo regex no se construye para leer estadísticas vacías
+        memo = None
+        if CONVERTIDOR_DISPONIBLE and (self.validador or self.solo_local):
+            memo = obtener_convertidor().estadisticas_memo()
+        if memo and memo['exacto']['hits'] + memo['exacto']['misses']:
+            contenido.append(f"  Memoria del convertidor (texto → número):")
+            for nivel in ('exacto', 'fuzzy', 'candidatos', 'segmentar'):
+                info = memo[nivel]
+                contenido.append(f"    {nivel.capitalize() + ':':<24}{info['tasa_aciertos']:.0%} aciertos "
+                                 f"({info['hits']}/{info['hits'] + info['misses']}), "
+                                 f"{info['currsize']}/{info['maxsize']} textos")
+            contenido.append(f"")
+        conexiones = self.transporte.estadisticas()
+        if conexiones['peticiones']:
+            contenido.append(f"  Conexiones HTTP:")
+            contenido.extend(self._lineas_conexiones(conexiones))
+            contenido.append(f"")
+        for ruta, r in zip(rutas, todos):
+            estado = ("DUPLICADO de " + r['duplicado_de']) if r['duplicado_de'] else \
+                     ("RECHAZADO " + ",".join(r['rechazo_calidad'])) if r['rechazo_calidad'] else \
+                     ("OK, calidad dudosa " + ",".join(r['aviso_calidad'])) \
+                     if completado(r) and r['aviso_calidad'] else \
+                     "OK" if completado(r) else "FALLIDO"
+            if r['posible_duplicado_de']:
+                estado += f" (posible duplicado de {r['posible_duplicado_de']})"
+            contenido.append(f"  {Path(ruta).name}: {estado}")
+
+        print("\n" + "\n".join(contenido) + "\n")
+
+        ruta_resumen = os.path.join(self.carpeta_resultados_base, "resumen_lote.txt")
+        try:
+            os.makedirs(self.carpeta_resultados_base, exist_ok=True)
+            with open(ruta_resumen, "w", encoding="utf-8") as f:
+                f.write("\n".join(contenido))
+            print(f"[INFO] Resumen del lote exportado a: {ruta_resumen}")
+        except Exception as e:
+            print(f"[ERROR] No se pudo guardar el resumen del lote: {str(e)}")
+
+    @staticmethod
+    def _lineas_conexiones(conexiones: dict) -> list:
+        """Líneas de texto con las estadísticas de reutilización de conexiones."""
+        return [
+            f"    Peticiones:             {conexiones['peticiones']:>7,}",
+            f"    Conexiones nuevas:      {conexiones['conexiones_nuevas']:>7,}"
+            f"  (Doc Intelligence {conexiones['docint_conexiones']}, OpenAI {conexiones['openai_conexiones']})",
+            f"    Reutilizadas:           {conexiones['reutilizadas']:>7,}"
+            f"  ({conexiones['tasa_reutilizacion']:.0%})",
+        ]
+
+    def _registrar_etiquetas(self, etiquetas: list):
+        """
+        Agrega al historial etiquetado los campos que OpenAI resolvió con
+        confianza alta (para: python confusiones_ocr.py aprender ...).
+        """
+        ruta_historial = os.path.join(self.carpeta_resultados_base, "historial_etiquetado.jsonl")
+        try:
+            os.makedirs(self.carpeta_resultados_base, exist_ok=True)
+            with open(ruta_historial, "a", encoding="utf-8") as f:
+                for etiqueta in etiquetas:
+                    f.write(json.dumps(etiqueta, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"[ADVERTENCIA] No se pudo guardar el historial etiquetado: {str(e)}")
+
+    def _guardar_tiempos(self, tiempos: dict, ruta: str, nombre: str, consistencia: Optional[dict] = None,
+                         envio_ia: Optional[dict] = None):
         """Guarda el desglose de tiempos y tokens en un archivo txt."""
         total_sin_cruda = tiempos['total'] - tiempos['lectura_cruda']
         tp = tiempos.get('tokens_prompt', 0)
@@ -319,6 +818,35 @@ class ProcesadorDocumentos:
         contenido.append(f"    Respuesta (salida):     {tr:>7,}")
         contenido.append(f"    Total:                  {tt:>7,}")
 
+        if consistencia:
+            contenido.append(f"")
+            contenido.append(f"  Consistencia aritmética (96+97=98, suma T2=99, 98=99):")
+            contenido.append(f"    Campos resueltos:       {consistencia['resueltos']:>7}")
+            contenido.append(f"    Corregidos / ambiguos:  {consistencia['corregidos']:>3} / {consistencia['ambiguos']}")
+            if 'tokens_evitados' in consistencia:
+                contenido.append(f"    Llamadas evitadas:      {consistencia['llamadas_evitadas']:>7}")
+                contenido.append(f"    Tokens evitados (est.): {consistencia['tokens_evitados']:>7,}")
+
+        if envio_ia:
+            contenido.append(f"")
+            contenido.append(f"  Envío a OpenAI:")
+            contenido.append(f"    Campos enviados:        {envio_ia['enviados']:>3} / {envio_ia['campos']}"
+                             f"  ({envio_ia['proporcion']:.0%})")
+
+        baja = tiempos.get('campos_baja_confianza')
+        if baja is not None:
+            contenido.append(f"")
+            contenido.append(f"  Validación solo local (sin OpenAI):")
+            contenido.append(f"    Campos con confianza baja: {len(baja):>4}")
+            if baja:
+                contenido.append(f"    Revisar: {', '.join(baja)}")
+
+        conexiones = tiempos.get('conexiones')
+        if conexiones and conexiones['peticiones']:
+            contenido.append(f"")
+            contenido.append(f"  Conexiones HTTP (acumulado del proceso):")
+            contenido.extend(self._lineas_conexiones(conexiones))
+
         try:
             with open(ruta, "w", encoding="utf-8") as f:
                 f.write("\n".join(contenido))
@@ -335,19 +863,30 @@ def main():
         print("="*80)
         print("Procesador de Documentos - Pipeline Completo (4 Flujos)")
         print("="*80)
-        print("\nUso: python procesador_documentos.py <ruta_imagen> [opciones]")
+        print("\nUso: python procesador_documentos.py <ruta_imagen|carpeta> [opciones]")
         print("\nArgumentos:")
         print("  <ruta_imagen>    Ruta a la imagen del documento a procesar")
+        print("  <carpeta>        Procesa todas las imágenes de la carpeta como un lote")
         print("\nOpciones:")
         print("  --solo-flujo1    Ejecuta solo el enderezado del documento")
         print("  --solo-flujo2    Ejecuta solo la extracción de tablas")
         print("  --sin-ia         Deshabilita la validación IA (FLUJO 4)")
+        print("  --solo-local     Valida letra vs dígitos solo localmente, sin Azure OpenAI")
+        print("  --sin-control-calidad  No mide la calidad de las fotos (borrosas/oscuras)")
+        print("  --rechazar-calidad     Descarta antes de Azure las fotos de calidad dudosa")
+        print("                         (por defecto solo avisa; calibrar umbrales antes)")
+        print("  --sin-deduplicar No busca fotos repetidas de la misma acta")
+        print("  --reutilizar-duplicados  Copia los resultados de la foto repetida en lugar de")
+        print("                         procesarla (por defecto solo la marca como posible duplicado)")
+        print("  --sin-plantillas Ubica las tablas solo con el layout de Azure (sin plantillas)")
         print("  --mostrar        Muestra las imágenes durante el proceso")
         print("\nEjemplos:")
         print("  python procesador_documentos.py documento.jpg")
         print("  python procesador_documentos.py acta.png --mostrar")
         print("  python procesador_documentos.py foto.jpg --solo-flujo1")
         print("  python procesador_documentos.py acta.jpg --sin-ia")
+        print("  python procesador_documentos.py PRUEBASIMG/ --solo-local")
+        print("  python procesador_documentos.py PRUEBASIMG/")
         print("\nFlujos:")
         print("  FLUJO 1: Enderezado del documento (OpenCV)")
         print("  FLUJO 2: Recorte de tablas (Azure Document Intelligence)")
@@ -367,7 +906,13 @@ def main():
     solo_flujo1 = '--solo-flujo1' in sys.argv
     solo_flujo2 = '--solo-flujo2' in sys.argv
     sin_ia = '--sin-ia' in sys.argv
+    solo_local = '--solo-local' in sys.argv
     mostrar = '--mostrar' in sys.argv
+    sin_control_calidad = '--sin-control-calidad' in sys.argv
+    rechazar_calidad = '--rechazar-calidad' in sys.argv
+    sin_deduplicar = '--sin-deduplicar' in sys.argv
+    reutilizar_duplicados = '--reutilizar-duplicados' in sys.argv
+    sin_plantillas = '--sin-plantillas' in sys.argv
 
     # Determinar qué flujos ejecutar
     if solo_flujo1:
@@ -386,7 +931,27 @@ def main():
         sys.exit(1)
 
     # Crear procesador
-    procesador = ProcesadorDocumentos(usar_validacion_ia=not sin_ia)
+    procesador = ProcesadorDocumentos(usar_validacion_ia=not sin_ia,
+                                      usar_control_calidad=not sin_control_calidad,
+                                      rechazar_por_calidad=rechazar_calidad,
+                                      usar_deduplicacion=not sin_deduplicar,
+                                      reutilizar_duplicados=reutilizar_duplicados,
+                                      usar_plantillas=not sin_plantillas,
+                                      solo_local=solo_local)
+
+    # Modo lote: procesar todas las imágenes de una carpeta
+    if os.path.isdir(ruta_imagen):
+        extensiones = {'.jpg', '.jpeg', '.png', '.tif', '.tiff', '.bmp'}
+        rutas = sorted(str(p) for p in Path(ruta_imagen).iterdir()
+                       if p.suffix.lower() in extensiones)
+        if not rutas:
+            print(f"[ERROR] No hay imágenes en la carpeta: {ruta_imagen}")
+            sys.exit(1)
+        todos = procesador.procesar_lote(rutas, ejecutar_flujo1=ejecutar_flujo1,
+                                         ejecutar_flujo2=ejecutar_flujo2)
+        fallidos = [r for r in todos
+                    if not r['flujo3_completado'] and not r['duplicado_de'] and not r['rechazo_calidad']]
+        sys.exit(1 if fallidos and ejecutar_flujo2 else 0)
 
     # Procesar imagen
     resultados = procesador.procesar_imagen(
@@ -405,7 +970,7 @@ def main():
 
     # Retornar código de salida
     if (ejecutar_flujo1 and not resultados['flujo1_completado']) or \
-       (ejecutar_flujo2 and not resultados['flujo2_completado']):
+       (ejecutar_flujo2 and not resultados['flujo2_completado'] and not resultados['duplicado_de']):
         sys.exit(1)
     else:
         sys.exit(0)